@@ -0,0 +1,97 @@
+import bisect
+import posixpath
+
+def normalize_archive_path(path):
+    """
+    Normalize a path taken from a Fomod ModuleConfig.xml (or a zip member name)
+    for lookups: forward slashes, no leading/trailing slash, lower case.
+    """
+    return path.replace("\\", "/").strip("/").lower()
+
+class ArchiveIndex:
+    """
+    Case-insensitive index over the central directory of a zip archive.
+
+    The member list is read once and kept as a sorted table of lower-case paths,
+    so every file below a folder is found with a binary search (a prefix range)
+    instead of scanning the whole namelist(). Folders are also indexed by their
+    last path component to find where a Fomod source folder lives in the archive.
+    """
+    def __init__(self, infos):
+        files = sorted(((info.filename.lower(), info) for info in infos if not info.is_dir()),
+                       key=lambda item: item[0])
+        self._keys = [key for key, _ in files]
+        self._infos = [info for _, info in files]
+        self._dirs_by_name = {}
+        self._files_by_name = {}
+        seen_dirs = set()
+        for key in self._keys:
+            self._files_by_name.setdefault(posixpath.basename(key), []).append(key)
+            folder = posixpath.dirname(key)
+            while folder and folder not in seen_dirs:
+                seen_dirs.add(folder)
+                self._dirs_by_name.setdefault(posixpath.basename(folder), []).append(folder)
+                folder = posixpath.dirname(folder)
+
+    @classmethod
+    def from_zip(cls, z):
+        """Build the index from an open zipfile.ZipFile."""
+        return cls(z.infolist())
+
+    def __len__(self):
+        return len(self._keys)
+
+    def files_under(self, folder):
+        """
+        Return the ZipInfo of every file below the given lower-case folder path.
+        """
+        prefix = folder + "/"
+        start = bisect.bisect_left(self._keys, prefix)
+        # "0" is the character right after "/", so this is the end of the prefix range.
+        end = bisect.bisect_left(self._keys, folder + "0", start)
+        return self._infos[start:end]
+
+    def find_folders(self, source):
+        """
+        Return the archive folders matching a Fomod source folder.
+
+        A folder matches when its path ends with the (normalized) source path, wherever
+        it sits in the archive. Matches nested inside another match are dropped, so each
+        file is attributed to the outermost occurrence of the source folder.
+        """
+        src = normalize_archive_path(source)
+        if not src:
+            return []
+        last = posixpath.basename(src)
+        matches = sorted(d for d in self._dirs_by_name.get(last, ())
+                         if d == src or d.endswith("/" + src))
+        outermost = []
+        for folder in matches:
+            if not any(folder.startswith(kept + "/") for kept in outermost):
+                outermost.append(folder)
+        return outermost
+
+    def resolve_folder(self, source):
+        """
+        Return (ZipInfo, subpath) pairs for every file below the Fomod source folder,
+        where subpath is the member path relative to that folder.
+        """
+        results = []
+        for folder in self.find_folders(source):
+            depth = folder.count("/") + 1
+            for info in self.files_under(folder):
+                results.append((info, "/".join(info.filename.split("/")[depth:])))
+        return results
+
+    def find_file(self, path):
+        """
+        Return the name of the first member whose path ends with the given path
+        (case-insensitive), or None.
+        """
+        wanted = normalize_archive_path(path)
+        if not wanted:
+            return None
+        for key in self._files_by_name.get(posixpath.basename(wanted), ()):
+            if key.endswith(wanted):
+                return self._infos[bisect.bisect_left(self._keys, key)].filename
+        return None
@@ -1,9 +1,13 @@
 import os
-import re
 import zipfile
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
 import settings
+import installer
+from jobs import InstallJob
+from store import configured_store
+from manifests import Manifest, find_installed, relative_path
+from job_window import open_job_window
 
 def open_basic_install_window(parent):
     """
@@ -50,54 +54,55 @@ def install_mod(zip_file_path, window):
             {ITR2_Path}\IntoTheRadius2\Content\Paks\LogicMods\ModName\Mod.pak
             
       - If no recognized folder is found, the file is extracted to the Mods folder by default.
+    
+    Files are extracted in parallel by installer.install_basic_mod, on a background
+    job so the window stays responsive and shows progress while the mod installs.
+    If an earlier version of the mod is installed, the user can upgrade it instead
+    (installer.upgrade_basic_mod): only changed files are written. Otherwise the
+    install plan (read from the zip's central directory) is checked first: the user
+    confirms overwriting existing files, and a disk without enough free space is
+    reported before anything is extracted.
     """
     itr2_path = settings.get_ITR2_Path()
     if not itr2_path:
         messagebox.showerror("Error", "ITR2 path is not set in the configuration.")
         return
     
-    base_dest = os.path.join(itr2_path, "IntoTheRadius2", "Content", "Paks")
-    mods_dest = os.path.join(base_dest, "Mods")
-    logicmods_dest = os.path.join(base_dest, "LogicMods")
-    luamods_dest = os.path.join(base_dest, "LuaMods")
-    os.makedirs(mods_dest, exist_ok=True)
-    os.makedirs(logicmods_dest, exist_ok=True)
-    os.makedirs(luamods_dest, exist_ok=True)
-    
+    install = installer.install_basic_mod
+    manifest = Manifest.for_archive(zip_file_path, itr2_path)
+    store = configured_store(itr2_path)
+    try:
+        with zipfile.ZipFile(zip_file_path, "r") as z:
+            plan = installer.InstallPlan(installer.plan_basic_install(z, itr2_path), itr2_path)
+    except (OSError, zipfile.BadZipFile) as e:
+        messagebox.showerror("Error", f"Could not read {os.path.basename(zip_file_path)}:\n{e}", parent=window)
+        return
     try:
-        with zipfile.ZipFile(zip_file_path, 'r') as z:
-            for member in z.namelist():
-                if member.endswith("/"):
-                    continue
-                parts = member.split("/")
-                # Default: use the entire member path.
-                rel_path = os.path.join(*parts)
-                # Determine target folder.
-                target = "mods"  # default target
-                if len(parts) >= 2:
-                    # If the second part is a recognized mod type folder, remove it from the path.
-                    if parts[1].lower() in ["mods", "logicmods", "luamods"]:
-                        target = parts[1].lower()
-                        # Rebuild relative path: preserve the first part (e.g. ModName) and then all remaining parts.
-                        rel_path = os.path.join(parts[0], *parts[2:]) if len(parts) > 2 else parts[0]
-                    else:
-                        # Otherwise, if the first folder itself matches a target.
-                        if parts[0].lower() in ["mods", "logicmods", "luamods"]:
-                            target = parts[0].lower()
-                # Set destination directory based on target.
-                if target == "mods":
-                    dest_dir = mods_dest
-                elif target == "logicmods":
-                    dest_dir = logicmods_dest
-                elif target == "luamods":
-                    dest_dir = luamods_dest
-                else:
-                    dest_dir = mods_dest
-                
-                final_dest = os.path.join(dest_dir, rel_path)
-                os.makedirs(os.path.dirname(final_dest), exist_ok=True)
-                with z.open(member) as source, open(final_dest, "wb") as target_file:
-                    target_file.write(source.read())
-        messagebox.showinfo("Installation Complete", "Mod installation completed successfully.")
-    except Exception as e:
-        messagebox.showerror("Installation Error", f"An error occurred during installation:\n{str(e)}")
+        previous = find_installed(itr2_path, [relative_path(itr2_path, dest) for _, dest in plan.jobs],
+                                  name=manifest.name)
+    except (OSError, ValueError) as e:
+        print(f"Error looking for an installed version of {zip_file_path}: {e}")
+        previous = []
+    if previous and messagebox.askyesno(
+            "Upgrade Mod",
+            f"{', '.join(m.name for m in previous)} is already installed.\n\n"
+            "Upgrade it? Only changed files are written and files the new version no longer ships are removed.",
+            parent=window):
+        install = installer.upgrade_basic_mod
+    elif plan.overwrites and not messagebox.askyesno(
+            "Overwrite Files",
+            f"{len(plan.overwrites)} existing file(s) will be overwritten:\n\n{plan.describe_overwrites()}\n\nContinue?",
+            parent=window):
+        return
+    try:
+        plan.check_free_space(store)
+    except OSError as e:
+        messagebox.showerror("Error", str(e), parent=window)
+        return
+    
+    job = InstallJob(install, zip_file_path, itr2_path,
+                     workers=settings.get_ExtractWorkers(),
+                     use_processes=settings.get_ExtractMode() == "process",
+                     store=store,
+                     manifest=manifest)
+    open_job_window(window, "Installing Mod", job, "Mod installation completed successfully.")
@@ -0,0 +1,49 @@
+"""
+Measure peak Python memory while extracting a single large zip member,
+comparing the old read()-everything copy with extraction.extract_member.
+
+Usage:
+    python benchmarks/bench_extract.py [size_in_mb]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from extraction import extract_member, BUFFER_SIZE
+
+def make_archive(path, size_mb):
+    chunk = os.urandom(1024 * 1024)
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        with z.open("ModName/Mod.ucas", "w", force_zip64=True) as f:
+            for _ in range(size_mb):
+                f.write(chunk)
+
+def old_extract(z, member, final_dest):
+    with z.open(member) as source, open(final_dest, "wb") as target_file:
+        target_file.write(source.read())
+
+def measure(label, func, zip_path, dest):
+    with zipfile.ZipFile(zip_path) as z:
+        tracemalloc.start()
+        start = time.perf_counter()
+        func(z, "ModName/Mod.ucas", dest)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    print(f"{label:<10} peak {peak / 1024 / 1024:8.1f} MB   {elapsed:6.2f} s")
+
+def main():
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    with tempfile.TemporaryDirectory() as tmp:
+        zip_path = os.path.join(tmp, "mod.zip")
+        make_archive(zip_path, size_mb)
+        print(f"member size {size_mb} MB, buffer {BUFFER_SIZE // 1024} KB")
+        measure("read()", old_extract, zip_path, os.path.join(tmp, "old.ucas"))
+        measure("streamed", extract_member, zip_path, os.path.join(tmp, "new.ucas"))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Compare the per-widget listdir/isdir scanning the tree views used to do with the
+single-pass scandir folder model (fsmodel.scan_tree) and the inventory-backed
+model (ModInventory.load_tree) on a synthetic Mods folder.
+
+File system calls are counted by wrapping os.listdir, os.scandir and os.stat
+(os.path.isdir goes through os.stat); DirEntry type checks use the cached
+d_type and are not system calls. DirEntry.stat(), which the inventory uses for
+file sizes, cannot be wrapped: it is free on Windows and one lstat per file on Linux.
+
+Usage:
+    python benchmarks/bench_fsmodel.py [mod_count]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("APPDATA", tempfile.gettempdir())
+from fsmodel import scan_tree
+from inventory import ModInventory
+
+counts = {}
+
+def counting(name, func):
+    def wrapper(*args, **kwargs):
+        counts[name] = counts.get(name, 0) + 1
+        return func(*args, **kwargs)
+    return wrapper
+
+def make_tree(root, count):
+    for i in range(count):
+        # Every tenth mod is a group folder with two variants inside.
+        folder = os.path.join(root, f"Mod{i:05}")
+        leaves = [os.path.join(folder, "A"), os.path.join(folder, "B")] if i % 10 == 0 else [folder]
+        for leaf in leaves:
+            os.makedirs(leaf)
+            for ext in (".pak", ".ucas", ".utoc"):
+                open(os.path.join(leaf, f"Mod{i:05}{ext}"), "wb").close()
+
+def old_has_children(path):
+    items = os.listdir(path)
+    return len([d for d in items if os.path.isdir(os.path.join(path, d))]) > 0
+
+def old_subdirs(path):
+    items = os.listdir(path)
+    return sorted([os.path.join(path, d) for d in items if os.path.isdir(os.path.join(path, d))],
+                  key=lambda x: os.path.basename(x).lower())
+
+def old_build(root):
+    # build_tree, then FolderTreeItem.__init__ (_check_has_children and the "off" check)
+    # for every top-level folder, then _populate_children for every expanded group.
+    for folder in old_subdirs(root):
+        if old_has_children(folder):
+            for sub in old_subdirs(folder):
+                old_has_children(sub)
+                os.path.exists(os.path.join(sub, "off"))
+        else:
+            os.path.exists(os.path.join(folder, "off"))
+
+def measure(label, func, *args):
+    counts.clear()
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+    total = sum(counts.values())
+    detail = ", ".join(f"{k} {v}" for k, v in sorted(counts.items()))
+    print(f"{label:<22} {elapsed:7.3f} s  {total:7} calls  ({detail})")
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, "Mods")
+        make_tree(root, count)
+        inventory = ModInventory(os.path.join(tmp, "inventory.sqlite3"))
+        os.listdir = counting("listdir", os.listdir)
+        os.scandir = counting("scandir", os.scandir)
+        os.stat = counting("stat", os.stat)
+        print(f"{count} mod folders")
+        measure("listdir + isdir", old_build, root)
+        measure("scandir model", scan_tree, root)
+        measure("inventory (cold)", inventory.load_tree, root)
+        measure("inventory (warm)", inventory.load_tree, root)
+        inventory.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Time a full listdir/isdir walk of a synthetic Mods folder against a cold and a
+warm inventory.ModInventory.refresh().
+
+Usage:
+    python benchmarks/bench_inventory.py [mod_count]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("APPDATA", tempfile.gettempdir())
+from inventory import ModInventory
+
+def make_tree(root, count):
+    for i in range(count):
+        folder = os.path.join(root, f"Mod{i:05}")
+        os.makedirs(folder)
+        for ext in (".pak", ".ucas", ".utoc"):
+            with open(os.path.join(folder, f"{i % 1000:03}_Mod{i:05}{ext}"), "wb") as f:
+                f.write(b"x")
+
+def full_walk(root):
+    count = 0
+    stack = [root]
+    while stack:
+        path = stack.pop()
+        for name in os.listdir(path):
+            full = os.path.join(path, name)
+            if os.path.isdir(full):
+                stack.append(full)
+            else:
+                os.path.getsize(full)
+                count += 1
+    return count
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, "Mods")
+        make_tree(root, count)
+        inventory = ModInventory(os.path.join(tmp, "inventory.sqlite3"))
+        start = time.perf_counter()
+        full_walk(root)
+        print(f"full walk     {time.perf_counter() - start:8.3f} s")
+        for label in ("cold refresh", "warm refresh"):
+            start = time.perf_counter()
+            counters = inventory.refresh(root)
+            print(f"{label:<13} {time.perf_counter() - start:8.3f} s  {counters}")
+        os.rename(os.path.join(root, "Mod00000", "000_Mod00000.pak"), os.path.join(root, "Mod00000", "000_Mod00000.pak.off"))
+        start = time.perf_counter()
+        counters = inventory.refresh(root)
+        print(f"one change    {time.perf_counter() - start:8.3f} s  {counters}")
+        print(inventory.list_children(root)[:2])
+        inventory.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Count how many mods need their files renamed when one mod is moved in a load
+order: dense renumbering (001, 002, ...) versus the gap-numbered LoadOrderModel.
+
+Usage:
+    python benchmarks/bench_load_order.py [mod_count] [moves]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("APPDATA", tempfile.gettempdir())
+from load_order_model import LoadOrderModel, DEFAULT_GAP, MAX_NUMBER
+
+def dense_move(order, key, position):
+    before = {k: i + 1 for i, k in enumerate(order)}
+    order.remove(key)
+    order.insert(position, key)
+    return sum(1 for i, k in enumerate(order) if before[k] != i + 1)
+
+def main():
+    mod_count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    moves = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    keys = [f"Mods/Mod{i:04d}" for i in range(mod_count)]
+    rng = random.Random(0)
+    plan = [(rng.choice(keys), rng.randrange(mod_count)) for _ in range(moves)]
+
+    order = list(keys)
+    dense = sum(dense_move(order, key, position) for key, position in plan)
+
+    gap = max(1, min(DEFAULT_GAP, MAX_NUMBER // (mod_count + 1)))
+    model = LoadOrderModel([(key, gap * (i + 1)) for i, key in enumerate(keys)])
+    start = time.perf_counter()
+    gapped = sum(len(model.insert(key, position)) for key, position in plan)
+    seconds = time.perf_counter() - start
+
+    print(f"{mod_count} mods, {moves} random moves")
+    print(f"dense numbering: {dense / moves:.1f} mods renamed per move")
+    print(f"gap numbering:   {gapped / moves:.1f} mods renamed per move ({seconds * 1000 / moves:.2f} ms per move)")
+
+if __name__ == "__main__":
+    main()
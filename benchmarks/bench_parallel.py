@@ -0,0 +1,42 @@
+"""
+Compare serial and parallel extraction of a synthetic multi-file mod archive.
+
+Usage:
+    python benchmarks/bench_parallel.py [files] [size_in_mb_per_file] [workers]
+"""
+import os
+import sys
+import tempfile
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from extraction import extract_members, default_workers
+
+def make_archive(path, files, size_mb):
+    # Half random, half zeros so the data really has to be inflated.
+    block = os.urandom(512 * 1024) + bytes(512 * 1024)
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        for i in range(files):
+            with z.open(f"ModName/Mods/File{i:03}.ucas", "w", force_zip64=True) as f:
+                for _ in range(size_mb):
+                    f.write(block)
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    size_mb = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else default_workers()
+    with tempfile.TemporaryDirectory() as tmp:
+        zip_path = os.path.join(tmp, "mod.zip")
+        make_archive(zip_path, files, size_mb)
+        with zipfile.ZipFile(zip_path) as z:
+            infos = z.infolist()
+        for label, count, processes in (("serial", 1, False),
+                                        ("threads", workers, False),
+                                        ("processes", workers, True)):
+            out = os.path.join(tmp, label)
+            jobs = [(info, os.path.join(out, *info.filename.split("/"))) for info in infos]
+            stats = extract_members(zip_path, jobs, workers=count, use_processes=processes)
+            print(f"{label:<10} {stats}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Count config.json reads and writes for a burst of settings calls, as made by tree
+builds, installs and a checkbox clicked repeatedly: the cached, debounced settings
+module versus reading and writing the file on every call.
+
+Usage:
+    python benchmarks/bench_settings.py [reads] [writes]
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["APPDATA"] = tempfile.mkdtemp(prefix="bench_settings_config_")
+import settings
+
+def uncached(reads, writes):
+    for _ in range(reads):
+        with open(settings.CONFIG_FILE) as f:
+            json.load(f).get("ITR2_Path", "")
+    for i in range(writes):
+        with open(settings.CONFIG_FILE) as f:
+            config = json.load(f)
+        config["AdvancedMode"] = bool(i % 2)
+        with open(settings.CONFIG_FILE, "w") as f:
+            json.dump(config, f, indent=4)
+
+def cached(reads, writes):
+    for _ in range(reads):
+        settings.get_ITR2_Path()
+    for i in range(writes):
+        settings.set_AdvancedMode(bool(i % 2))
+    settings.flush()
+
+def main():
+    reads = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    writes = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    try:
+        settings.save_config(settings.DEFAULT_CONFIG, delay=0)
+        start = time.perf_counter()
+        uncached(reads, writes)
+        seconds = time.perf_counter() - start
+        print(f"{reads} reads, {writes} writes")
+        print(f"file every call: {reads + writes} reads, {writes} writes in {seconds:.3f} s")
+
+        before = settings.get_config_stats()
+        start = time.perf_counter()
+        cached(reads, writes)
+        seconds = time.perf_counter() - start
+        after = settings.get_config_stats()
+        print(f"settings module: {after['disk_reads'] - before['disk_reads']} reads, "
+              f"{after['disk_writes'] - before['disk_writes']} writes in {seconds:.3f} s "
+              f"({after['cache_hits'] - before['cache_hits']} served from memory)")
+    finally:
+        shutil.rmtree(os.environ["APPDATA"], ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
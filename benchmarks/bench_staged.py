@@ -0,0 +1,48 @@
+"""
+Show that committing a staged install (installer.commit_staged) costs the same
+whatever the mod size: a new mod folder is committed with one rename.
+
+Usage:
+    python benchmarks/bench_staged.py [max_size_mb]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("APPDATA", tempfile.gettempdir())
+import installer
+
+def main():
+    max_size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    base = tempfile.mkdtemp(prefix="bench_staged_")
+    try:
+        chunk = os.urandom(1024 * 1024)
+        size_mb = 1
+        while size_mb <= max_size_mb:
+            itr2_path = os.path.join(base, f"game{size_mb}")
+            zip_file_path = os.path.join(base, f"mod{size_mb}.zip")
+            with zipfile.ZipFile(zip_file_path, "w") as z:
+                z.writestr("BenchMod/BenchMod.ucas", chunk * size_mb)
+                z.writestr("BenchMod/BenchMod.utoc", b"utoc" * 4096)
+            with zipfile.ZipFile(zip_file_path, "r") as z:
+                plan = installer.InstallPlan(installer.plan_basic_install(z, itr2_path), itr2_path)
+            staging = tempfile.mkdtemp(prefix=installer.STAGING_PREFIX, dir=installer.get_content_path(itr2_path))
+            jobs = [(info, os.path.join(staging, os.path.relpath(dest, itr2_path))) for info, dest in plan.jobs]
+            start = time.perf_counter()
+            installer.extract_members(zip_file_path, jobs)
+            extracted = time.perf_counter() - start
+            start = time.perf_counter()
+            installer.commit_staged(staging, itr2_path, [dest for _, dest in plan.jobs])
+            committed = time.perf_counter() - start
+            shutil.rmtree(staging)
+            print(f"{size_mb:>5} MB: extract {extracted:.3f} s, commit {committed * 1000:.2f} ms")
+            size_mb *= 4
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
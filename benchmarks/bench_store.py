@@ -0,0 +1,60 @@
+"""
+Compare installing a mod archive by plain extraction with installing it through the
+content store (store.ContentStore): first install, reinstall, and the disk used by
+several installed copies.
+
+Usage:
+    python benchmarks/bench_store.py [size_mb] [copies]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("APPDATA", tempfile.gettempdir())
+import installer
+from store import ContentStore
+
+def disk_usage(*paths):
+    """Bytes used below paths, counting each inode once."""
+    seen = set()
+    total = 0
+    for folder, _, files in (entry for path in paths for entry in os.walk(path)):
+        for name in files:
+            st = os.stat(os.path.join(folder, name))
+            if (st.st_dev, st.st_ino) not in seen:
+                seen.add((st.st_dev, st.st_ino))
+                total += st.st_size
+    return total
+
+def main():
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    copies = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    base = tempfile.mkdtemp(prefix="bench_store_")
+    try:
+        zip_file_path = os.path.join(base, "mod.zip")
+        chunk = os.urandom(1024 * 1024)
+        with zipfile.ZipFile(zip_file_path, "w", zipfile.ZIP_DEFLATED) as z:
+            z.writestr("BenchMod/BenchMod.pak", chunk * size_mb)
+            z.writestr("BenchMod/BenchMod.utoc", b"utoc" * 4096)
+        store = ContentStore(os.path.join(base, "store"))
+        for label, use_store in (("plain", False), ("store", True)):
+            folder = os.path.join(base, label)
+            timings = []
+            for i in range(copies):
+                start = time.perf_counter()
+                installer.install_basic_mod(zip_file_path, os.path.join(folder, str(i)),
+                                            store=store if use_store else None)
+                timings.append(time.perf_counter() - start)
+            used = disk_usage(folder, store.root) if use_store else disk_usage(folder)
+            print(f"{label}: first install {timings[0]:.3f} s, next installs "
+                  f"{sum(timings[1:]) / max(1, copies - 1):.3f} s each, "
+                  f"{used / (1024 * 1024):.1f} MB on disk for {copies} copies")
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
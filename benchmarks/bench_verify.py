@@ -0,0 +1,59 @@
+"""
+Time verifying installed mods against their install manifests (manifests.py): the
+size+mtime fast path, the hashing path after every file was touched, and hashing
+everything as a baseline.
+
+Usage:
+    python benchmarks/bench_verify.py [mods] [size_kb]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["APPDATA"] = tempfile.mkdtemp(prefix="bench_verify_config_")
+import installer
+from manifests import Manifest, hash_file, list_manifests, verify_manifests
+
+def main():
+    mods = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    size_kb = int(sys.argv[2]) if len(sys.argv) > 2 else 512
+    base = tempfile.mkdtemp(prefix="bench_verify_")
+    try:
+        itr2_path = os.path.join(base, "game")
+        data = os.urandom(size_kb * 1024)
+        start = time.perf_counter()
+        for i in range(mods):
+            zip_file_path = os.path.join(base, f"Mod{i}.zip")
+            with zipfile.ZipFile(zip_file_path, "w") as z:
+                z.writestr(f"Mod{i}/Mod{i}.pak", data + i.to_bytes(4, "little"))
+                z.writestr(f"Mod{i}/Mod{i}.utoc", b"utoc" * 256)
+            installer.install_basic_mod(zip_file_path, itr2_path, workers=1,
+                                        manifest=Manifest.for_archive(zip_file_path, itr2_path))
+        print(f"Installed {mods} mods with manifests in {time.perf_counter() - start:.2f} s")
+
+        report = verify_manifests(itr2_path=itr2_path)
+        print(f"verify (unchanged):  {report}")
+
+        for name in list_manifests():
+            manifest = Manifest.load(name)
+            for rel in manifest.files:
+                os.utime(manifest.resolve(rel), None)
+        report = verify_manifests(itr2_path=itr2_path)
+        print(f"verify (all touched): {report}")
+
+        start = time.perf_counter()
+        for name in list_manifests():
+            manifest = Manifest.load(name)
+            for rel in manifest.files:
+                hash_file(manifest.resolve(rel))
+        print(f"hash everything serially: {time.perf_counter() - start:.2f} s")
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+        shutil.rmtree(os.environ["APPDATA"], ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Compare extracting a stored (ZIP_STORED) member through ZipFile.open with the
+zero-copy path of extraction.copy_stored_member, against a raw file copy.
+
+Usage:
+    python benchmarks/bench_zero_copy.py [size_mb]
+"""
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from extraction import copy_stored_member, preallocate, stream_member
+
+def timed(label, size, func, dest):
+    if os.path.exists(dest):
+        os.remove(dest)
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+    print(f"{label:<28} {seconds:.3f} s ({size / (1024 * 1024) / seconds:.0f} MB/s)")
+
+def main():
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 512
+    base = tempfile.mkdtemp(prefix="bench_zero_copy_")
+    try:
+        zip_file_path = os.path.join(base, "mod.zip")
+        chunk = os.urandom(1024 * 1024)
+        with zipfile.ZipFile(zip_file_path, "w", zipfile.ZIP_STORED) as z:
+            with z.open("BenchMod/BenchMod.ucas", "w", force_zip64=True) as f:
+                for _ in range(size_mb):
+                    f.write(chunk)
+        size = size_mb * 1024 * 1024
+        dest = os.path.join(base, "out.ucas")
+
+        def run(copy, digest=None):
+            with zipfile.ZipFile(zip_file_path, "r") as z, open(dest, "wb") as target_file:
+                info = z.getinfo("BenchMod/BenchMod.ucas")
+                preallocate(target_file, info.file_size)
+                copy(z, info, target_file, digest=digest)
+
+        timed("raw copy (shutil.copyfile)", size, lambda: shutil.copyfile(zip_file_path, dest), dest)
+        timed("ZipFile.open streaming", size, lambda: run(stream_member), dest)
+        timed("zero copy", size, lambda: run(copy_stored_member), dest)
+        timed("streaming + sha256", size, lambda: run(stream_member, hashlib.sha256()), dest)
+        timed("zero copy + sha256", size, lambda: run(copy_stored_member, hashlib.sha256()), dest)
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""
+Command-line interface of the mod manager, for scripting installs and load orders.
+
+It uses the same core modules as the GUI and never imports tkinter, customtkinter
+or PIL, so it starts quickly and runs on machines without a display.
+
+Examples:
+    python cli.py list
+    python cli.py install MyMod.zip OtherMod.zip
+    python cli.py install-fomod Big.zip --plugin "Options/Hard mode"
+    python cli.py disable Mods/MyMod LogicMods/Other
+    python cli.py load-order set Mods/MyMod=010 Mods/Other=020 --dry-run
+    python cli.py profile apply Vanilla
+    python cli.py verify
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import zipfile
+import settings
+
+# Mod roots below Paks, as used in mod keys like "Mods/MyMod".
+MOD_ROOTS = ["Mods", "LogicMods", "LuaMods"]
+
+class CommandError(Exception):
+    """An error reported to the user as a message instead of a traceback."""
+
+def _game_path(args):
+    itr2_path = args.game or settings.get_ITR2_Path()
+    if not itr2_path:
+        raise CommandError("ITR2 path is not set; pass --game or set it in the GUI.")
+    if not os.path.isdir(itr2_path):
+        raise CommandError(f"ITR2 folder not found: {itr2_path}")
+    return itr2_path
+
+def _split_key(key):
+    """Split a mod key "Mods/Folder/Mod" into ("Mods", "Folder/Mod")."""
+    key = key.replace("\\", "/").strip("/")
+    root_name, _, rel = key.partition("/")
+    if root_name not in MOD_ROOTS or not rel:
+        raise CommandError(f"Invalid mod '{key}': expected <{'|'.join(MOD_ROOTS)}>/<mod folder>")
+    return root_name, rel
+
+def _mods_root(itr2_path, root_name):
+    from installer import get_paks_path
+    return os.path.join(get_paks_path(itr2_path), root_name)
+
+def _extract_options(args):
+    from store import configured_store
+    workers = args.workers if args.workers is not None else settings.get_ExtractWorkers()
+    mode = args.mode or settings.get_ExtractMode()
+    store = None if args.no_store else configured_store(_game_path(args))
+    return {"workers": workers, "use_processes": mode == "process", "store": store}
+
+def cmd_list(args):
+    from profiles import current_state
+    state = current_state(_game_path(args))
+    for root_name, mods in state.items():
+        if args.root and root_name != args.root:
+            continue
+        for rel in sorted(mods, key=str.lower):
+            node = mods[rel]
+            status = "enabled " if node.enabled else "disabled"
+            print(f"{status}  {node.prefix or '---'}  {root_name}/{rel}")
+    return 0
+
+def cmd_install(args):
+    import installer
+    from manifests import Manifest
+    itr2_path = _game_path(args)
+    options = _extract_options(args)
+    install = installer.upgrade_basic_mod if args.upgrade else installer.install_basic_mod
+    for zip_file_path in args.archives:
+        if args.dry_run:
+            with zipfile.ZipFile(zip_file_path, "r") as z:
+                plan = installer.InstallPlan(installer.plan_basic_install(z, itr2_path), itr2_path)
+            print(f"{os.path.basename(zip_file_path)}: {len(plan.jobs)} files, "
+                  f"{plan.total_bytes / (1024 * 1024):.1f} MB, {len(plan.overwrites)} overwritten")
+            if plan.overwrites:
+                print(plan.describe_overwrites())
+            continue
+        stats = install(zip_file_path, itr2_path, manifest=Manifest.for_archive(zip_file_path, itr2_path), **options)
+        print(f"Installed {os.path.basename(zip_file_path)}: {stats}")
+    return 0
+
+def cmd_install_fomod(args):
+    import installer
+    from fomod_model import FomodSelection, read_moduleconfig
+    itr2_path = _game_path(args)
+    plugin_options = read_moduleconfig(args.archive)
+    if plugin_options is None:
+        raise CommandError("ModuleConfig.xml not found in the ZIP.")
+    selection = FomodSelection(plugin_options)
+    choices = {}
+    if args.choices:
+        with open(args.choices, "r") as f:
+            choices = json.load(f)
+    for name in args.plugin or []:
+        step_name, _, plugin_name = name.rpartition("/")
+        choices.setdefault(step_name, []).append(plugin_name)
+    unknown = selection.apply_choices(choices)
+    if unknown:
+        raise CommandError("Unknown plugin(s): " + ", ".join(unknown))
+    if args.list_plugins or not len(selection):
+        for step in plugin_options:
+            for plugin in step["plugins"]:
+                print(f"{step['installStep']}/{plugin['name']}")
+        if not args.list_plugins:
+            raise CommandError("No plugins selected; pass --plugin or --choices.")
+        return 0
+    if args.save_choices:
+        with open(args.save_choices, "w") as f:
+            json.dump(selection.choices(), f, indent=4)
+    from manifests import Manifest
+    stats = installer.install_fomod_plugins(args.archive, itr2_path, selection.selected_plugins(),
+                                            manifest=Manifest.for_archive(args.archive, itr2_path),
+                                            **_extract_options(args))
+    print(f"Installed {os.path.basename(args.archive)}: {stats}")
+    return 0
+
+def cmd_set_enabled(args, enabled):
+    import modstate
+    itr2_path = _game_path(args)
+    changes = {}
+    for key in args.mods:
+        root_name, rel = _split_key(key)
+        changes.setdefault(root_name, []).append((rel, enabled))
+    for root_name, root_changes in changes.items():
+        ops = modstate.plan_moves(_mods_root(itr2_path, root_name), root_changes)
+        try:
+            modstate.apply_moves(ops)
+        except modstate.BulkMoveError as e:
+            raise CommandError(str(e))
+        print(f"{root_name}: {len(ops)} mod(s) {'enabled' if enabled else 'disabled'}")
+    return 0
+
+def cmd_load_order(args):
+    from load_order_model import load_entries
+    from prefixes import plan_load_order, format_renames, apply_renames
+    entries = load_entries(_game_path(args))
+    if args.action == "show":
+        numbered = sorted((value, key) for key, _, value in entries.items() if value)
+        for value, key in numbered:
+            print(f"{value}  {key}")
+        return 0
+    if args.action == "reset":
+        entries.reset()
+    known = {key for key, _, _ in entries.items()}
+    for assignment in args.assignments:
+        key, _, value = assignment.partition("=")
+        root_name, rel = _split_key(key)
+        key = f"{root_name}/{rel}"
+        if key not in known:
+            raise CommandError(f"Mod not found: {key}")
+        if value and (not value.isdigit() or len(value) > 3):
+            raise CommandError(f"Invalid load order number for {key}: {value}")
+        entries.set_value(key, value)
+    start = time.perf_counter()
+    renames = plan_load_order(entries.rename_entries())
+    if not renames:
+        print("Load order unchanged, nothing to rename.")
+        return 0
+    print(f"{len(renames)} file(s) to rename:")
+    print(format_renames(renames, limit=len(renames) if args.verbose else 20))
+    if args.dry_run:
+        return 0
+    failures = apply_renames(renames)
+    print(f"{len(renames) - len(failures)} renames in {time.perf_counter() - start:.3f} s")
+    if failures:
+        raise CommandError(f"{len(failures)} file(s) could not be renamed, e.g. {failures[0][0]}: {failures[0][1]}")
+    return 0
+
+def cmd_profile(args):
+    import profiles
+    if args.action == "list":
+        for name in profiles.list_profiles():
+            print(name)
+        return 0
+    if not args.name:
+        raise CommandError("A profile name is required.")
+    if args.action == "save":
+        profiles.save_profile(args.name, profiles.capture_profile(_game_path(args)))
+        print(f"Saved profile {args.name}")
+    elif args.action == "apply":
+        import modstate
+        try:
+            count, seconds = profiles.switch_profile(_game_path(args), args.name)
+        except modstate.BulkMoveError as e:
+            raise CommandError(str(e))
+        print(f"Switched to profile {args.name}: {count} changes in {seconds:.2f} s")
+    elif args.action == "delete":
+        profiles.delete_profile(args.name)
+    return 0
+
+def cmd_conflicts(args):
+    from pakindex import scan_conflicts
+    report = scan_conflicts(_game_path(args))
+    print(report.format(examples=args.examples))
+    return 2 if report.conflicts and args.fail_on_conflict else 0
+
+def cmd_verify(args):
+    from manifests import list_manifests, verify_manifests
+    names = args.mods or None
+    if names:
+        unknown = [name for name in names if name not in list_manifests()]
+        if unknown:
+            raise CommandError("No manifest for: " + ", ".join(unknown))
+    report = verify_manifests(names, _game_path(args), workers=args.workers or None)
+    print(report)
+    return 0 if report.ok else 2
+
+def cmd_store_gc(args):
+    from store import get_store
+    removed, freed, damaged = get_store(_game_path(args)).collect_garbage()
+    print(f"Removed {removed} unused file(s) from the store, {freed / (1024 * 1024):.1f} MB freed")
+    if damaged:
+        print(f"Evicted {damaged} damaged file(s) whose content no longer matched their hash")
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="ITR2 Mod Manager command line")
+    parser.add_argument("--game", help="ITR2 game folder (defaults to the one set in the GUI)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="List installed mods with their state and load order")
+    list_parser.add_argument("--root", choices=MOD_ROOTS)
+    list_parser.set_defaults(func=cmd_list)
+
+    for name, func, help_text in (("install", cmd_install, "Install basic mod archives"),
+                                  ("install-fomod", cmd_install_fomod, "Install a Fomod archive")):
+        install_parser = commands.add_parser(name, help=help_text)
+        install_parser.add_argument("--workers", type=int, help="Extraction workers (0: automatic)")
+        install_parser.add_argument("--mode", choices=["thread", "process"])
+        install_parser.add_argument("--no-store", action="store_true",
+                                    help="Extract plain copies instead of linking from the content store")
+        install_parser.set_defaults(func=func)
+        if name == "install":
+            install_parser.add_argument("archives", nargs="+")
+            install_parser.add_argument("--upgrade", action="store_true",
+                                        help="Replace the installed version: only write changed files "
+                                             "and remove files the new version dropped")
+            install_parser.add_argument("--dry-run", action="store_true",
+                                        help="Only show the install plan (files, size, overwrites)")
+        else:
+            install_parser.add_argument("archive")
+            install_parser.add_argument("--plugin", action="append", help='Plugin to install, as "Step/Plugin"')
+            install_parser.add_argument("--choices", help="JSON file of saved choices ({step: [plugins]})")
+            install_parser.add_argument("--save-choices", help="Write the selected choices to this JSON file")
+            install_parser.add_argument("--list-plugins", action="store_true", help="Only list the plugins")
+
+    for name, enabled in (("enable", True), ("disable", False)):
+        toggle_parser = commands.add_parser(name, help=f"{name.capitalize()} mods, e.g. Mods/MyMod")
+        toggle_parser.add_argument("mods", nargs="+")
+        toggle_parser.set_defaults(func=lambda args, enabled=enabled: cmd_set_enabled(args, enabled))
+
+    order_parser = commands.add_parser("load-order", help="Show or change load-order prefixes")
+    order_parser.add_argument("action", choices=["show", "set", "reset"])
+    order_parser.add_argument("assignments", nargs="*", help='"Mods/MyMod=010" (empty number removes the prefix)')
+    order_parser.add_argument("--dry-run", action="store_true", help="Only show the renames")
+    order_parser.add_argument("--verbose", action="store_true", help="Show every rename")
+    order_parser.set_defaults(func=cmd_load_order)
+
+    profile_parser = commands.add_parser("profile", help="List, save, apply or delete mod profiles")
+    profile_parser.add_argument("action", choices=["list", "save", "apply", "delete"])
+    profile_parser.add_argument("name", nargs="?")
+    profile_parser.set_defaults(func=cmd_profile)
+    conflicts_parser = commands.add_parser("conflicts", help="Report assets overridden by several mods")
+    conflicts_parser.add_argument("--examples", type=int, default=5, help="Assets listed per pair of mods")
+    conflicts_parser.add_argument("--fail-on-conflict", action="store_true", help="Exit with status 2 on conflicts")
+    conflicts_parser.set_defaults(func=cmd_conflicts)
+
+    verify_parser = commands.add_parser("verify", help="Check installed mods against their install manifests")
+    verify_parser.add_argument("mods", nargs="*", help="Archive names to check (default: all)")
+    verify_parser.add_argument("--workers", type=int, help="Hashing threads (0: automatic)")
+    verify_parser.set_defaults(func=cmd_verify)
+
+    gc_parser = commands.add_parser("store-gc", help="Delete stored files no installed mod uses any more")
+    gc_parser.set_defaults(func=cmd_store_gc)
+    return parser
+
+def main(argv=None):
+    from extraction import ExtractCancelled
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except (CommandError, OSError, ValueError, zipfile.BadZipFile) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    except ExtractCancelled:
+        print("Error: extraction cancelled", file=sys.stderr)
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+import time
+import customtkinter as ctk
+import settings
+from pakindex import scan_conflicts
+
+def open_conflicts_window(parent):
+    """
+    Open a window (800x600) listing the assets that more than one enabled mod
+    overrides, grouped by the mods involved, with the mod that wins under the
+    current load order first. "Rescan" reparses only pak files that changed.
+    """
+    conflicts_window = ctk.CTkToplevel(parent)
+    conflicts_window.title("Mod Conflicts")
+    conflicts_window.geometry("800x600")
+    conflicts_window.resizable(False, False)
+    conflicts_window.transient(parent)
+    conflicts_window.grab_set()
+    conflicts_window.lift(parent)
+
+    button_frame = ctk.CTkFrame(conflicts_window, fg_color=conflicts_window.cget("fg_color"), corner_radius=0)
+    button_frame.pack(fill="x", pady=5, padx=10)
+    status_label = ctk.CTkLabel(button_frame, text="", anchor="w")
+
+    textbox = ctk.CTkTextbox(conflicts_window, wrap="none")
+    textbox.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+
+    def rescan():
+        itr2_path = settings.get_ITR2_Path()
+        if not itr2_path:
+            text = "ITR2 path not set"
+            status = ""
+        else:
+            start = time.perf_counter()
+            report = scan_conflicts(itr2_path)
+            text = report.format() if report.conflicts or report.errors else "No conflicts found"
+            status = (f"{report.files} pak files scanned in {time.perf_counter() - start:.2f} s "
+                      f"({report.stats.get('parsed', 0)} parsed)")
+        textbox.configure(state="normal")
+        textbox.delete("1.0", "end")
+        textbox.insert("1.0", text)
+        textbox.configure(state="disabled")
+        status_label.configure(text=status)
+
+    rescan_button = ctk.CTkButton(button_frame, text="Rescan", command=rescan)
+    rescan_button.pack(side="left", padx=5)
+    status_label.pack(side="left", padx=10, fill="x", expand=True)
+
+    rescan()
+    return conflicts_window
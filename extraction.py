@@ -0,0 +1,437 @@
+import errno
+import hashlib
+import mmap
+import os
+import shutil
+import struct
+import sys
+import threading
+import time
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from store import remove_file
+
+# Size of the copy buffer used when streaming a zip member to disk.
+# Memory used by an extraction never grows past this, whatever the member size.
+BUFFER_SIZE = 1024 * 1024
+
+# Upper bound for the default number of extraction workers.
+MAX_DEFAULT_WORKERS = 8
+
+# Bytes copied per system call when a stored member is copied without Python buffers.
+ZERO_COPY_CHUNK = 16 * 1024 * 1024
+
+# Errors meaning a kernel copy call is not supported here (old kernel, other
+# filesystem, platform); the next method is tried instead.
+ZERO_COPY_UNSUPPORTED = {errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EOPNOTSUPP, errno.EPERM,
+                         errno.ENOTSOCK, getattr(errno, "ENOTSUP", errno.EOPNOTSUPP)}
+
+# Local file header: signature, versions, flags, method, time, date, CRC, sizes, name and extra lengths.
+LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+
+class ExtractCancelled(Exception):
+    """Raised inside an extraction when its cancel event has been set."""
+
+def _zero_copy_methods():
+    methods = []
+    if hasattr(os, "copy_file_range"):
+        methods.append("copy_file_range")
+    # Only Linux can sendfile into a regular file; elsewhere the target must be a socket.
+    if hasattr(os, "sendfile") and sys.platform.startswith("linux"):
+        methods.append("sendfile")
+    methods.append("mmap")
+    return methods
+
+def preallocate(target_file, size):
+    """
+    Give a new, empty file its final size before it is written. Where os.posix_fallocate
+    works the disk space is reserved, so a full disk fails here; otherwise the file is
+    only extended with truncate(), which may leave it sparse.
+    """
+    if not size:
+        return
+    if hasattr(os, "posix_fallocate"):
+        target_file.flush()
+        try:
+            os.posix_fallocate(target_file.fileno(), 0, size)
+            return
+        except OSError as e:
+            if e.errno not in ZERO_COPY_UNSUPPORTED:
+                raise
+    target_file.truncate(size)
+
+def copy_stored_member(z, info, target_file, progress=None, cancel=None, digest=None):
+    """
+    Copy a stored (uncompressed, unencrypted) member straight from the archive file.
+
+    The member's data offset is read from its local header, then the bytes are moved
+    by the kernel with os.copy_file_range, or os.sendfile on Linux, without passing
+    through Python buffers. Where neither works (e.g. on Windows) they are written from
+    an mmap of the archive. The ZIP CRC is always computed over the mapped data, and
+    when digest is given the data is hashed from the same mapping.
+
+    Args:
+        z (zipfile.ZipFile): The open archive.
+        info (zipfile.ZipInfo): The member.
+        target_file: The destination, opened for binary writing and still empty.
+        progress (ExtractProgress): Optional progress counter, advanced per chunk.
+        cancel (threading.Event): Optional event; when set, ExtractCancelled is raised.
+        digest: Optional hashlib object updated with the member's data.
+
+    Returns:
+        bool: False if the member is compressed or encrypted (nothing was copied).
+
+    Raises:
+        zipfile.BadZipFile: If the member's data is truncated or fails its CRC check.
+    """
+    if info.compress_type != zipfile.ZIP_STORED or info.flag_bits & 0x1 or not isinstance(z.filename, str):
+        return False
+    size = info.file_size
+    with open(z.filename, "rb") as source:
+        source.seek(info.header_offset)
+        header = source.read(LOCAL_HEADER.size)
+        if len(header) != LOCAL_HEADER.size or header[:4] != b"PK\x03\x04":
+            raise zipfile.BadZipFile(f"Bad local file header for {info.filename}")
+        fields = LOCAL_HEADER.unpack(header)
+        offset = info.header_offset + LOCAL_HEADER.size + fields[-2] + fields[-1]
+        if offset + size > os.fstat(source.fileno()).st_size:
+            raise zipfile.BadZipFile(f"Truncated data for {info.filename}")
+        if not size:
+            return True
+        target_file.flush()
+        src_fd, dst_fd = source.fileno(), target_file.fileno()
+        methods = _zero_copy_methods()
+        mapped = mmap.mmap(src_fd, 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapped)
+        crc = 0
+        try:
+            done = 0
+            while done < size:
+                if cancel is not None and cancel.is_set():
+                    raise ExtractCancelled()
+                count = min(ZERO_COPY_CHUNK, size - done)
+                try:
+                    if methods[0] == "copy_file_range":
+                        copied = os.copy_file_range(src_fd, dst_fd, count, offset + done, done)
+                    elif methods[0] == "sendfile":
+                        os.lseek(dst_fd, done, os.SEEK_SET)
+                        copied = os.sendfile(dst_fd, src_fd, offset + done, count)
+                    else:
+                        os.lseek(dst_fd, done, os.SEEK_SET)
+                        copied = os.write(dst_fd, view[offset + done:offset + done + count])
+                except OSError as e:
+                    if methods[0] == "mmap" or e.errno not in ZERO_COPY_UNSUPPORTED:
+                        raise
+                    methods.pop(0)
+                    continue
+                if copied <= 0:
+                    raise zipfile.BadZipFile(f"Unexpected end of data for {info.filename}")
+                chunk = view[offset + done:offset + done + copied]
+                if digest is not None:
+                    digest.update(chunk)
+                crc = zlib.crc32(chunk, crc)
+                chunk.release()
+                done += copied
+                if progress is not None:
+                    progress.advance(copied)
+        finally:
+            view.release()
+            mapped.close()
+        if crc != info.CRC:
+            raise zipfile.BadZipFile(f"Bad CRC-32 for file {info.filename!r}")
+    return True
+
+def extract_member(z, member, final_dest, buffer_size=BUFFER_SIZE, progress=None, cancel=None, digest=None):
+    """
+    Stream a single zip member to final_dest using a fixed-size buffer.
+
+    The destination file is preallocated to the member's uncompressed size
+    (ZipInfo.file_size) before copying, so large .ucas/.pak files do not grow
+    the file piece by piece. Where os.posix_fallocate is available the space is
+    reserved up front and a full disk fails before any data is written; elsewhere
+    the file is only extended, and running out of space shows up mid-copy.
+    Stored members are copied without Python buffers (see copy_stored_member).
+
+    Args:
+        z (zipfile.ZipFile): The open archive.
+        member (str | zipfile.ZipInfo): The member to extract.
+        final_dest (str): The full destination file path.
+        buffer_size (int): Size of the copy buffer in bytes.
+        progress (ExtractProgress): Optional progress counter, advanced per buffer.
+        cancel (threading.Event): Optional event; when set, ExtractCancelled is raised.
+        digest: Optional hashlib object updated with the data as it is written, so
+            the file does not have to be read back to be hashed.
+
+    Returns:
+        int: The number of bytes written.
+    """
+    info = member if not isinstance(member, str) else z.getinfo(member)
+    os.makedirs(os.path.dirname(final_dest), exist_ok=True)
+    # Writing into an existing file would also change every hardlink to it (such as a
+    # content-store object), so the old file is replaced rather than overwritten.
+    if os.path.lexists(final_dest):
+        remove_file(final_dest)
+    with open(final_dest, "wb") as target_file:
+        preallocate(target_file, info.file_size)
+        if not copy_stored_member(z, info, target_file, progress, cancel, digest):
+            stream_member(z, info, target_file, buffer_size, progress, cancel, digest)
+    if progress is not None:
+        progress.advance(files=1)
+    return info.file_size
+
+def stream_member(z, info, target_file, buffer_size=BUFFER_SIZE, progress=None, cancel=None, digest=None):
+    """Decompress a member through ZipFile.open into target_file, buffer by buffer."""
+    with z.open(info) as source:
+        if progress is None and cancel is None and digest is None:
+            shutil.copyfileobj(source, target_file, buffer_size)
+            return
+        while True:
+            if cancel is not None and cancel.is_set():
+                raise ExtractCancelled()
+            chunk = source.read(buffer_size)
+            if not chunk:
+                break
+            target_file.write(chunk)
+            if digest is not None:
+                digest.update(chunk)
+            if progress is not None:
+                progress.advance(len(chunk))
+
+def default_workers():
+    """
+    Return the default number of extraction workers for this machine.
+    """
+    return max(1, min(MAX_DEFAULT_WORKERS, os.cpu_count() or 1))
+
+class ExtractStats:
+    """
+    Summary of an extraction run: files and bytes written and the time it took.
+    commit_seconds is set by installer.install_staged to the time its commit took.
+    """
+    def __init__(self, files=0, total_bytes=0, seconds=0.0, workers=1):
+        self.files = files
+        self.total_bytes = total_bytes
+        self.seconds = seconds
+        self.workers = workers
+        self.commit_seconds = 0.0
+
+    @property
+    def mb_per_s(self):
+        if self.seconds <= 0:
+            return 0.0
+        return self.total_bytes / (1024 * 1024) / self.seconds
+
+    def __str__(self):
+        return (f"{self.files} files, {self.total_bytes / (1024 * 1024):.1f} MB in "
+                f"{self.seconds:.2f} s ({self.mb_per_s:.1f} MB/s, {self.workers} workers)")
+
+class ExtractProgress:
+    """
+    Thread-safe counters shared by the workers of an extraction.
+
+    Workers call advance() as data is written; readers (e.g. the GUI thread)
+    call snapshot() to get a consistent view with throughput and ETA.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.total_files = 0
+        self.total_bytes = 0
+        self.files_done = 0
+        self.bytes_done = 0
+        self.started = time.perf_counter()
+
+    def start(self, total_files, total_bytes):
+        with self._lock:
+            self.total_files = total_files
+            self.total_bytes = total_bytes
+            self.started = time.perf_counter()
+
+    def advance(self, nbytes=0, files=0):
+        with self._lock:
+            self.bytes_done += nbytes
+            self.files_done += files
+
+    def snapshot(self):
+        """
+        Return the current state as a dict with the keys files_done, total_files,
+        bytes_done, total_bytes, mb_per_s and eta (seconds, or None if unknown).
+        """
+        with self._lock:
+            files_done, bytes_done = self.files_done, self.bytes_done
+            total_files, total_bytes = self.total_files, self.total_bytes
+            elapsed = time.perf_counter() - self.started
+        rate = bytes_done / elapsed if elapsed > 0 else 0.0
+        eta = (total_bytes - bytes_done) / rate if rate > 0 else None
+        return {
+            "files_done": files_done,
+            "total_files": total_files,
+            "bytes_done": bytes_done,
+            "total_bytes": total_bytes,
+            "mb_per_s": rate / (1024 * 1024),
+            "eta": eta,
+        }
+
+# Archive handles (and content stores) opened by process-pool workers, one each per process.
+_process_handles = {}
+
+def _process_extract(zip_file_path, name, final_dest, store_root=None, hashed=False):
+    z = _process_handles.get(zip_file_path)
+    if z is None:
+        z = zipfile.ZipFile(zip_file_path, "r")
+        _process_handles[zip_file_path] = z
+    info = z.getinfo(name)
+    if store_root is None:
+        digest = hashlib.sha256() if hashed else None
+        written = extract_member(z, info, final_dest, digest=digest)
+        return written, digest.hexdigest() if hashed else None
+    store = _process_handles.get(("store", store_root))
+    if store is None:
+        from store import ContentStore
+        store = _process_handles[("store", store_root)] = ContentStore(store_root)
+    return info.file_size, store.install_member(z, info, final_dest)
+
+def remove_partial(created_files, created_dirs):
+    """
+    Delete the files and (now empty) folders created by an interrupted extraction.
+    """
+    for path in created_files:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    # Deepest folders first so parents are empty by the time we reach them.
+    for folder in sorted(created_dirs, key=len, reverse=True):
+        try:
+            os.rmdir(folder)
+        except OSError:
+            pass
+
+def extract_members(zip_file_path, jobs, workers=None, use_processes=False, progress=None, cancel=None,
+                    store=None, manifest=None):
+    """
+    Extract many members of one archive, spreading them over a pool of workers.
+
+    Each worker reads through its own ZipFile handle, so members are decompressed
+    concurrently (zlib releases the GIL while inflating). Members are scheduled
+    largest first so one big .ucas file does not end up running alone at the end.
+
+    If the extraction fails or is cancelled, the files and folders it created are
+    removed again before the exception is re-raised.
+
+    Args:
+        zip_file_path (str): Path to the archive.
+        jobs (list): (zipfile.ZipInfo, final_dest) pairs to extract.
+        workers (int): Number of workers; defaults to default_workers().
+        use_processes (bool): Use a process pool instead of threads. Progress is then
+            reported per finished file instead of per buffer.
+        progress (ExtractProgress): Optional progress counter.
+        cancel (threading.Event): Optional event that stops the extraction when set.
+        store (store.ContentStore): If given, members are written into this content
+            store and installed as hardlinks to it (see ContentStore.install_member).
+        manifest (manifests.Manifest): If given, every written file is recorded in it
+            with its size, mtime and SHA-256, hashed while extracting.
+
+    Returns:
+        ExtractStats: Files, bytes, elapsed time and throughput of the run.
+
+    Raises:
+        ExtractCancelled: If cancel was set before all members were written.
+    """
+    if workers is None or workers < 1:
+        workers = default_workers()
+    # Several jobs may target the same file (e.g. overlapping Fomod plugins);
+    # keep only the last one, which is the one that would win serially.
+    unique = {}
+    for info, dest in jobs:
+        unique[os.path.normcase(os.path.normpath(dest))] = (info, dest)
+    jobs = sorted(unique.values(), key=lambda job: job[0].file_size, reverse=True)
+    workers = max(1, min(workers, len(jobs)))
+    if progress is not None:
+        progress.start(len(jobs), sum(info.file_size for info, _ in jobs))
+    start = time.perf_counter()
+
+    # Remember what did not exist yet, so a failed run can be cleaned up.
+    created_files = [dest for _, dest in jobs if not os.path.exists(dest)]
+    created_dirs = []
+    # Create destination folders up front so workers never race on makedirs.
+    for folder in {os.path.dirname(dest) for _, dest in jobs}:
+        missing = folder
+        while missing and not os.path.isdir(missing):
+            created_dirs.append(missing)
+            parent = os.path.dirname(missing)
+            if parent == missing:
+                break
+            missing = parent
+        os.makedirs(folder, exist_ok=True)
+
+    def install(z, info, dest):
+        if store is not None:
+            sha256 = store.install_member(z, info, dest, progress=progress, cancel=cancel)
+        elif manifest is not None:
+            digest = hashlib.sha256()
+            extract_member(z, info, dest, progress=progress, cancel=cancel, digest=digest)
+            sha256 = digest.hexdigest()
+        else:
+            return extract_member(z, info, dest, progress=progress, cancel=cancel)
+        if manifest is not None:
+            manifest.add(dest, info, sha256)
+        return info.file_size
+
+    total = 0
+    try:
+        if workers == 1:
+            with zipfile.ZipFile(zip_file_path, "r") as z:
+                for info, dest in jobs:
+                    total += install(z, info, dest)
+        elif use_processes:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                store_root = store.root if store is not None else None
+                futures = [pool.submit(_process_extract, zip_file_path, info.filename, dest, store_root,
+                                       manifest is not None)
+                           for info, dest in jobs]
+                try:
+                    for (info, dest), future in zip(jobs, futures):
+                        if cancel is not None and cancel.is_set():
+                            raise ExtractCancelled()
+                        written, sha256 = future.result()
+                        if manifest is not None:
+                            manifest.add(dest, info, sha256)
+                        total += written
+                        if progress is not None:
+                            progress.advance(written, 1)
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    raise
+        else:
+            local = threading.local()
+            handles = []
+            handles_lock = threading.Lock()
+
+            def run(info, dest):
+                z = getattr(local, "zip", None)
+                if z is None:
+                    z = local.zip = zipfile.ZipFile(zip_file_path, "r")
+                    with handles_lock:
+                        handles.append(z)
+                return install(z, info, dest)
+
+            try:
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    futures = [pool.submit(run, info, dest) for info, dest in jobs]
+                    try:
+                        for future in futures:
+                            total += future.result()
+                    except BaseException:
+                        for future in futures:
+                            future.cancel()
+                        raise
+            finally:
+                for z in handles:
+                    z.close()
+    except BaseException:
+        remove_partial(created_files, created_dirs)
+        raise
+
+    return ExtractStats(len(jobs), total, time.perf_counter() - start, workers)
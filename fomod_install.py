@@ -1,12 +1,18 @@
-import os
-import re
 import zipfile
-import io
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
-from PIL import Image
-import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from thumbnails import ThumbnailLoader
+from fomod_model import FomodSelection, read_moduleconfig
 import settings
+import installer
+from jobs import InstallJob
+from store import configured_store
+from manifests import Manifest
+from job_window import open_job_window
+
+# Number of built Fomod pages kept alive while navigating; older ones are rebuilt on demand.
+MAX_RETAINED_PAGES = 8
 
 def open_fomod_install_window(parent):
     """
@@ -43,56 +49,15 @@ def select_zip_file(fomod_win):
     )
     if file_path:
         try:
-            with zipfile.ZipFile(file_path, 'r') as z:
-                modconfig_filename = next((f for f in z.namelist() if f.lower().endswith("moduleconfig.xml")), None)
-                if not modconfig_filename:
-                    messagebox.showerror("Error", "ModuleConfig.xml not found in the ZIP.", parent=fomod_win)
-                    return
-                modconfig_data = z.read(modconfig_filename)
-                modconfig_root = ET.fromstring(modconfig_data)
-                plugin_options = parse_moduleconfig(modconfig_root)
-                # Use the paged UI rather than the single long list:
-                show_fomod_choices_paged(fomod_win, file_path, plugin_options)
+            plugin_options = read_moduleconfig(file_path)
+            if plugin_options is None:
+                messagebox.showerror("Error", "ModuleConfig.xml not found in the ZIP.", parent=fomod_win)
+                return
+            # Use the paged UI rather than the single long list:
+            show_fomod_choices_paged(fomod_win, file_path, plugin_options)
         except Exception as e:
             messagebox.showerror("Error", f"Could not process ZIP file: {e}", parent=fomod_win)
 
-def parse_moduleconfig(root):
-    """
-    Parse ModuleConfig.xml and return a list of installStep dicts.
-    Each dict has keys:
-      'installStep': name,
-      'plugins': list of plugin dicts with keys 'name', 'description', 'image_path', 'files'
-              where 'files' is a list of dictionaries with keys 'source' and 'destination'
-    """
-    options = []
-    install_steps = root.find("installSteps")
-    if install_steps is not None:
-        for instep in install_steps.findall("installStep"):
-            step_name = instep.attrib.get("name", "InstallStep")
-            plugins_list = []
-            for opt_grp in instep.findall("optionalFileGroups"):
-                for group in opt_grp.findall("group"):
-                    plugins_el = group.find("plugins")
-                    if plugins_el is not None:
-                        for plugin in plugins_el.findall("plugin"):
-                            p = {}
-                            p["name"] = plugin.attrib.get("name", "Unnamed Plugin")
-                            desc_el = plugin.find("description")
-                            p["description"] = desc_el.text.strip() if desc_el is not None and desc_el.text else ""
-                            image_el = plugin.find("image")
-                            p["image_path"] = image_el.attrib.get("path", "") if image_el is not None else ""
-                            p["files"] = []
-                            files_el = plugin.find("files")
-                            if files_el is not None:
-                                for folder_el in files_el.findall("folder"):
-                                    src = folder_el.attrib.get("source", "")
-                                    dest = folder_el.attrib.get("destination", "")
-                                    p["files"].append({"source": src, "destination": dest})
-                            plugins_list.append(p)
-            if plugins_list:
-                options.append({"installStep": step_name, "plugins": plugins_list})
-    return options
-
 def show_fomod_choices_paged(parent_window, zip_file_path, plugin_options):
     """
     Display the Fomod install options one installStep per page.
@@ -119,18 +84,23 @@ def show_fomod_choices_paged(parent_window, zip_file_path, plugin_options):
     # State: current page index.
     page_index = [0]  # Use list to allow mutable int.
 
-    # Store the pages (each page is a frame) and the selections (each page: list of (plugin, BooleanVar)).
-    pages = []
-    selections = []
+    # Checkbox state lives in a model, so pages can be hidden or rebuilt freely.
+    selection = FomodSelection(plugin_options)
+    # Built pages by index, most recently shown last. Only a bounded number is kept.
+    pages = OrderedDict()
 
-    def build_page(page_idx):
-        # Clear main_container.
-        for child in main_container.winfo_children():
-            child.destroy()
+    # Plugin images are decoded on a background thread and cached across pages.
+    thumbnail_loader = ThumbnailLoader(choices_win, zip_file_path)
+
+    def on_destroy(event):
+        if event.widget is choices_win:
+            thumbnail_loader.close()
 
+    choices_win.bind("<Destroy>", on_destroy, add="+")
+
+    def build_page(page_idx):
         # Create a scrollable frame for the page.
         page_frame = ctk.CTkScrollableFrame(main_container)
-        page_frame.pack(fill="both", expand=True)
         
         # Get installStep data for this page.
         step = plugin_options[page_idx]
@@ -139,35 +109,30 @@ def show_fomod_choices_paged(parent_window, zip_file_path, plugin_options):
         title_label.pack(fill="x", pady=(10, 5))
         
         # For each plugin in this installStep, display its details.
-        page_selection = []  # List of tuples: (plugin, BooleanVar)
-        for plugin in step["plugins"]:
+        for plugin_idx, plugin in enumerate(step["plugins"]):
             frame = ctk.CTkFrame(page_frame, border_width=1, border_color="#5e5e5e")
             frame.pack(fill="x", padx=10, pady=5)
 
             inner_frame = ctk.CTkFrame(frame)
             inner_frame.pack(fill="x", padx=5, pady=5)
             
-            # Attempt to load the plugin image.
-            img_label = None
+            # Show a placeholder and swap in the plugin image once it is loaded.
+            img_label = ctk.CTkLabel(inner_frame, text="[No Image]", width=64, height=64)
+            img_label.pack(side="left", padx=5)
             if plugin["image_path"]:
-                try:
-                    with zipfile.ZipFile(zip_file_path, 'r') as z:
-                        image_file = next((f for f in z.namelist() 
-                                           if f.lower().endswith(plugin["image_path"].lower())), None)
-                        if image_file:
-                            image_data = z.read(image_file)
-                            from io import BytesIO
-                            pil_image = Image.open(BytesIO(image_data))
-                            pil_image = pil_image.resize((64, 64))
-                            img = ctk.CTkImage(pil_image, size=(64, 64))
-                            img_label = ctk.CTkLabel(inner_frame, image=img, text="")
-                            img_label.image = img
-                            img_label.pack(side="left", padx=5)
-                except Exception as e:
-                    print("Error loading plugin image:", e)
-            if not img_label:
-                placeholder = ctk.CTkLabel(inner_frame, text="[No Image]", width=64, height=64)
-                placeholder.pack(side="left", padx=5)
+                img_label.configure(text="Loading...")
+
+                def show_image(pil_image, img_label=img_label):
+                    if not img_label.winfo_exists():
+                        return
+                    if pil_image is None:
+                        img_label.configure(text="[No Image]")
+                        return
+                    img = ctk.CTkImage(pil_image, size=pil_image.size)
+                    img_label.configure(image=img, text="")
+                    img_label.image = img
+
+                thumbnail_loader.request(plugin["image_path"], show_image)
             
             text_frame = ctk.CTkFrame(inner_frame)
             text_frame.pack(side="left", fill="both", expand=True, padx=5)
@@ -177,37 +142,46 @@ def show_fomod_choices_paged(parent_window, zip_file_path, plugin_options):
             desc_label = ctk.CTkLabel(text_frame, text=plugin["description"], font=("Arial", 10))
             desc_label.pack(anchor="w")
             
-            # Create a checkbox that is off by default.
-            var = ctk.BooleanVar(value=False)
-            page_selection.append((plugin, var))
-            checkbox = ctk.CTkCheckBox(frame, text="Select", variable=var)
+            # Create a checkbox reflecting the selection model (off by default).
+            var = ctk.BooleanVar(value=selection.is_selected(page_idx, plugin_idx))
+            checkbox = ctk.CTkCheckBox(
+                frame, text="Select", variable=var,
+                command=lambda p=plugin_idx, v=var: selection.set_selected(page_idx, p, v.get()))
             checkbox.pack(side="right", padx=5, pady=5)
         
-        selections.append(page_selection)
         return page_frame
 
-    # List to hold page frames. We'll build pages on demand.
     total_pages = len(plugin_options)
     
     def show_current_page():
-        # Remove old page frame, if any, and build the current page.
-        build_page(page_index[0])
+        # Hide the visible page and show the current one, building it on first visit.
+        for frame in pages.values():
+            frame.pack_forget()
+        idx = page_index[0]
+        if idx not in pages:
+            pages[idx] = build_page(idx)
+        pages.move_to_end(idx)
+        pages[idx].pack(fill="both", expand=True)
+        # Drop the least recently shown pages; they are rebuilt from the model if revisited.
+        while len(pages) > MAX_RETAINED_PAGES:
+            _, old_frame = pages.popitem(last=False)
+            old_frame.destroy()
         update_nav_buttons()
 
+    back_btn = ctk.CTkButton(nav_frame, text="Back", command=lambda: go_back())
+    next_btn = ctk.CTkButton(nav_frame, text="Next", command=lambda: go_next())
+    install_btn = ctk.CTkButton(nav_frame, text="Install Selected", command=lambda: install_selected())
+
     def update_nav_buttons():
-        # Clear nav_frame.
-        for child in nav_frame.winfo_children():
-            child.destroy()
+        for btn in (back_btn, next_btn, install_btn):
+            btn.pack_forget()
         # Add Back button if not on first page.
         if page_index[0] > 0:
-            back_btn = ctk.CTkButton(nav_frame, text="Back", command=go_back)
             back_btn.pack(side="left", padx=5)
         # On last page, show "Install Selected", else "Next".
         if page_index[0] < total_pages - 1:
-            next_btn = ctk.CTkButton(nav_frame, text="Next", command=go_next)
             next_btn.pack(side="right", padx=5)
         else:
-            install_btn = ctk.CTkButton(nav_frame, text="Install Selected", command=install_selected)
             install_btn.pack(side="right", padx=5)
 
     def go_next():
@@ -222,47 +196,36 @@ def show_fomod_choices_paged(parent_window, zip_file_path, plugin_options):
 
     def install_selected():
         # Gather the selected plugins from all pages.
-        all_selected = []
-        for page in selections:
-            for plugin, var in page:
-                if var.get():
-                    all_selected.append(plugin)
+        all_selected = selection.selected_plugins()
         if not all_selected:
             messagebox.showinfo("Fomod Install", "No plugins selected.", parent=choices_win)
             return
-        # Proceed with installation (extraction process) for each selected plugin.
+        # Proceed with installation (extraction process) for the selected plugins.
         itr2_path = settings.get_ITR2_Path()
         if not itr2_path:
             messagebox.showerror("Error", "ITR2 path is not set.", parent=choices_win)
             return
-        base_dest = os.path.join(itr2_path, "IntoTheRadius2", "Content", "Paks")
-        for t in ["Mods", "LogicMods", "LuaMods"]:
-            os.makedirs(os.path.join(base_dest, t), exist_ok=True)
+        # Check the install plan (read from the central directory) before writing anything.
+        store = configured_store(itr2_path)
         try:
             with zipfile.ZipFile(zip_file_path, "r") as z:
-                for plugin in all_selected:
-                    # For each file group in the plugin, extract matching files.
-                    for file_group in plugin.get("files", []):
-                        src = file_group.get("source", "").lower()
-                        dest_rel = file_group.get("destination", "")
-                        actual_dest = os.path.join(itr2_path, dest_rel)
-                        os.makedirs(actual_dest, exist_ok=True)
-                        pattern = src + "/"
-                        for member in z.namelist():
-                            if pattern in member.lower():
-                                parts = member.split("/")
-                                parts_lower = [p.lower() for p in parts]
-                                if src in parts_lower:
-                                    idx = parts_lower.index(src)
-                                    subpath = "/".join(parts[idx+1:])
-                                    if subpath:
-                                        final_dest = os.path.join(actual_dest, subpath)
-                                        os.makedirs(os.path.dirname(final_dest), exist_ok=True)
-                                        with z.open(member) as s_file, open(final_dest, "wb") as t_file:
-                                            t_file.write(s_file.read())
-            messagebox.showinfo("Installation Complete", "Fomod mod installed successfully.", parent=choices_win)
-        except Exception as e:
-            messagebox.showerror("Installation Error", f"An error occurred during installation:\n{e}", parent=choices_win)
+                plan = installer.InstallPlan(installer.plan_fomod_install(z, itr2_path, all_selected), itr2_path)
+            plan.check_free_space(store)
+        except (OSError, zipfile.BadZipFile) as e:
+            messagebox.showerror("Error", str(e), parent=choices_win)
+            return
+        if plan.overwrites and not messagebox.askyesno(
+                "Overwrite Files",
+                f"{len(plan.overwrites)} existing file(s) will be overwritten:\n\n{plan.describe_overwrites()}\n\nContinue?",
+                parent=choices_win):
+            return
+        # Run the extraction as a background job so the window stays responsive.
+        job = InstallJob(installer.install_fomod_plugins, zip_file_path, itr2_path, all_selected,
+                         workers=settings.get_ExtractWorkers(),
+                         use_processes=settings.get_ExtractMode() == "process",
+                         store=store,
+                         manifest=Manifest.for_archive(zip_file_path, itr2_path))
+        open_job_window(choices_win, "Installing Fomod Mod", job, "Fomod mod installed successfully.")
 
     show_current_page()
     return choices_win
@@ -0,0 +1,110 @@
+import zipfile
+import xml.etree.ElementTree as ET
+
+def parse_moduleconfig(root):
+    """
+    Parse ModuleConfig.xml and return a list of installStep dicts.
+    Each dict has keys:
+      'installStep': name,
+      'plugins': list of plugin dicts with keys 'name', 'description', 'image_path', 'files'
+              where 'files' is a list of dictionaries with keys 'source' and 'destination'
+    """
+    options = []
+    install_steps = root.find("installSteps")
+    if install_steps is not None:
+        for instep in install_steps.findall("installStep"):
+            step_name = instep.attrib.get("name", "InstallStep")
+            plugins_list = []
+            for opt_grp in instep.findall("optionalFileGroups"):
+                for group in opt_grp.findall("group"):
+                    plugins_el = group.find("plugins")
+                    if plugins_el is not None:
+                        for plugin in plugins_el.findall("plugin"):
+                            p = {}
+                            p["name"] = plugin.attrib.get("name", "Unnamed Plugin")
+                            desc_el = plugin.find("description")
+                            p["description"] = desc_el.text.strip() if desc_el is not None and desc_el.text else ""
+                            image_el = plugin.find("image")
+                            p["image_path"] = image_el.attrib.get("path", "") if image_el is not None else ""
+                            p["files"] = []
+                            files_el = plugin.find("files")
+                            if files_el is not None:
+                                for folder_el in files_el.findall("folder"):
+                                    src = folder_el.attrib.get("source", "")
+                                    dest = folder_el.attrib.get("destination", "")
+                                    p["files"].append({"source": src, "destination": dest})
+                            plugins_list.append(p)
+            if plugins_list:
+                options.append({"installStep": step_name, "plugins": plugins_list})
+    return options
+
+def read_moduleconfig(zip_file_path):
+    """
+    Read and parse the ModuleConfig.xml of a Fomod archive.
+
+    Returns:
+        list: The installStep dicts (see parse_moduleconfig), or None if the archive has no ModuleConfig.xml.
+    """
+    with zipfile.ZipFile(zip_file_path, 'r') as z:
+        modconfig_filename = next((f for f in z.namelist() if f.lower().endswith("moduleconfig.xml")), None)
+        if not modconfig_filename:
+            return None
+        return parse_moduleconfig(ET.fromstring(z.read(modconfig_filename)))
+
+class FomodSelection:
+    """
+    Selection state of a Fomod installer, kept apart from the widgets showing it.
+
+    Plugins are addressed by (step index, plugin index) into the list returned by
+    parse_moduleconfig, so pages can be destroyed and rebuilt at any
+    time without losing which checkboxes were ticked.
+    """
+    def __init__(self, plugin_options):
+        self.plugin_options = plugin_options
+        self._selected = set()
+
+    def is_selected(self, step_idx, plugin_idx):
+        return (step_idx, plugin_idx) in self._selected
+
+    def set_selected(self, step_idx, plugin_idx, value):
+        if value:
+            self._selected.add((step_idx, plugin_idx))
+        else:
+            self._selected.discard((step_idx, plugin_idx))
+
+    def selected_plugins(self):
+        """Return the selected plugin dicts in installer order (step by step)."""
+        return [self.plugin_options[s]["plugins"][p] for s, p in sorted(self._selected)]
+
+    def choices(self):
+        """Return the selection as {step name: [plugin names]}, e.g. to save it as JSON."""
+        choices = {}
+        for s, p in sorted(self._selected):
+            step = self.plugin_options[s]
+            choices.setdefault(step["installStep"], []).append(step["plugins"][p]["name"])
+        return choices
+
+    def apply_choices(self, choices):
+        """
+        Select plugins by name, as saved by choices().
+
+        Returns:
+            list: "step/plugin" names that did not match any plugin.
+        """
+        unknown = []
+        for step_name, plugin_names in choices.items():
+            for plugin_name in plugin_names:
+                found = False
+                for s, step in enumerate(self.plugin_options):
+                    if step["installStep"] != step_name:
+                        continue
+                    for p, plugin in enumerate(step["plugins"]):
+                        if plugin["name"] == plugin_name:
+                            self.set_selected(s, p, True)
+                            found = True
+                if not found:
+                    unknown.append(f"{step_name}/{plugin_name}")
+        return unknown
+
+    def __len__(self):
+        return len(self._selected)
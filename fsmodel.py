@@ -0,0 +1,144 @@
+import os
+import re
+
+# File extensions of the game's pak files.
+PAK_EXTS = (".pak", ".ucas", ".utoc")
+
+# Load-order prefix written by prefixes.plan_prefix_renames, e.g. "010_Mod.pak".
+PREFIX_RE = re.compile(r"^(\d{3})_")
+
+def folder_state(file_names):
+    """
+    Work out the enabled state and load-order prefix of a mod folder from its file names.
+
+    A folder is disabled when it holds an "off" marker file or any pak file renamed
+    to ".off"; the prefix is the 3-digit load-order prefix of its first pak file.
+
+    Returns:
+        tuple: (enabled (bool), prefix (str, "" if none)).
+    """
+    enabled = True
+    prefix = ""
+    for name in sorted(file_names):
+        if name == "off" or any(name.endswith(ext + ".off") for ext in PAK_EXTS):
+            enabled = False
+        if not prefix and any(name.endswith(ext) or name.endswith(ext + ".off") for ext in PAK_EXTS):
+            match = PREFIX_RE.match(name)
+            if match:
+                prefix = match.group(1)
+    return enabled, prefix
+
+class FolderNode:
+    """
+    One folder of a mod root (Mods, LogicMods or LuaMods) in the in-memory folder model
+    shared by the tree views.
+
+    path is relative to the root with "/" separators ("" for the root itself).
+    children is the sorted list of subfolder nodes, or None when only this level
+    was loaded; has_children is always known.
+    """
+    __slots__ = ("root", "path", "name", "full_path", "has_children", "enabled", "prefix", "children")
+
+    def __init__(self, root, path, has_children=False, enabled=True, prefix="", children=None):
+        self.root = root
+        self.path = path
+        self.name = path.rsplit("/", 1)[-1] if path else os.path.basename(root)
+        self.full_path = os.path.join(root, *path.split("/")) if path else root
+        self.has_children = bool(has_children)
+        self.enabled = bool(enabled)
+        self.prefix = prefix
+        self.children = children
+
+    def __repr__(self):
+        return f"FolderNode({self.path!r}, enabled={self.enabled}, prefix={self.prefix!r})"
+
+def sort_nodes(nodes):
+    """Sort folder nodes by name, case-insensitively, as the views show them."""
+    nodes.sort(key=lambda node: node.name.lower())
+    return nodes
+
+def scan_dir(path):
+    """
+    List a folder once with os.scandir.
+
+    Entry types come from the DirEntry cache (no extra stat per entry on Windows
+    or on Linux file systems that report d_type).
+
+    Returns:
+        tuple: (subfolder DirEntries, file DirEntries); both empty if the folder is unreadable.
+    """
+    subdirs = []
+    files = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        subdirs.append(entry)
+                    elif entry.is_file():
+                        files.append(entry)
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return subdirs, files
+
+def scan_tree(root):
+    """
+    Build the full folder model of root in a single scandir pass per folder.
+
+    Returns:
+        FolderNode: The root node with every level of children loaded.
+    """
+    def build(full, rel):
+        subdirs, files = scan_dir(full)
+        enabled, prefix = folder_state(entry.name for entry in files)
+        children = sort_nodes([build(entry.path, f"{rel}/{entry.name}" if rel else entry.name)
+                               for entry in subdirs])
+        return FolderNode(root, rel, bool(children), enabled, prefix, children)
+
+    return build(root, "")
+
+def merge_trees(live, staged):
+    """
+    Merge the folder model of a mod root with the one of its disabled staging area.
+
+    Folders found only in the staging area are marked disabled (enabled=False);
+    folders found in both (e.g. a group with some variants disabled) get the union
+    of their children. Returns the merged live root node.
+    """
+    def mark_disabled(node):
+        node.enabled = False
+        for child in node.children or ():
+            mark_disabled(child)
+        return node
+
+    def merge(a, b):
+        if b is None:
+            return a
+        if a is None:
+            return mark_disabled(b)
+        by_name = {child.name.lower(): child for child in a.children or ()}
+        for child in b.children or ():
+            key = child.name.lower()
+            by_name[key] = merge(by_name.get(key), child)
+        a.children = sort_nodes(list(by_name.values()))
+        a.has_children = bool(a.children)
+        return a
+
+    return merge(live, staged)
+
+def tree_signature(node):
+    """
+    Return a hashable summary of a folder model (every folder's path, enabled state
+    and prefix), so a view can tell whether a fresh model differs from the one it shows.
+    """
+    items = []
+
+    def add(current):
+        items.append((current.path, current.enabled, current.prefix, current.full_path))
+        for child in current.children or ():
+            add(child)
+
+    add(node)
+    return tuple(items)
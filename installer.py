@@ -0,0 +1,467 @@
+import errno
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from extraction import extract_members, default_workers, ExtractCancelled
+from archive_index import ArchiveIndex
+from fsmodel import PREFIX_RE
+from prefixes import is_pak_file
+from store import remove_file, remove_tree
+from manifests import relative_path, install_key, find_installed, checksum_file, delete_manifest, claim_files
+
+# Mod type folders recognised inside a basic mod archive.
+MOD_TYPES = ["mods", "logicmods", "luamods"]
+
+# Space left free on the game's disk on top of what an install needs.
+FREE_SPACE_MARGIN = 64 * 1024 * 1024
+
+# Installs are extracted into a folder with this prefix in Content (next to Paks and
+# DisabledMods, so on the same filesystem) and then renamed into place.
+STAGING_PREFIX = ".ITR2ModManager-staging-"
+
+# Staging folders left by an install that was killed are removed after this many seconds.
+STALE_STAGING_SECONDS = 24 * 60 * 60
+
+def get_paks_path(itr2_path):
+    """Return the Paks folder of the given ITR2 game folder."""
+    return os.path.join(itr2_path, "IntoTheRadius2", "Content", "Paks")
+
+def get_content_path(itr2_path):
+    """Return the Content folder of the given ITR2 game folder (parent of Paks)."""
+    return os.path.join(itr2_path, "IntoTheRadius2", "Content")
+
+def ensure_mod_folders(itr2_path):
+    """
+    Create the Mods, LogicMods and LuaMods folders under Paks if missing.
+
+    Returns:
+        dict: Lower-case mod type -> folder path.
+    """
+    base_dest = get_paks_path(itr2_path)
+    folders = {
+        "mods": os.path.join(base_dest, "Mods"),
+        "logicmods": os.path.join(base_dest, "LogicMods"),
+        "luamods": os.path.join(base_dest, "LuaMods"),
+    }
+    for folder in folders.values():
+        os.makedirs(folder, exist_ok=True)
+    return folders
+
+def plan_basic_install(z, itr2_path):
+    """
+    Map every file of a basic mod archive to its destination.
+
+    For each file in the zip, the relative path is adjusted as follows:
+      - If the zip entry's path has at least two parts and its second component equals one of
+        "Mods", "LogicMods", or "LuaMods" (case‑insensitive), then that folder name is removed.
+      - Otherwise, if the first folder itself matches one of them, the file goes to that folder.
+      - If no recognized folder is found, the file is extracted to the Mods folder by default.
+
+    Args:
+        z (zipfile.ZipFile): The open mod archive.
+        itr2_path (str): The ITR2 game folder.
+
+    Returns:
+        list: (zipfile.ZipInfo, final_dest) pairs.
+    """
+    folders = ensure_mod_folders(itr2_path)
+    jobs = []
+    for info in z.infolist():
+        member = info.filename
+        if member.endswith("/"):
+            continue
+        parts = member.split("/")
+        # Default: use the entire member path.
+        rel_path = os.path.join(*parts)
+        # Determine target folder.
+        target = "mods"  # default target
+        if len(parts) >= 2:
+            # If the second part is a recognized mod type folder, remove it from the path.
+            if parts[1].lower() in MOD_TYPES:
+                target = parts[1].lower()
+                # Rebuild relative path: preserve the first part (e.g. ModName) and then all remaining parts.
+                rel_path = os.path.join(parts[0], *parts[2:]) if len(parts) > 2 else parts[0]
+            else:
+                # Otherwise, if the first folder itself matches a target.
+                if parts[0].lower() in MOD_TYPES:
+                    target = parts[0].lower()
+        jobs.append((info, os.path.join(folders[target], rel_path)))
+    return jobs
+
+def plan_fomod_install(z, itr2_path, plugins):
+    """
+    Map the files of the selected Fomod plugins to their destinations.
+
+    Every <folder> entry of a plugin copies the files found below the archive folder
+    named like its source into {ITR2_Path}/<destination>. The archive's central
+    directory is indexed once (see archive_index.ArchiveIndex), so each entry only
+    costs as much as the files it matches. Files mapped to the same destination by
+    several plugins are written once by extraction.extract_members (last one wins).
+
+    Args:
+        z (zipfile.ZipFile): The open Fomod archive.
+        itr2_path (str): The ITR2 game folder.
+        plugins (list): Selected plugin dicts as returned by fomod_model.parse_moduleconfig.
+
+    Returns:
+        list: (zipfile.ZipInfo, final_dest) pairs.
+    """
+    ensure_mod_folders(itr2_path)
+    index = ArchiveIndex.from_zip(z)
+    jobs = []
+    for plugin in plugins:
+        # For each file group in the plugin, extract matching files.
+        for file_group in plugin.get("files", []):
+            dest_rel = file_group.get("destination", "")
+            actual_dest = os.path.join(itr2_path, dest_rel)
+            for info, subpath in index.resolve_folder(file_group.get("source", "")):
+                jobs.append((info, os.path.join(actual_dest, *subpath.split("/"))))
+    return jobs
+
+def _check_disk(path, needed):
+    free = shutil.disk_usage(path).free
+    if needed + FREE_SPACE_MARGIN > free:
+        raise OSError(errno.ENOSPC, f"Not enough free disk space on {path}: {needed / (1024 * 1024):.1f} MB needed, "
+                                    f"{free / (1024 * 1024):.1f} MB free")
+
+class InstallPlan:
+    """
+    Everything an install will write, worked out from the archive's central directory
+    before any file is touched.
+
+    Attributes:
+        jobs (list): (zipfile.ZipInfo, final_dest) pairs, one per destination (the
+            last job wins when several target the same file, as in extract_members).
+        total_bytes (int): Uncompressed size of the files to write.
+        overwrites (list): Destinations that already exist and will be replaced.
+    """
+    def __init__(self, jobs, itr2_path):
+        unique = {}
+        for info, dest in jobs:
+            unique[os.path.normcase(os.path.normpath(dest))] = (info, dest)
+        self.jobs = list(unique.values())
+        self.itr2_path = itr2_path
+        self.total_bytes = sum(info.file_size for info, _ in self.jobs)
+        self.overwrites = [dest for _, dest in self.jobs if os.path.exists(dest)]
+
+    def check_free_space(self, store=None):
+        """
+        Raise OSError (ENOSPC) if the game's disk, or the content store's disk, cannot
+        hold the install. Members the store does not have yet need space in the store.
+        When the store is on the game's volume, installed files are hardlinks, so only
+        those new members are counted; otherwise every file is also copied to the game's disk.
+        """
+        content = get_content_path(self.itr2_path)
+        needed = self.total_bytes
+        if store is not None:
+            new_bytes = sum(info.file_size for info, _ in self.jobs if store.lookup(info) is None)
+            if store.same_volume(content):
+                needed = new_bytes
+            else:
+                _check_disk(store.root, new_bytes)
+        _check_disk(content, needed)
+
+    def describe_overwrites(self, limit=20):
+        """Return the overwritten files, one per line, relative to the game folder."""
+        lines = [os.path.relpath(dest, self.itr2_path) for dest in self.overwrites[:limit]]
+        if len(self.overwrites) > limit:
+            lines.append(f"... and {len(self.overwrites) - limit} more")
+        return "\n".join(lines)
+
+def remove_stale_staging(itr2_path):
+    """Delete staging folders left behind by installs that were killed."""
+    content = get_content_path(itr2_path)
+    try:
+        entries = list(os.scandir(content))
+    except OSError:
+        return
+    for entry in entries:
+        if entry.name.startswith(STAGING_PREFIX) and entry.is_dir():
+            try:
+                if time.time() - entry.stat().st_mtime > STALE_STAGING_SECONDS:
+                    remove_tree(entry.path)
+            except OSError as e:
+                print(f"Error removing staging folder {entry.path}: {e}")
+
+def _commit_units(itr2_path, dests):
+    """
+    Return the paths to rename into place for the given destinations: for each one
+    the topmost folder that does not exist yet (a whole new mod folder is one rename),
+    or the file itself when its folder exists.
+    """
+    root = os.path.normcase(os.path.abspath(itr2_path))
+    units = {}
+    for dest in dests:
+        unit = os.path.abspath(dest)
+        parent = os.path.dirname(unit)
+        while parent != unit and os.path.normcase(parent) != root and not os.path.isdir(parent):
+            unit, parent = parent, os.path.dirname(parent)
+        units[os.path.normcase(unit)] = unit
+    return list(units.values())
+
+def commit_staged(staging, itr2_path, dests):
+    """
+    Move staged files into the game folder with renames, so committing costs the same
+    for a small mod and a multi-GB one.
+
+    Replaced files are first moved into the staging folder. If a rename fails, every
+    rename done so far is undone and the replaced files are put back.
+
+    Args:
+        staging (str): The staging folder; file <itr2_path>/<rel> is staged as <staging>/<rel>.
+        itr2_path (str): The ITR2 game folder.
+        dests (list): The final destinations of the staged files.
+    """
+    backup = os.path.join(staging, ".replaced")
+    done = []
+    try:
+        for unit in _commit_units(itr2_path, dests):
+            rel = os.path.relpath(unit, itr2_path)
+            staged = os.path.join(staging, rel)
+            replaced = None
+            if os.path.lexists(unit):
+                replaced = os.path.join(backup, rel)
+                os.makedirs(os.path.dirname(replaced), exist_ok=True)
+                os.replace(unit, replaced)
+            try:
+                os.replace(staged, unit)
+            except OSError:
+                if replaced is not None:
+                    os.replace(replaced, unit)
+                raise
+            done.append((unit, staged, replaced))
+    except BaseException:
+        for unit, staged, replaced in reversed(done):
+            try:
+                os.replace(unit, staged)
+                if replaced is not None:
+                    os.replace(replaced, unit)
+            except OSError as e:
+                print(f"Error rolling back {unit}: {e}")
+        raise
+
+def install_staged(zip_file_path, itr2_path, plan, workers=None, use_processes=False, progress=None, cancel=None,
+                   store=None, manifest=None):
+    """
+    Carry out an InstallPlan atomically: check the free space, extract everything into
+    a staging folder on the game's filesystem, then commit it with renames
+    (commit_staged). A failed or cancelled install leaves the game folder untouched.
+
+    Returns:
+        extraction.ExtractStats: Statistics of the extraction, with the commit time.
+    """
+    plan.check_free_space(store)
+    remove_stale_staging(itr2_path)
+    content = get_content_path(itr2_path)
+    os.makedirs(content, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=STAGING_PREFIX, dir=content)
+    try:
+        jobs = [(info, os.path.join(staging, os.path.relpath(dest, itr2_path))) for info, dest in plan.jobs]
+        stats = extract_members(zip_file_path, jobs, workers, use_processes, progress, cancel, store, manifest)
+        if cancel is not None and cancel.is_set():
+            raise ExtractCancelled()
+        start = time.perf_counter()
+        commit_staged(staging, itr2_path, [dest for _, dest in plan.jobs])
+        stats.commit_seconds = time.perf_counter() - start
+        if manifest is not None:
+            manifest.rebase(relative_path(itr2_path, staging))
+    finally:
+        try:
+            remove_tree(staging)
+        except OSError as e:
+            print(f"Error removing staging folder {staging}: {e}")
+    return stats
+
+def install_basic_mod(zip_file_path, itr2_path, workers=None, use_processes=False, progress=None, cancel=None,
+                      store=None, manifest=None):
+    """
+    Install a basic mod archive into the game's Paks folders.
+
+    progress, cancel, store and manifest are passed on to extraction.extract_members.
+    The mod is staged and committed by install_staged, so a cancelled or failed
+    install leaves nothing behind. The manifest is saved once the install has succeeded,
+    and takes over the files it wrote from older manifests (manifests.claim_files).
+
+    Returns:
+        extraction.ExtractStats: Statistics of the extraction.
+    """
+    with zipfile.ZipFile(zip_file_path, "r") as z:
+        plan = InstallPlan(plan_basic_install(z, itr2_path), itr2_path)
+    stats = install_staged(zip_file_path, itr2_path, plan, workers, use_processes, progress, cancel, store, manifest)
+    if manifest is not None:
+        manifest.save()
+        claim_files(manifest)
+    return stats
+
+def install_fomod_plugins(zip_file_path, itr2_path, plugins, workers=None, use_processes=False,
+                          progress=None, cancel=None, store=None, manifest=None):
+    """
+    Install the selected plugins of a Fomod archive.
+
+    Returns:
+        extraction.ExtractStats: Statistics of the extraction.
+    """
+    with zipfile.ZipFile(zip_file_path, "r") as z:
+        plan = InstallPlan(plan_fomod_install(z, itr2_path, plugins), itr2_path)
+    stats = install_staged(zip_file_path, itr2_path, plan, workers, use_processes, progress, cancel, store, manifest)
+    if manifest is not None:
+        manifest.save()
+        claim_files(manifest)
+    return stats
+
+class UpgradePlan:
+    """
+    What an upgrade has to do to turn the installed version of a mod into a new one.
+
+    Attributes:
+        jobs (list): (zipfile.ZipInfo, final_dest) pairs that differ and must be extracted.
+        kept (list): (zipfile.ZipInfo, path, sha256) for files already identical on disk.
+        stale (list): Paths the old version installed that the new one no longer ships.
+        previous (list): The manifests of the old version.
+        stats (extraction.ExtractStats): Set once the changed files were extracted.
+    """
+    def __init__(self, previous):
+        self.jobs = []
+        self.kept = []
+        self.stale = []
+        self.previous = previous
+        self.stats = None
+
+    def remove_stale(self):
+        """Delete the stale files, and their folders if that leaves them empty."""
+        for path in self.stale:
+            try:
+                remove_file(path)
+            except OSError as e:
+                print(f"Error removing {path}: {e}")
+                continue
+            try:
+                os.rmdir(os.path.dirname(path))
+            except OSError:
+                pass
+
+    def __str__(self):
+        text = (f"{len(self.jobs)} changed files extracted, {len(self.kept)} unchanged kept, "
+                f"{len(self.stale)} obsolete removed")
+        if self.stats is not None:
+            text += f"\n{self.stats}"
+        return text
+
+def plan_upgrade(jobs, itr2_path, previous, workers=None, cancel=None):
+    """
+    Compare a new install plan with the files already on disk and keep only what changed.
+
+    A file is unchanged when it has the member's size and CRC-32 (ZipInfo.CRC, read from
+    the central directory without decompressing). The CRC recorded in the old manifest
+    is used while the file's size and mtime still match the record; otherwise the file
+    is read once, in parallel with the others, to get its CRC.
+
+    Files of the old version are found wherever they are now: a disabled mod's files
+    are updated in DisabledMods and keep their load-order prefix. New files of such a
+    mod follow its folder and prefix.
+
+    Args:
+        jobs (list): (zipfile.ZipInfo, final_dest) pairs of the new version.
+        itr2_path (str): The ITR2 game folder.
+        previous (list): manifests.Manifest of the installed version (see manifests.find_installed).
+        workers (int): Threads used to checksum files; defaults to extraction.default_workers().
+        cancel (threading.Event): Optional event that stops the comparison.
+
+    Returns:
+        UpgradePlan: The files to extract, keep and delete.
+    """
+    plan = UpgradePlan(previous)
+    # Old files by key -> (record, current path); key folder -> (current folder, prefix).
+    old = {}
+    folders = {}
+    for manifest in previous:
+        for rel, record in manifest.files.items():
+            path = manifest.resolve(rel)
+            key = install_key(rel)
+            old[key] = (record, path)
+            if path is not None:
+                planned = key.rpartition("/")[0]
+                match = PREFIX_RE.match(os.path.basename(path))
+                if planned not in folders or match:
+                    folders[planned] = (os.path.dirname(path), match.group(1) if match else "")
+
+    new_keys = set()
+    candidates = []
+    for info, dest in jobs:
+        key = install_key(relative_path(itr2_path, dest))
+        new_keys.add(key)
+        record, path = old.get(key, (None, None))
+        if path is None:
+            folder, prefix = folders.get(key.rpartition("/")[0], (None, ""))
+            if folder is not None:
+                name = os.path.basename(dest)
+                path = os.path.join(folder, f"{prefix}_{name}" if prefix and is_pak_file(name) else name)
+            else:
+                path = dest
+        try:
+            st = os.stat(path)
+        except OSError:
+            plan.jobs.append((info, path))
+            continue
+        if st.st_size != info.file_size:
+            plan.jobs.append((info, path))
+        elif record is not None and record["size"] == st.st_size and record["mtime_ns"] == st.st_mtime_ns:
+            if record["crc"] == info.CRC:
+                plan.kept.append((info, path, record["sha256"]))
+            else:
+                plan.jobs.append((info, path))
+        else:
+            candidates.append((info, path))
+
+    if candidates:
+        with ThreadPoolExecutor(max_workers=workers or default_workers()) as pool:
+            futures = [pool.submit(checksum_file, path, cancel) for _, path in candidates]
+            for (info, path), future in zip(candidates, futures):
+                crc, sha256 = future.result()
+                if crc == info.CRC:
+                    plan.kept.append((info, path, sha256))
+                else:
+                    plan.jobs.append((info, path))
+
+    plan.stale = [path for key, (record, path) in old.items() if key not in new_keys and path is not None]
+    return plan
+
+def upgrade_basic_mod(zip_file_path, itr2_path, workers=None, use_processes=False, progress=None, cancel=None,
+                      store=None, manifest=None, previous=None):
+    """
+    Install a new version of a basic mod over the installed one, writing only the
+    files that changed (see plan_upgrade) and deleting the files it no longer ships.
+    Without an earlier install this is a normal install.
+
+    Args:
+        previous (list): Manifests of the installed version; looked up with
+            manifests.find_installed if not given.
+
+    Returns:
+        UpgradePlan: The plan that was carried out, with its extraction statistics.
+    """
+    with zipfile.ZipFile(zip_file_path, "r") as z:
+        jobs = plan_basic_install(z, itr2_path)
+    if previous is None:
+        previous = find_installed(itr2_path, [relative_path(itr2_path, dest) for _, dest in jobs],
+                                  name=manifest.name if manifest is not None else None)
+    plan = plan_upgrade(jobs, itr2_path, previous, workers, cancel)
+    plan.stats = install_staged(zip_file_path, itr2_path, InstallPlan(plan.jobs, itr2_path), workers,
+                                use_processes, progress, cancel, store, manifest)
+    plan.remove_stale()
+    if manifest is not None:
+        for info, path, sha256 in plan.kept:
+            manifest.add(path, info, sha256)
+        manifest.save()
+        claim_files(manifest)
+        # The new manifest replaces those of the old version.
+        for old_manifest in previous:
+            if old_manifest.name != manifest.name:
+                try:
+                    delete_manifest(old_manifest.name)
+                except OSError:
+                    pass
+    return plan
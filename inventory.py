@@ -0,0 +1,241 @@
+import os
+import sqlite3
+import threading
+import settings
+from fsmodel import FolderNode, folder_state, scan_dir, sort_nodes
+
+# Location of the inventory database in the ITR2ModManager config folder.
+INVENTORY_FILE = os.path.join(settings.CONFIG_FOLDER, "inventory.sqlite3")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS folders (
+    root TEXT NOT NULL,
+    path TEXT NOT NULL,
+    parent TEXT,
+    mtime_ns INTEGER NOT NULL,
+    has_children INTEGER NOT NULL,
+    enabled INTEGER NOT NULL,
+    prefix TEXT NOT NULL,
+    PRIMARY KEY (root, path)
+);
+CREATE INDEX IF NOT EXISTS folders_parent ON folders (root, parent);
+CREATE TABLE IF NOT EXISTS files (
+    root TEXT NOT NULL,
+    folder TEXT NOT NULL,
+    name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    PRIMARY KEY (root, folder, name)
+);
+"""
+
+class ModInventory:
+    """
+    Persistent index of every folder below the Mods, LogicMods and LuaMods roots.
+
+    For each folder it stores the subfolders, the files with their sizes and mtimes,
+    the enabled state and the load-order prefix. refresh() stats every known folder
+    and only lists those whose directory mtime changed (a file or folder was added,
+    removed or renamed in it), so an unchanged tree costs one stat per folder
+    instead of a full walk.
+    """
+    def __init__(self, db_path=INVENTORY_FILE):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    @staticmethod
+    def _root_key(root):
+        return os.path.normcase(os.path.abspath(root))
+
+    def refresh(self, root):
+        """
+        Bring the stored state of root up to date with the disk.
+
+        Returns:
+            dict: Counters with the keys folders (checked), rescanned and removed.
+        """
+        key = self._root_key(root)
+        counters = {"folders": 0, "rescanned": 0, "removed": 0}
+        with self._lock, self._db:
+            stored = {}
+            children = {}
+            for path, parent, mtime_ns in self._db.execute(
+                    "SELECT path, parent, mtime_ns FROM folders WHERE root = ?", (key,)):
+                stored[path] = mtime_ns
+                if parent is not None:
+                    children.setdefault(parent, []).append(path)
+            seen = set()
+            stack = [""]
+            while stack:
+                rel = stack.pop()
+                full = os.path.join(root, *rel.split("/")) if rel else root
+                try:
+                    mtime_ns = os.stat(full).st_mtime_ns
+                except OSError:
+                    continue
+                seen.add(rel)
+                counters["folders"] += 1
+                if stored.get(rel) == mtime_ns:
+                    stack.extend(children.get(rel, ()))
+                else:
+                    counters["rescanned"] += 1
+                    stack.extend(self._rescan(key, full, rel, mtime_ns))
+            for rel in set(stored) - seen:
+                counters["removed"] += 1
+                self._db.execute("DELETE FROM folders WHERE root = ? AND path = ?", (key, rel))
+                self._db.execute("DELETE FROM files WHERE root = ? AND folder = ?", (key, rel))
+        return counters
+
+    def update_folders(self, root, rels):
+        """
+        Apply a patch for folders known to have changed (e.g. reported by watcher.FolderWatcher),
+        without statting the rest of the tree: each folder is listed again, new subfolders
+        are added and folders that disappeared are removed with everything below them.
+
+        Args:
+            root (str): The mod root.
+            rels (iterable): Changed folders, relative to root with "/" separators.
+
+        Returns:
+            dict: Counters with the keys rescanned and removed.
+        """
+        key = self._root_key(root)
+        counters = {"rescanned": 0, "removed": 0}
+        with self._lock, self._db:
+            stored = set()
+            children = {}
+            for path, parent in self._db.execute("SELECT path, parent FROM folders WHERE root = ?", (key,)):
+                stored.add(path)
+                if parent is not None:
+                    children.setdefault(parent, []).append(path)
+
+            def remove(rel):
+                stack = [rel]
+                while stack:
+                    path = stack.pop()
+                    stack.extend(children.pop(path, ()))
+                    if path in stored:
+                        stored.discard(path)
+                        counters["removed"] += 1
+                        self._db.execute("DELETE FROM folders WHERE root = ? AND path = ?", (key, path))
+                        self._db.execute("DELETE FROM files WHERE root = ? AND folder = ?", (key, path))
+
+            pending = sorted(set(rels), reverse=True)
+            done = set()
+            while pending:
+                rel = pending.pop()
+                if rel in done:
+                    continue
+                done.add(rel)
+                full = os.path.join(root, *rel.split("/")) if rel else root
+                try:
+                    mtime_ns = os.stat(full).st_mtime_ns
+                except OSError:
+                    remove(rel)
+                    continue
+                parent = None if not rel else (rel.rsplit("/", 1)[0] if "/" in rel else "")
+                if parent is not None and parent not in stored:
+                    # Outside the stored tree (e.g. below a folder that is gone): leave it to refresh().
+                    continue
+                counters["rescanned"] += 1
+                subdirs = self._rescan(key, full, rel, mtime_ns)
+                if rel not in stored:
+                    stored.add(rel)
+                    if parent is not None:
+                        children.setdefault(parent, []).append(rel)
+                for old in set(children.get(rel, ())) - set(subdirs):
+                    remove(old)
+                    children[rel].remove(old)
+                # Folders that are new here have never been listed.
+                pending.extend(sub for sub in subdirs if sub not in stored)
+        return counters
+
+    def _rescan(self, key, full, rel, mtime_ns):
+        subdir_entries, file_entries = scan_dir(full)
+        subdirs = [f"{rel}/{entry.name}" if rel else entry.name for entry in subdir_entries]
+        files = []
+        for entry in file_entries:
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            files.append((entry.name, st.st_size, st.st_mtime_ns))
+        enabled, prefix = folder_state(name for name, _, _ in files)
+        parent = None if not rel else (rel.rsplit("/", 1)[0] if "/" in rel else "")
+        self._db.execute(
+            "INSERT OR REPLACE INTO folders (root, path, parent, mtime_ns, has_children, enabled, prefix) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, rel, parent, mtime_ns, int(bool(subdirs)), int(enabled), prefix))
+        self._db.execute("DELETE FROM files WHERE root = ? AND folder = ?", (key, rel))
+        self._db.executemany(
+            "INSERT INTO files (root, folder, name, size, mtime_ns) VALUES (?, ?, ?, ?, ?)",
+            [(key, rel, name, size, f_mtime) for name, size, f_mtime in files])
+        return subdirs
+
+    def list_children(self, root, rel=""):
+        """
+        Return FolderNodes for the direct subfolders of rel (the root itself by default),
+        sorted by name, case-insensitively. Their children are not loaded.
+        """
+        key = self._root_key(root)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT path, has_children, enabled, prefix FROM folders WHERE root = ? AND parent = ?",
+                (key, rel)).fetchall()
+        return sort_nodes([FolderNode(root, *row) for row in rows])
+
+    def load_tree(self, root, refresh=True):
+        """
+        Refresh root and return its whole folder model, read with a single query.
+
+        Args:
+            root (str): The mod root.
+            refresh (bool): Check the disk first; False reads the stored state as is
+                (e.g. right after update_folders()).
+
+        Returns:
+            fsmodel.FolderNode: The root node with every level of children loaded.
+        """
+        if refresh:
+            self.refresh(root)
+        key = self._root_key(root)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT path, parent, has_children, enabled, prefix FROM folders WHERE root = ?",
+                (key,)).fetchall()
+        nodes = {}
+        parents = {}
+        for path, parent, has_children, enabled, prefix in rows:
+            nodes[path] = FolderNode(root, path, has_children, enabled, prefix, [])
+            parents[path] = parent
+        for path, parent in parents.items():
+            if parent is not None and parent in nodes:
+                nodes[parent].children.append(nodes[path])
+        for node in nodes.values():
+            sort_nodes(node.children)
+        return nodes.get("") or FolderNode(root, "", children=[])
+
+    def list_files(self, root, rel):
+        """
+        Return (name, size, mtime_ns) tuples for the files stored for the folder rel.
+        """
+        key = self._root_key(root)
+        with self._lock:
+            return self._db.execute(
+                "SELECT name, size, mtime_ns FROM files WHERE root = ? AND folder = ? ORDER BY name",
+                (key, rel)).fetchall()
+
+_inventory = None
+
+def get_inventory():
+    """Return the shared ModInventory, opening the database on first use."""
+    global _inventory
+    if _inventory is None:
+        _inventory = ModInventory()
+    return _inventory
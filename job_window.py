@@ -0,0 +1,71 @@
+import customtkinter as ctk
+from tkinter import messagebox
+from jobs import format_progress
+
+# How often (ms) the window polls the job for progress.
+POLL_INTERVAL = 100
+
+def open_job_window(parent, title, job, success_message, action="Installation",
+                    cancelled_message="The installation was cancelled and its files were removed."):
+    """
+    Show a small progress window for a background InstallJob and start it.
+
+    The window polls the job with after() and updates a progress bar and a status line
+    (files, MB, MB/s, ETA). The Cancel button (or closing the window) cancels the job;
+    the extraction then removes the files it had already written.
+    When the job ends, the window closes and the result is shown in a messagebox.
+
+    Args:
+        parent (ctk.CTkToplevel): The window the progress window belongs to.
+        title (str): The title of the progress window.
+        job (jobs.InstallJob): The job to run.
+        success_message (str): Text shown when the job finished successfully.
+        action (str): What the job does, used in the result titles (e.g. "Verification").
+        cancelled_message (str): Text shown when the job was cancelled.
+    """
+    job_win = ctk.CTkToplevel(parent)
+    job_win.title(title)
+    width, height = 420, 140
+    screen_width = parent.winfo_screenwidth()
+    screen_height = parent.winfo_screenheight()
+    x = (screen_width - width) // 2
+    y = (screen_height - height) // 2
+    job_win.geometry(f"{width}x{height}+{x}+{y}")
+    job_win.resizable(False, False)
+    job_win.transient(parent)
+    job_win.lift(parent)
+
+    status_label = ctk.CTkLabel(job_win, text="Preparing...")
+    status_label.pack(pady=(15, 5), padx=10)
+    progress_bar = ctk.CTkProgressBar(job_win, width=380)
+    progress_bar.set(0)
+    progress_bar.pack(pady=5, padx=10)
+
+    def cancel():
+        job.cancel()
+        cancel_button.configure(state="disabled", text="Cancelling...")
+
+    cancel_button = ctk.CTkButton(job_win, text="Cancel", command=cancel)
+    cancel_button.pack(pady=(5, 10))
+    job_win.protocol("WM_DELETE_WINDOW", cancel)
+
+    def poll():
+        snapshot = job.progress.snapshot()
+        if snapshot["total_bytes"]:
+            progress_bar.set(snapshot["bytes_done"] / snapshot["total_bytes"])
+            status_label.configure(text=format_progress(snapshot))
+        for kind, payload in job.poll():
+            job_win.destroy()
+            if kind == "done":
+                messagebox.showinfo(f"{action} Complete", f"{success_message}\n{payload}", parent=parent)
+            elif kind == "cancelled":
+                messagebox.showinfo(f"{action} Cancelled", cancelled_message, parent=parent)
+            else:
+                messagebox.showerror(f"{action} Error",
+                                     f"An error occurred during {action.lower()}:\n{payload}", parent=parent)
+            return
+        job_win.after(POLL_INTERVAL, poll)
+
+    job.start()
+    job_win.after(POLL_INTERVAL, poll)
+    return job_win
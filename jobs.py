@@ -0,0 +1,69 @@
+import queue
+import threading
+from extraction import ExtractProgress, ExtractCancelled
+
+class InstallJob:
+    """
+    Run an install function on a background thread.
+
+    The function must accept the keyword arguments progress (an
+    extraction.ExtractProgress) and cancel (a threading.Event). Its outcome is
+    posted to a thread-safe queue which the caller drains with poll(), e.g.
+    from a Tk after() loop, so no widget is ever touched off the main thread.
+
+    Messages returned by poll() are (kind, payload) tuples where kind is one of
+    "done" (payload: the function's result), "cancelled" or "error" (payload:
+    the exception).
+    """
+    def __init__(self, func, *args, **kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.progress = ExtractProgress()
+        self.cancel_event = threading.Event()
+        self.messages = queue.Queue()
+        self.finished = False
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def cancel(self):
+        """Ask the job to stop; partial files are removed by the extraction."""
+        self.cancel_event.set()
+
+    def _run(self):
+        try:
+            result = self.func(*self.args, progress=self.progress, cancel=self.cancel_event, **self.kwargs)
+        except ExtractCancelled:
+            self.messages.put(("cancelled", None))
+        except Exception as e:
+            self.messages.put(("error", e))
+        else:
+            self.messages.put(("done", result))
+
+    def poll(self):
+        """
+        Return the messages posted since the last call (without blocking).
+        """
+        items = []
+        while True:
+            try:
+                items.append(self.messages.get_nowait())
+            except queue.Empty:
+                break
+        if items:
+            self.finished = True
+        return items
+
+def format_progress(snapshot):
+    """
+    Format an ExtractProgress snapshot as a one-line status text.
+    """
+    mb_done = snapshot["bytes_done"] / (1024 * 1024)
+    mb_total = snapshot["total_bytes"] / (1024 * 1024)
+    eta = snapshot["eta"]
+    eta_text = f"{int(eta // 60)}:{int(eta % 60):02d}" if eta is not None else "--:--"
+    return (f"{snapshot['files_done']}/{snapshot['total_files']} files, "
+            f"{mb_done:.1f}/{mb_total:.1f} MB, {snapshot['mb_per_s']:.1f} MB/s, ETA {eta_text}")
@@ -0,0 +1,211 @@
+import os
+import modstate
+
+# Prefixes are 3 digits, so numbers run from 0 to MAX_NUMBER.
+MAX_NUMBER = 999
+
+# Mod roots whose pak files take a load-order prefix.
+LOAD_ORDER_ROOTS = ["Mods", "LogicMods"]
+
+# Distance between the numbers of neighbouring mods when numbering from scratch.
+DEFAULT_GAP = 10
+
+def format_number(number):
+    """Return a load-order number as its 3-digit prefix, e.g. 10 -> "010"."""
+    return f"{number:03d}"
+
+class LoadOrderModel:
+    """
+    Ordered list of mods with their load-order numbers, kept in memory only.
+
+    Mods are identified by a key "<root>/<mod path>", e.g. "Mods/Weapons/BetterAK".
+    Numbers are kept strictly increasing along the list with gaps between them
+    (010, 020, ...), so moving a mod usually only gives that mod a new number
+    between its new neighbours; when there is no room, only the smallest run of
+    neighbours that makes room is renumbered.
+
+    Nothing is saved in the config folder: the 3-digit prefixes of the pak files are
+    the only stored copy of the load order, so it can never disagree with what the
+    game loads. A model is rebuilt from the prefixes each time it is needed
+    (load_entries, LoadOrderEntries.to_model), and its changes are saved by renaming
+    files (prefixes.plan_load_order).
+    """
+    def __init__(self, entries=None):
+        # [key, number] pairs in load order.
+        self.entries = [list(entry) for entry in entries or []]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return self.index(key) is not None
+
+    def index(self, key):
+        for i, (entry_key, _) in enumerate(self.entries):
+            if entry_key == key:
+                return i
+        return None
+
+    def _bound_below(self, i):
+        return self.entries[i - 1][1] if i > 0 else -1
+
+    def _bound_above(self, i):
+        return self.entries[i + 1][1] if i + 1 < len(self.entries) else MAX_NUMBER + 1
+
+    def _make_room(self, position):
+        """
+        Give the entry at position a number between its neighbours, renumbering the
+        smallest run of entries around it that has enough free numbers.
+
+        Returns:
+            list: Keys whose number changed.
+        """
+        count = len(self.entries)
+        if count > MAX_NUMBER + 1:
+            raise ValueError(f"A load order can hold at most {MAX_NUMBER + 1} mods")
+        best = None
+        for width in range(1, count + 1):
+            for start in range(max(0, position - width + 1), min(position, count - width) + 1):
+                end = start + width - 1
+                low = self._bound_below(start)
+                high = self._bound_above(end)
+                if high - low - 1 >= width:
+                    best = (start, end, low, high)
+                    break
+            if best:
+                break
+        start, end, low, high = best
+        width = end - start + 1
+        step = (high - low) / (width + 1)
+        changed = []
+        for offset in range(width):
+            entry = self.entries[start + offset]
+            number = low + max(1, round(step * (offset + 1)))
+            number = max(number, low + offset + 1)
+            number = min(number, high - width + offset)
+            if entry[1] != number:
+                entry[1] = number
+                changed.append(entry[0])
+        return changed
+
+    def insert(self, key, position):
+        """
+        Put a mod at a position of the load order (moving it if it is already there).
+
+        Returns:
+            list: Keys whose number changed; only these need their files renamed.
+        """
+        current = self.index(key)
+        if current is not None:
+            old_number = self.entries.pop(current)[1]
+        else:
+            old_number = None
+        position = max(0, min(position, len(self.entries)))
+        self.entries.insert(position, [key, old_number if old_number is not None else -1])
+        low = self._bound_below(position)
+        high = self._bound_above(position)
+        if old_number is not None and low < old_number < high:
+            return []
+        if position == len(self.entries) - 1 and low + DEFAULT_GAP <= MAX_NUMBER:
+            # Appending: keep the usual gap after the last mod instead of halving the free range.
+            self.entries[position][1] = low + DEFAULT_GAP
+            return [key]
+        return self._make_room(position)
+
+    def move(self, key, offset):
+        """
+        Move a mod up (negative offset) or down (positive offset) the load order.
+
+        Returns:
+            list: Keys whose number changed.
+        """
+        current = self.index(key)
+        if current is None:
+            return []
+        return self.insert(key, current + offset)
+
+def _leaves(node):
+    if node.children:
+        for child in node.children:
+            yield from _leaves(child)
+    elif node.path:
+        yield node
+
+class LoadOrderEntries:
+    """
+    The values of the load order window: one prefix string per mod folder,
+    prefilled from the prefixes the files already carry.
+
+    Args:
+        roots (dict): Root name ("Mods", "LogicMods") -> fsmodel.FolderNode tree.
+    """
+    def __init__(self, roots):
+        self.roots = roots
+        self.leaves = {name: list(_leaves(root)) for name, root in roots.items()}
+        self.values = {name: {node.path: node.prefix for node in leaves} for name, leaves in self.leaves.items()}
+
+    def items(self):
+        """Yield (key, node, value) for every mod, the key being "<root>/<mod path>"."""
+        for name, leaves in self.leaves.items():
+            values = self.values[name]
+            for node in leaves:
+                yield f"{name}/{node.path}", node, values.get(node.path, "")
+
+    def reset(self):
+        """Clear every entry (Apply then removes all prefixes)."""
+        for values in self.values.values():
+            for path in values:
+                values[path] = ""
+
+    def set_value(self, key, value):
+        name, path = key.split("/", 1)
+        self.values[name][path] = value
+
+    def rename_entries(self):
+        """
+        Return (folder_path, prefix) pairs for prefixes.plan_load_order; entries are
+        padded to 3 digits and empty entries remove the prefix.
+        """
+        return [(node.full_path, value.zfill(3) if value else "") for _, node, value in self.items()]
+
+    def to_model(self, model):
+        """
+        Put the entered numbers into a LoadOrderModel: mods with a number, in number order.
+        """
+        numbered = [(int(value), key) for key, _, value in self.items() if value]
+        numbered.sort(key=lambda item: (item[0], item[1].lower()))
+        model.entries = [[key, number] for number, key in numbered]
+        return model
+
+    def move(self, model, key, offset):
+        """
+        Move a mod up or down the load order using the gap numbering of LoadOrderModel;
+        a mod without a number is appended at the end first. Only the entries of mods
+        whose number changed are updated.
+
+        Returns:
+            list: Keys whose entry changed.
+        """
+        self.to_model(model)
+        changed = []
+        if key not in model:
+            changed = model.insert(key, len(model))
+            offset = 0
+        changed += model.move(key, offset)
+        numbers = dict(model.entries)
+        for changed_key in set(changed):
+            self.set_value(changed_key, format_number(numbers[changed_key]))
+        return list(set(changed))
+
+def load_entries(itr2_path):
+    """
+    Scan the Mods and LogicMods folders once and return their LoadOrderEntries,
+    prefilled with the prefixes the pak files carry. Disabled mods are included
+    (from their staging folder), so their place in the load order is kept.
+    """
+    roots = {}
+    for name in LOAD_ORDER_ROOTS:
+        mods_root = os.path.join(itr2_path, "IntoTheRadius2", "Content", "Paks", name)
+        if os.path.isdir(mods_root):
+            roots[name] = modstate.load_mod_tree(mods_root)
+    return LoadOrderEntries(roots)
@@ -1,7 +1,8 @@
 import os
-import shutil
 import customtkinter as ctk
 import settings  # To obtain ITR2_Path from config
+from inventory import get_inventory
+from store import remove_tree
 
 class LuaModsFolderItem(ctk.CTkFrame):
     def __init__(self, parent, folder_name, folder_path, refresh_callback, *args, **kwargs):
@@ -48,7 +49,7 @@ class LuaModsFolderItem(ctk.CTkFrame):
         
     def _delete_folder(self, popup):
         try:
-            shutil.rmtree(self.folder_path)
+            remove_tree(self.folder_path)
             popup.destroy()
             self.refresh_callback()
         except Exception as e:
@@ -56,10 +57,26 @@ class LuaModsFolderItem(ctk.CTkFrame):
             popup.destroy()
 
 class LuaModsListView(ctk.CTkFrame):
+    """
+    List of the LuaMods folders with delete buttons. Changes are applied as patches:
+    rows are added or removed for the folders that appeared or disappeared, the
+    others are kept as they are.
+    """
     def __init__(self, parent, *args, **kwargs):
         super().__init__(parent, *args, **kwargs)
+        self.items = {}
+        self.path = None
+        self.message_label = None
         self.build_list()
 
+    def refresh(self):
+        """Check the LuaMods folder for changes (one stat per folder) and patch the list."""
+        self._sync(refresh=True)
+
+    def apply_changes(self):
+        """Patch the list from the inventory, already updated by the folder watcher."""
+        self._sync(refresh=False)
+
     def _get_luamods_path(self):
         itr2_path = settings.get_ITR2_Path()
         if not itr2_path:
@@ -69,19 +86,60 @@ class LuaModsListView(ctk.CTkFrame):
     def build_list(self):
         for child in self.winfo_children():
             child.destroy()
+        self.items = {}
+        self.message_label = None
+        self._sync(refresh=True)
+
+    def _show_message(self, text):
+        if self.message_label is None:
+            self.message_label = ctk.CTkLabel(self, text=text)
+            self.message_label.pack(pady=20)
+        else:
+            self.message_label.configure(text=text)
+
+    def _sync(self, refresh):
         path = self._get_luamods_path()
+        if path != self.path:
+            # Another game folder: drop every row.
+            for item in self.items.values():
+                item.destroy()
+            self.items = {}
+            self.path = path
         if not path or not os.path.isdir(path):
-            ctk.CTkLabel(self, text="LuaMods folder not found or not set").pack(pady=20)
+            for item in self.items.values():
+                item.destroy()
+            self.items = {}
+            self._show_message("LuaMods folder not found or not set")
             return
-        try:
-            items = os.listdir(path)
-        except Exception:
-            items = []
-        folders = sorted([d for d in items if os.path.isdir(os.path.join(path, d))], key=str.lower)
-        if not folders:
-            ctk.CTkLabel(self, text="No LuaMods found").pack(pady=20)
-            return
-        for folder in folders:
-            folder_path = os.path.join(path, folder)
-            item = LuaModsFolderItem(self, folder, folder_path, refresh_callback=self.build_list)
-            item.pack(fill="x", pady=2)
+        folders = get_inventory().load_tree(path, refresh).children
+        wanted = {folder.name: folder for folder in folders}
+        for name in [name for name in self.items if name not in wanted]:
+            self.items.pop(name).destroy()
+        # Insert new rows before the next existing one, so the list stays sorted.
+        next_item = None
+        for folder in reversed(folders):
+            item = self.items.get(folder.name)
+            if item is None:
+                item = LuaModsFolderItem(self, folder.name, folder.full_path,
+                                         refresh_callback=lambda name=folder.name: self.remove_item(name))
+                if next_item is not None:
+                    item.pack(fill="x", pady=2, before=next_item)
+                else:
+                    item.pack(fill="x", pady=2)
+                self.items[folder.name] = item
+            next_item = item
+        self.items = {folder.name: self.items[folder.name] for folder in folders}
+        if folders:
+            if self.message_label is not None:
+                self.message_label.destroy()
+                self.message_label = None
+        else:
+            self._show_message("No LuaMods found")
+
+    def remove_item(self, name):
+        """Drop the row of a deleted folder."""
+        item = self.items.pop(name, None)
+        if item is not None:
+            item.destroy()
+        if not self.items:
+            self._show_message("No LuaMods found")
@@ -1,9 +1,12 @@
+import time
+# Measured from here so the import of the GUI toolkit counts towards startup time.
+STARTUP_START = time.perf_counter()
 import os
+import queue
 import webbrowser
 import customtkinter as ctk
 from PIL import Image
 import settings  # Import the settings module
-from mods import ModsTreeView  # For the "Mods" sub-tab
 
 # Force dark mode and set the default color theme
 ctk.set_appearance_mode("Dark")
@@ -55,19 +58,17 @@ class ModManagerApp(ctk.CTk):
         self.content_frame = ctk.CTkFrame(self.main_frame)
         self.content_frame.pack(side="right", fill="both", expand=True)
 
-        # Create main tabs for "Mods", "Install", "Settings", "Help"
+        # Create main tabs for "Mods", "Install", "Settings", "Help".
+        # Their content is built the first time they are shown.
         self.tabs = {}
+        self.tab_builders = {"Mods": self.populate_mods_tab, "Install": self.populate_install_tab,
+                             "Settings": self.populate_settings_tab, "Help": self.populate_help_tab}
+        self.built_tabs = set()
         for tab in ["Mods", "Install", "Settings", "Help"]:
             btn = ctk.CTkButton(self.nav_tabs_frame, text=tab, command=lambda t=tab: self.show_tab(t))
             btn.pack(pady=10, padx=20, fill="x")
             self.tabs[tab] = ctk.CTkFrame(self.content_frame)
 
-        # Populate tabs.
-        self.populate_mods_tab()
-        self.populate_install_tab()
-        self.populate_help_tab()
-        self.populate_settings_tab()
-
         # Additional bottom navigation buttons.
         self.launch_itr2_button = ctk.CTkButton(self.nav_bottom_frame, text="Launch ITR2", command=self.launch_itr2)
         self.launch_itr2_button.pack(pady=(4,2), padx=20, fill="x")
@@ -78,13 +79,103 @@ class ModManagerApp(ctk.CTk):
 
         # Show default main tab ("Mods")
         self.show_tab("Mods")
+
+        # Finish or undo a bulk enable/disable interrupted by a crash.
+        self.after(100, self.recover_bulk_toggle)
+
+        # Keep the views in sync with changes made outside the manager (see watcher.py).
+        self.watcher = None
+        self.watched_roots = {}
+        self.watch_queue = queue.Queue()
+        self.after(500, self.start_watcher)
+        self.after(250, self._poll_watcher)
+
+        # Startup timing: first paint is the first <Map> of the window, interactive is
+        # the first time the event loop is idle after that.
+        self.startup_times = {}
+        self.bind("<Map>", self._on_first_map, add="+")
+
+    def _on_first_map(self, event):
+        if event.widget is not self or "first_paint" in self.startup_times:
+            return
+        self.startup_times["first_paint"] = time.perf_counter() - STARTUP_START
+        self.after_idle(self._on_interactive)
+
+    def _on_interactive(self):
+        self.startup_times["interactive"] = time.perf_counter() - STARTUP_START
+        print(f"Startup: first paint {self.startup_times['first_paint'] * 1000:.0f} ms, "
+              f"interactive {self.startup_times['interactive'] * 1000:.0f} ms")
+
+    def start_watcher(self):
+        """
+        Watch the Mods, LogicMods and LuaMods folders (and the disabled mods) of the
+        current game folder, replacing any previous watcher.
+        """
+        import modstate
+        from watcher import FolderWatcher
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+        itr2_path = settings.get_ITR2_Path()
+        if not itr2_path:
+            return
+        paks = os.path.join(itr2_path, "IntoTheRadius2", "Content", "Paks")
+        self.watched_roots = {}
+        # LuaMods mods are disabled into the staging area too (by profiles and the command
+        # line), so its staging root is watched like the others to keep the inventory current.
+        for name in ["Mods", "LogicMods", "LuaMods"]:
+            root = os.path.join(paks, name)
+            self.watched_roots[root] = name
+            self.watched_roots[modstate.get_staging_root(root)] = name
+        # The watcher thread only queues the changed folders; they are applied on the Tk thread.
+        self.watcher = FolderWatcher(list(self.watched_roots), self.watch_queue.put).start()
+
+    def _poll_watcher(self):
+        from watcher import split_changes
+        changed = set()
+        try:
+            while True:
+                changed.update(self.watch_queue.get_nowait())
+        except queue.Empty:
+            pass
+        if changed:
+            from inventory import get_inventory
+            inventory = get_inventory()
+            touched = set()
+            for root, rels in split_changes(list(self.watched_roots), changed).items():
+                inventory.update_folders(root, rels)
+                touched.add(self.watched_roots[root])
+            for name in touched:
+                view = self.mods_views.get(name) if hasattr(self, "mods_views") else None
+                if view is not None:
+                    view.apply_changes()
+        self.after(250, self._poll_watcher)
+
+    def recover_bulk_toggle(self):
+        import modstate
+        if not modstate.pending_journal():
+            return
+        from tkinter import messagebox
+        resume = messagebox.askyesno(
+            "Unfinished Enable/Disable",
+            "A bulk enable/disable did not finish last time.\n"
+            "Yes: finish it. No: undo the changes it made.", parent=self)
+        try:
+            modstate.recover_journal(resume=resume)
+        except (OSError, modstate.BulkMoveError) as e:
+            messagebox.showerror("Recovery Failed", str(e), parent=self)
+        self.show_mods_subtab("Mods")
  
     def show_tab(self, tab_name: str):
         for frame in self.tabs.values():
             frame.pack_forget()
+        if tab_name not in self.built_tabs:
+            self.built_tabs.add(tab_name)
+            self.tab_builders[tab_name]()
         self.tabs[tab_name].pack(fill="both", expand=True)
         if tab_name == "Mods":
-            self.show_mods_subtab("Mods")
+            # Shows the cached view again, refreshed if its folders changed.
+            self.show_mods_subtab(self.current_mods_subtab)
  
     def populate_mods_tab(self):
         mods_tab = self.tabs["Mods"]
@@ -98,6 +189,9 @@ class ModManagerApp(ctk.CTk):
         self.mods_subcontent.pack(side="top", fill="both", expand=True)
  
         self.mods_subtabs = {}
+        # Views of the sub-tabs, created on first show and refreshed afterwards.
+        self.mods_views = {}
+        self.current_mods_subtab = "Mods"
         sub_tab_names = ["Mods", "LogicMods", "LuaMods"]
  
         for name in sub_tab_names:
@@ -105,38 +199,94 @@ class ModManagerApp(ctk.CTk):
             btn.pack(side="left", padx=5, pady=5)
             if name == "LuaMods":
                 self.lua_mods_btn = btn  # Reference for advanced mode enabling/disabling.
+                btn.configure(state="normal" if settings.get_AdvancedMode() else "disabled")
             frame = ctk.CTkFrame(self.mods_subcontent)
             self.mods_subtabs[name] = frame
  
-        self.show_mods_subtab("Mods")
+        # Profiles: saved enabled states and load orders that can be switched between.
+        ctk.CTkButton(self.mods_subnav, text="Delete", width=60, command=self.delete_profile).pack(side="right", padx=5, pady=5)
+        ctk.CTkButton(self.mods_subnav, text="Apply", width=60, command=self.apply_profile).pack(side="right", padx=5, pady=5)
+        ctk.CTkButton(self.mods_subnav, text="Save As", width=70, command=self.save_profile).pack(side="right", padx=5, pady=5)
+        self.profile_var = ctk.StringVar(value="")
+        self.profile_menu = ctk.CTkOptionMenu(self.mods_subnav, variable=self.profile_var, values=[""], width=140)
+        self.profile_menu.pack(side="right", padx=5, pady=5)
+        self.refresh_profile_menu()
+ 
+    def refresh_profile_menu(self, selected=None):
+        import profiles
+        names = profiles.list_profiles()
+        self.profile_menu.configure(values=names or [""])
+        if selected is None:
+            selected = self.profile_var.get() if self.profile_var.get() in names else ""
+        self.profile_var.set(selected if selected in names else (names[0] if names else ""))
+ 
+    def save_profile(self):
+        import profiles
+        itr2_path = settings.get_ITR2_Path()
+        if not itr2_path:
+            from tkinter import messagebox
+            messagebox.showerror("Error", "ITR2 path is not set in the configuration.", parent=self)
+            return
+        name = ctk.CTkInputDialog(text="Profile name:", title="Save Profile").get_input()
+        if not name or not name.strip():
+            return
+        profiles.save_profile(name.strip(), profiles.capture_profile(itr2_path))
+        self.refresh_profile_menu(name.strip())
+ 
+    def apply_profile(self):
+        import profiles
+        import modstate
+        from tkinter import messagebox
+        name = self.profile_var.get()
+        itr2_path = settings.get_ITR2_Path()
+        if not name or not itr2_path:
+            return
+        # Only the mods whose state or load order differ from the profile are touched.
+        try:
+            count, seconds = profiles.switch_profile(itr2_path, name)
+            print(f"Switched to profile {name}: {count} changes in {seconds:.2f} s")
+        except (OSError, ValueError, modstate.BulkMoveError) as e:
+            messagebox.showerror("Profile Switch Failed", str(e), parent=self)
+        self.show_mods_subtab(self.current_mods_subtab)
+ 
+    def delete_profile(self):
+        import profiles
+        from tkinter import messagebox
+        name = self.profile_var.get()
+        if not name or not messagebox.askyesno("Delete Profile", f"Delete the profile '{name}'?", parent=self):
+            return
+        try:
+            profiles.delete_profile(name)
+        except OSError as e:
+            print(f"Error deleting profile {name}: {e}")
+        self.refresh_profile_menu()
  
     def show_mods_subtab(self, name):
+        self.current_mods_subtab = name
         for frame in self.mods_subtabs.values():
             frame.pack_forget()
-        if name == "Mods":
-            for widget in self.mods_subtabs[name].winfo_children():
-                widget.destroy()
-            scroll_frame = ctk.CTkScrollableFrame(self.mods_subtabs[name])
-            scroll_frame.pack(fill="both", expand=True)
+        view = self.mods_views.get(name)
+        if view is not None:
+            # Already built: only rescan folders whose mtime changed and redraw if needed.
+            view.refresh()
+        elif name == "Mods":
+            # The tree view scrolls itself and only creates widgets for visible rows.
             from mods import ModsTreeView
-            tree = ModsTreeView(scroll_frame)
+            tree = ModsTreeView(self.mods_subtabs[name])
             tree.pack(fill="both", expand=True)
+            self.mods_views[name] = tree
         elif name == "LogicMods":
-            for widget in self.mods_subtabs[name].winfo_children():
-                widget.destroy()
-            scroll_frame = ctk.CTkScrollableFrame(self.mods_subtabs[name])
-            scroll_frame.pack(fill="both", expand=True)
             from logicmods import LogicModsTreeView
-            tree = LogicModsTreeView(scroll_frame)
+            tree = LogicModsTreeView(self.mods_subtabs[name])
             tree.pack(fill="both", expand=True)
+            self.mods_views[name] = tree
         elif name == "LuaMods":
-            for widget in self.mods_subtabs[name].winfo_children():
-                widget.destroy()
             scroll_frame = ctk.CTkScrollableFrame(self.mods_subtabs[name])
             scroll_frame.pack(fill="both", expand=True)
             from luamods import LuaModsListView
             list_view = LuaModsListView(scroll_frame)
             list_view.pack(fill="both", expand=True)
+            self.mods_views[name] = list_view
             warning_label = ctk.CTkLabel(scroll_frame, 
                 text="Deleting some Lua mods can break others; be sure to know what you are doing",
                 font=("Arial", 10), text_color="red")
@@ -208,11 +358,16 @@ class ModManagerApp(ctk.CTk):
         change_load_order_button = ctk.CTkButton(settings_tab, text="Change Load Order", command=self.change_load_order)
         change_load_order_button.pack(pady=(0,20), padx=20, fill="x")
  
+        check_conflicts_button = ctk.CTkButton(settings_tab, text="Check Conflicts", command=self.check_conflicts)
+        check_conflicts_button.pack(pady=(0,20), padx=20, fill="x")
+ 
+        verify_mods_button = ctk.CTkButton(settings_tab, text="Verify Mods", command=self.verify_mods)
+        verify_mods_button.pack(pady=(0,20), padx=20, fill="x")
+ 
         # Advanced mode checkbox, default state based on config.
         self.advanced_mode_var = ctk.BooleanVar(value=settings.get_AdvancedMode())
         self.advanced_mode_checkbox = ctk.CTkCheckBox(settings_tab, text="Advanced mode", variable=self.advanced_mode_var, command=self.toggle_advanced_mode)
         self.advanced_mode_checkbox.pack(pady=(0,20), padx=20, fill="x")
-        self.toggle_advanced_mode()
  
     def toggle_advanced_mode(self):
         settings.set_AdvancedMode(self.advanced_mode_var.get())
@@ -220,7 +375,8 @@ class ModManagerApp(ctk.CTk):
             self.lua_mods_btn.configure(state="normal")
         else:
             self.lua_mods_btn.configure(state="disabled")
-            self.show_mods_subtab("Mods")
+            if self.current_mods_subtab == "LuaMods":
+                self.show_mods_subtab("Mods")
  
     def install_basic_mod(self):
         from basic_install import open_basic_install_window
@@ -241,6 +397,7 @@ class ModManagerApp(ctk.CTk):
         if folder:
             self.game_folder_entry.delete(0, ctk.END)
             self.game_folder_entry.insert(0, folder)
+            self.start_watcher()
  
     def check_game_path(self):
         settings.check_game_path(self)
@@ -249,6 +406,24 @@ class ModManagerApp(ctk.CTk):
         from load_order import open_load_order_window
         open_load_order_window(self)
  
+    def check_conflicts(self):
+        from conflicts_window import open_conflicts_window
+        open_conflicts_window(self)
+ 
+    def verify_mods(self):
+        # Check the installed files against their install manifests in the background.
+        from jobs import InstallJob
+        from job_window import open_job_window
+        from manifests import verify_manifests
+        itr2_path = settings.get_ITR2_Path()
+        if not itr2_path:
+            from tkinter import messagebox
+            messagebox.showerror("Error", "ITR2 path is not set in the configuration.", parent=self)
+            return
+        job = InstallJob(verify_manifests, itr2_path=itr2_path)
+        open_job_window(self, "Verifying Mods", job, "Verification finished.", action="Verification",
+                        cancelled_message="The verification was cancelled.")
+ 
 if __name__ == "__main__":
     app = ModManagerApp()
     app.mainloop()
@@ -0,0 +1,334 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+import settings
+from extraction import ExtractCancelled, default_workers
+from prefixes import strip_prefix
+
+# One JSON manifest per installed archive, in the config folder.
+MANIFESTS_FOLDER = os.path.join(settings.CONFIG_FOLDER, "manifests")
+
+# Buffer size used when hashing installed files.
+HASH_BUFFER_SIZE = 1024 * 1024
+
+# Where disabled mods are moved (see modstate.DISABLED_FOLDER), relative to Content.
+PAKS_PREFIX = "IntoTheRadius2/Content/Paks/"
+DISABLED_PREFIX = "IntoTheRadius2/Content/DisabledMods/"
+
+def relative_path(itr2_path, path):
+    """Return path relative to the game folder, with "/" separators (as manifests store it)."""
+    return os.path.relpath(path, itr2_path).replace(os.sep, "/")
+
+def install_key(rel):
+    """
+    Key identifying an installed file whatever happened to it since: a mod moved to
+    DisabledMods and a load-order prefix on the file name give the same key.
+    """
+    if rel.startswith(DISABLED_PREFIX):
+        rel = PAKS_PREFIX + rel[len(DISABLED_PREFIX):]
+    folder, _, name = rel.rpartition("/")
+    return f"{folder}/{strip_prefix(name)}".lower()
+
+def _manifest_file(name):
+    safe = re.sub(r'[<>:"/\\|?*]', "_", name).strip() or "mod"
+    return os.path.join(MANIFESTS_FOLDER, safe + ".json")
+
+class Manifest:
+    """
+    Record of the files an install wrote: for each file its path relative to the game
+    folder, size, mtime, SHA-256 (computed while extracting) and the CRC-32 of the
+    zip member it came from.
+
+    Args:
+        name (str): The manifest name, normally the archive file name.
+        itr2_path (str): The ITR2 game folder the files were installed into.
+        archive (str): The archive the files came from.
+    """
+    def __init__(self, name, itr2_path, archive="", files=None, installed_at=None):
+        self.name = name
+        self.itr2_path = itr2_path
+        self.archive = archive
+        self.installed_at = installed_at or time.time()
+        # Relative path -> {"size", "mtime_ns", "sha256", "crc"}.
+        self.files = files or {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_archive(cls, zip_file_path, itr2_path):
+        return cls(os.path.basename(zip_file_path), itr2_path, os.path.abspath(zip_file_path))
+
+    def relative(self, dest):
+        return relative_path(self.itr2_path, dest)
+
+    def add(self, dest, info, sha256):
+        """Record a file just written from the zip member info."""
+        st = os.stat(dest)
+        with self._lock:
+            self.files[self.relative(dest)] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns,
+                                               "sha256": sha256, "crc": info.CRC}
+
+    def rebase(self, staging_rel):
+        """
+        Re-key files recorded while staged below staging_rel (relative to the game
+        folder) to where the commit moved them. Renames keep the mtime, so the records
+        stay valid.
+        """
+        prefix = staging_rel.rstrip("/") + "/"
+        with self._lock:
+            self.files = {rel[len(prefix):] if rel.startswith(prefix) else rel: record
+                          for rel, record in self.files.items()}
+
+    def save(self):
+        os.makedirs(MANIFESTS_FOLDER, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix="manifest.", suffix=".tmp", dir=MANIFESTS_FOLDER)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"name": self.name, "itr2_path": self.itr2_path, "archive": self.archive,
+                           "installed_at": self.installed_at, "files": self.files}, f, indent=1)
+            os.replace(tmp_path, _manifest_file(self.name))
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    @classmethod
+    def load(cls, name):
+        with open(_manifest_file(name), "r") as f:
+            data = json.load(f)
+        return cls(data["name"], data["itr2_path"], data.get("archive", ""), data.get("files", {}),
+                   data.get("installed_at"))
+
+    def resolve(self, rel):
+        """
+        Find where a recorded file is now. Mods may have been disabled since (moved to
+        the DisabledMods staging folder) or had their load-order prefix changed.
+
+        Returns:
+            str: The current full path, or None if the file is gone.
+        """
+        candidates = [rel]
+        if rel.startswith(PAKS_PREFIX):
+            candidates.append(DISABLED_PREFIX + rel[len(PAKS_PREFIX):])
+        for candidate in candidates:
+            path = os.path.join(self.itr2_path, *candidate.split("/"))
+            if os.path.isfile(path):
+                return path
+        base = strip_prefix(rel.rsplit("/", 1)[-1])
+        for candidate in candidates:
+            folder = os.path.join(self.itr2_path, *candidate.split("/")[:-1])
+            try:
+                names = os.listdir(folder)
+            except OSError:
+                continue
+            for name in names:
+                if strip_prefix(name) == base:
+                    return os.path.join(folder, name)
+        return None
+
+def list_manifests():
+    """Return the names of the saved manifests."""
+    if not os.path.isdir(MANIFESTS_FOLDER):
+        return []
+    names = []
+    for file_name in sorted(os.listdir(MANIFESTS_FOLDER), key=str.lower):
+        if file_name.endswith(".json"):
+            try:
+                with open(os.path.join(MANIFESTS_FOLDER, file_name), "r") as f:
+                    names.append(json.load(f)["name"])
+            except (OSError, ValueError, KeyError):
+                continue
+    return names
+
+def delete_manifest(name):
+    os.remove(_manifest_file(name))
+
+def find_installed(itr2_path, rels, min_overlap=0.5, name=None):
+    """
+    Find the manifests of earlier installs into itr2_path that wrote the given files
+    (e.g. an older version of the mod about to be installed). A manifest matches when
+    at least min_overlap of its files are among them, so another mod that merely
+    shares a file is not mistaken for an old version.
+
+    Args:
+        itr2_path (str): The ITR2 game folder.
+        rels (iterable): File paths relative to itr2_path.
+        min_overlap (float): Share of a manifest's files that must be in rels.
+        name (str): A manifest of this name (the same archive) always matches.
+
+    Returns:
+        list: The matching Manifests.
+    """
+    keys = {install_key(rel) for rel in rels}
+    target = os.path.normcase(os.path.abspath(itr2_path))
+    found = []
+    for manifest_name in list_manifests():
+        manifest = Manifest.load(manifest_name)
+        if os.path.normcase(os.path.abspath(manifest.itr2_path)) != target:
+            continue
+        shared = sum(1 for rel in manifest.files if install_key(rel) in keys)
+        if manifest_name == name or (shared and shared >= min_overlap * len(manifest.files)):
+            found.append(manifest)
+    return found
+
+def claim_files(manifest):
+    """
+    Drop the files of manifest from the other manifests of its game folder: those
+    files were overwritten by the install manifest records, so the older records
+    would otherwise be reported as modified forever. A manifest left without files
+    is deleted.
+
+    Returns:
+        int: The number of records dropped.
+    """
+    keys = {install_key(rel) for rel in manifest.files}
+    target = os.path.normcase(os.path.abspath(manifest.itr2_path))
+    dropped = 0
+    for name in list_manifests():
+        if name == manifest.name:
+            continue
+        other = Manifest.load(name)
+        if os.path.normcase(os.path.abspath(other.itr2_path)) != target:
+            continue
+        kept = {rel: record for rel, record in other.files.items() if install_key(rel) not in keys}
+        if len(kept) == len(other.files):
+            continue
+        dropped += len(other.files) - len(kept)
+        if kept:
+            other.files = kept
+            other.save()
+        else:
+            delete_manifest(name)
+    return dropped
+
+def hash_file(path, progress=None, cancel=None):
+    """Return the SHA-256 hex digest of a file, read in HASH_BUFFER_SIZE chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            if cancel is not None and cancel.is_set():
+                raise ExtractCancelled()
+            chunk = f.read(HASH_BUFFER_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            if progress is not None:
+                progress.advance(len(chunk))
+    return digest.hexdigest()
+
+def checksum_file(path, cancel=None):
+    """
+    Read a file once and return both its CRC-32 (comparable to ZipInfo.CRC) and its
+    SHA-256 hex digest.
+    """
+    crc = 0
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            if cancel is not None and cancel.is_set():
+                raise ExtractCancelled()
+            chunk = f.read(HASH_BUFFER_SIZE)
+            if not chunk:
+                break
+            crc = zlib.crc32(chunk, crc)
+            digest.update(chunk)
+    return crc, digest.hexdigest()
+
+class VerifyReport:
+    """
+    Outcome of verify_manifests().
+
+    Attributes:
+        problems (list): (manifest name, relative path, "missing" | "modified").
+        checked (int): Files checked.
+        hashed (int): Files that had to be hashed (size matched, mtime did not).
+        uninstalled (list): Manifests none of whose files exist any more (mod deleted).
+        seconds (float): Time taken.
+    """
+    def __init__(self):
+        self.problems = []
+        self.checked = 0
+        self.hashed = 0
+        self.uninstalled = []
+        self.seconds = 0.0
+
+    @property
+    def ok(self):
+        return not self.problems
+
+    def __str__(self):
+        lines = [f"{self.checked} files checked in {self.seconds:.2f} s ({self.hashed} hashed): "
+                 + ("all intact" if self.ok else f"{len(self.problems)} problem(s)")]
+        lines.extend(f"{name}: {rel} {state}" for name, rel, state in self.problems[:20])
+        if len(self.problems) > 20:
+            lines.append(f"... and {len(self.problems) - 20} more")
+        if self.uninstalled:
+            lines.append(f"Not installed any more: {', '.join(self.uninstalled)}")
+        return "\n".join(lines)
+
+def verify_manifests(names=None, itr2_path=None, workers=None, progress=None, cancel=None):
+    """
+    Check installed files against their manifests.
+
+    A file whose size and mtime match the manifest is taken as intact without reading
+    it. A different size means it was modified. Only files with the right size but
+    another mtime are hashed, in parallel. Matching hashes update the stored mtime,
+    so the next verify skips them again.
+
+    Args:
+        names (list): Manifests to verify; all of them by default.
+        itr2_path (str): If given, only manifests of installs into this game folder.
+        workers (int): Hashing threads; defaults to extraction.default_workers().
+        progress (extraction.ExtractProgress): Optional progress counter (bytes hashed).
+        cancel (threading.Event): Optional event that stops the verification.
+
+    Returns:
+        VerifyReport: The problems found.
+    """
+    start = time.perf_counter()
+    report = VerifyReport()
+    manifests = [Manifest.load(name) for name in (names if names is not None else list_manifests())]
+    if itr2_path is not None:
+        target = os.path.normcase(os.path.abspath(itr2_path))
+        manifests = [m for m in manifests if os.path.normcase(os.path.abspath(m.itr2_path)) == target]
+    to_hash = []
+    for manifest in manifests:
+        paths = {rel: manifest.resolve(rel) for rel in manifest.files}
+        if paths and all(path is None for path in paths.values()):
+            report.uninstalled.append(manifest.name)
+            continue
+        for rel, record in manifest.files.items():
+            report.checked += 1
+            path = paths[rel]
+            if path is None:
+                report.problems.append((manifest.name, rel, "missing"))
+                continue
+            st = os.stat(path)
+            if st.st_size != record["size"]:
+                report.problems.append((manifest.name, rel, "modified"))
+            elif st.st_mtime_ns != record["mtime_ns"]:
+                to_hash.append((manifest, rel, record, path))
+    if progress is not None:
+        progress.start(len(to_hash), sum(record["size"] for _, _, record, _ in to_hash))
+    if to_hash:
+        with ThreadPoolExecutor(max_workers=workers or default_workers()) as pool:
+            futures = [pool.submit(hash_file, path, progress, cancel) for _, _, _, path in to_hash]
+            for (manifest, rel, record, path), future in zip(to_hash, futures):
+                report.hashed += 1
+                if future.result() != record["sha256"]:
+                    report.problems.append((manifest.name, rel, "modified"))
+                else:
+                    record["mtime_ns"] = os.stat(path).st_mtime_ns
+                if progress is not None:
+                    progress.advance(files=1)
+        for manifest in {id(m): m for m, _, _, _ in to_hash}.values():
+            manifest.save()
+    report.seconds = time.perf_counter() - start
+    return report
@@ -1,202 +1,127 @@
 import os
-import shutil
 import customtkinter as ctk
+from tkinter import messagebox
 import settings  # to get the ITR2_Path from config
-
-# List of file extensions to process.
-FILE_EXTS = [".pak", ".ucas", ".utoc"]
-
-class FolderTreeItem(ctk.CTkFrame):
-    def __init__(self, parent, path, indent=0, *args, **kwargs):
-        super().__init__(parent, *args, **kwargs)
-        self.path = path
-        self.indent = indent
-        self.expanded = False
-
-        folder_name = os.path.basename(path)
-        self.has_children = self._check_has_children()
-
-        # Header container.
-        header_frame = ctk.CTkFrame(self, fg_color=self.cget("fg_color"))
-        header_frame.pack(fill="x")
-
-        left_pad = self.indent if self.indent else 0
-
-        # Toggle button (for folders with children).
-        if self.has_children:
-            self.toggle_button = ctk.CTkButton(header_frame, text="+", width=20, command=self.toggle, corner_radius=5)
-            self.toggle_button.pack(side="left", padx=(left_pad, 5))
-        else:
-            ctk.CTkLabel(header_frame, text=" ", width=20).pack(side="left", padx=(left_pad, 5))
-        
-        # Folder label.
-        self.label = ctk.CTkLabel(header_frame, text=folder_name, anchor="w")
-        self.label.pack(side="left", fill="x", expand=True)
-
-        # Add a delete (X) button to all folders.
-        self.delete_button = ctk.CTkButton(header_frame, text="X", width=20, fg_color="#ff5555",
-                                           hover_color="#ff0000", command=self.confirm_delete, corner_radius=5)
-        self.delete_button.pack(side="right", padx=5)
-
-        # For leaf folders, add a checkbox on the right.
-        if not self.has_children:
-            off_file = os.path.join(self.path, "off")
-            default_state = False if os.path.exists(off_file) else True
-            self.check_mod_var = ctk.BooleanVar(value=default_state)
-            self.check_mod = ctk.CTkCheckBox(header_frame, text="", variable=self.check_mod_var, command=self.toggle_mod)
-            self.check_mod.pack(side="right", padx=5)
-
-        self.children_frame = None
-
-    def _check_has_children(self):
-        try:
-            items = os.listdir(self.path)
-        except Exception:
-            items = []
-        subdirs = [d for d in items if os.path.isdir(os.path.join(self.path, d))]
-        return len(subdirs) > 0
-
-    def toggle(self):
-        if self.expanded:
-            self.collapse()
-        else:
-            self.expand()
-
-    def expand(self):
-        self.expanded = True
-        if hasattr(self, "toggle_button"):
-            self.toggle_button.configure(text="-")
-        if not self.children_frame:
-            self.children_frame = ctk.CTkFrame(self, fg_color=self.cget("fg_color"))
-            self.children_frame.pack(fill="x", padx=10)
-            self._populate_children()
-        else:
-            self.children_frame.pack(fill="x", padx=10)
-
-    def collapse(self):
-        self.expanded = False
-        if hasattr(self, "toggle_button"):
-            self.toggle_button.configure(text="+")
-        if self.children_frame:
-            self.children_frame.forget()
-
-    def _populate_children(self):
-        try:
-            items = os.listdir(self.path)
-        except Exception:
-            items = []
-        subdirs = sorted(
-            [os.path.join(self.path, d) for d in items if os.path.isdir(os.path.join(self.path, d))],
-            key=lambda x: os.path.basename(x).lower()
-        )
-        for sub in subdirs:
-            child = FolderTreeItem(self.children_frame, sub, indent=self.indent + 10)
-            child.pack(fill="x", pady=2)
-
-    def toggle_mod(self):
-        """
-        Toggle mod state based on the checkbox.
-        If checked (enabled): remove the "off" file and rename files (remove .off).
-        If unchecked (disabled): create an "off" file and rename files (append .off).
-        """
-        off_file = os.path.join(self.path, "off")
-        is_enabled = self.check_mod_var.get()
-        if is_enabled:
-            if os.path.exists(off_file):
-                os.remove(off_file)
-            self._rename_files(add_off=False)
-        else:
-            try:
-                with open(off_file, "w") as f:
-                    f.write("")
-            except Exception as e:
-                print(f"Error creating off file in {self.path}: {e}")
-            self._rename_files(add_off=True)
-
-    def _rename_files(self, add_off=True):
-        try:
-            for item in os.listdir(self.path):
-                full_item = os.path.join(self.path, item)
-                if os.path.isfile(full_item):
-                    for ext in FILE_EXTS:
-                        if add_off:
-                            if item.endswith(ext) and not item.endswith(ext + ".off"):
-                                new_name = item + ".off"
-                                os.rename(full_item, os.path.join(self.path, new_name))
-                        else:
-                            if item.endswith(ext + ".off"):
-                                new_name = item[:-4]
-                                os.rename(full_item, os.path.join(self.path, new_name))
-        except Exception as e:
-            print(f"Error renaming files in {self.path}: {e}")
-
-    def confirm_delete(self):
-        """
-        Ask for confirmation to delete the folder with a popup. If confirmed,
-        delete the folder and remove this item from the UI.
-        """
-        popup = ctk.CTkToplevel(self)
-        popup.title("Delete Folder")
-        # Center the popup relative to the parent window.
-        width, height = 300, 120
-        screen_width = self.winfo_screenwidth()
-        screen_height = self.winfo_screenheight()
-        x = (screen_width - width) // 2
-        y = (screen_height - height) // 2
-        popup.geometry(f"{width}x{height}+{x}+{y}")
-        popup.transient(self)
-        popup.grab_set()
-        # Message
-        msg = f"Are you sure to delete {os.path.basename(self.path)}?"
-        label = ctk.CTkLabel(popup, text=msg)
-        label.pack(pady=10, padx=10)
-        # Button frame for Yes/No
-        btn_frame = ctk.CTkFrame(popup)
-        btn_frame.pack(pady=10)
-        yes_btn = ctk.CTkButton(btn_frame, text="Yes", width=60, command=lambda: self._delete_folder(popup))
-        yes_btn.pack(side="left", padx=5)
-        no_btn = ctk.CTkButton(btn_frame, text="No", width=60, command=popup.destroy)
-        no_btn.pack(side="left", padx=5)
-        popup.wait_window(popup)
-
-    def _delete_folder(self, popup):
-        try:
-            shutil.rmtree(self.path)
-            # Destroy the popup and self from the UI.
-            popup.destroy()
-            self.destroy()
-        except Exception as e:
-            print(f"Error deleting folder {self.path}: {e}")
-            popup.destroy()
+import modstate
+from fsmodel import tree_signature
+from virtual_tree import VirtualTreeView
 
 class ModsTreeView(ctk.CTkFrame):
+    """
+    Tree of the mod folders below Paks/Mods, with enable checkboxes and delete buttons.
+    Only the rows on screen have widgets (see virtual_tree.VirtualTreeView).
+    Disabled mods are shown from the staging area they were moved to (see modstate).
+    """
+    FOLDER_NAME = "Mods"
+    NOT_FOUND_TEXT = "Mods folder not found or not set"
+    EMPTY_TEXT = "No mods found"
+
     def __init__(self, parent, *args, **kwargs):
         super().__init__(parent, *args, **kwargs)
         self.mods_path = self._get_mods_path()
+        self.tree = None
+        self.signature = None
         self.build_tree()
 
     def _get_mods_path(self):
         itr2_path = settings.get_ITR2_Path()
         if not itr2_path:
             return None
-        return os.path.join(itr2_path, "IntoTheRadius2", "Content", "Paks", "Mods")
+        return os.path.join(itr2_path, "IntoTheRadius2", "Content", "Paks", self.FOLDER_NAME)
+
+    def refresh(self):
+        """
+        Bring the view up to date with the disk, e.g. when its tab is shown again.
+        Only changed folders are rescanned, and the rows are only redrawn if the model changed.
+        """
+        mods_path = self._get_mods_path()
+        if mods_path != self.mods_path:
+            # The game folder was changed in the settings: start over.
+            self.mods_path = mods_path
+            self.tree = None
+            self.signature = None
+        self.build_tree()
+
+    def apply_changes(self):
+        """
+        Update the tree after the folder watcher patched the inventory: the model is read
+        back without touching the disk and the rows are redrawn only if it changed.
+        """
+        if self.tree is None or self._get_mods_path() != self.mods_path:
+            self.refresh()
+            return
+        root_node = modstate.load_mod_tree(self.mods_path, refresh=False)
+        signature = tree_signature(root_node)
+        if signature != self.signature:
+            self.signature = signature
+            self.tree.set_root(root_node)
 
     def build_tree(self):
-        for child in self.winfo_children():
-            child.destroy()
         if not self.mods_path or not os.path.isdir(self.mods_path):
-            ctk.CTkLabel(self, text="Mods folder not found or not set").pack(pady=20)
+            for child in self.winfo_children():
+                child.destroy()
+            self.tree = None
+            self.signature = None
+            ctk.CTkLabel(self, text=self.NOT_FOUND_TEXT).pack(pady=20)
             return
+        # Only folders whose directory mtime changed are listed again.
+        root_node = modstate.load_mod_tree(self.mods_path)
+        signature = tree_signature(root_node)
+        if self.tree is not None:
+            if signature != self.signature:
+                self.signature = signature
+                self.tree.set_root(root_node)
+            return
+        self.signature = signature
+        for child in self.winfo_children():
+            child.destroy()
+        # Bulk actions apply to the selected mods (click names to select), or to all mods.
+        toolbar = ctk.CTkFrame(self, fg_color=self.cget("fg_color"))
+        toolbar.pack(side="top", fill="x", padx=5, pady=(5, 0))
+        ctk.CTkButton(toolbar, text="Enable", width=80, command=lambda: self.bulk_toggle("enable")).pack(side="left", padx=5)
+        ctk.CTkButton(toolbar, text="Disable", width=80, command=lambda: self.bulk_toggle("disable")).pack(side="left", padx=5)
+        ctk.CTkButton(toolbar, text="Invert", width=80, command=lambda: self.bulk_toggle("invert")).pack(side="left", padx=5)
+        ctk.CTkButton(toolbar, text="Clear Selection", width=110,
+                      command=lambda: self.tree.clear_selection()).pack(side="left", padx=5)
+        self.selection_label = ctk.CTkLabel(toolbar, text="", anchor="w")
+        self.selection_label.pack(side="left", padx=5)
+        self.tree = VirtualTreeView(self, root_node, on_toggle_mod=self._toggle_mod, on_delete=self._delete_mod,
+                                    on_select=self._update_selection_label, empty_text=self.EMPTY_TEXT)
+        self.tree.pack(fill="both", expand=True)
+        self._update_selection_label()
+
+    def _update_selection_label(self):
+        count = len(self.tree.selected)
+        self.selection_label.configure(text=f"{count} selected" if count else "No selection: actions apply to all mods")
+
+    def bulk_toggle(self, mode):
+        """
+        Enable, disable or invert the selected mods (all mods if none is selected).
+        The moves are planned first, run as one journaled transaction (see
+        modstate.apply_moves) and the tree is refreshed once at the end.
+        """
+        leaves = self.tree.selected_leaves()
+        if mode == "enable":
+            changes = [(node.path, True) for node in leaves]
+        elif mode == "disable":
+            changes = [(node.path, False) for node in leaves]
+        else:
+            changes = [(node.path, not node.enabled) for node in leaves]
+        try:
+            modstate.apply_moves(modstate.plan_moves(self.mods_path, changes))
+        except modstate.BulkMoveError as e:
+            messagebox.showerror("Enable/Disable Failed", str(e), parent=self)
+        self.tree.clear_selection()
+        self.build_tree()
+
+    def _toggle_mod(self, node, enabled):
+        # Enabling/disabling moves the whole folder with a single rename.
         try:
-            items = os.listdir(self.mods_path)
-        except Exception:
-            items = []
-        folders = sorted(
-            [os.path.join(self.mods_path, d) for d in items if os.path.isdir(os.path.join(self.mods_path, d))],
-            key=lambda x: os.path.basename(x).lower()
-        )
-        if not folders:
-            ctk.CTkLabel(self, text="No mods found").pack(pady=20)
-        for folder in folders:
-            item = FolderTreeItem(self, folder, indent=10)
-            item.pack(fill="x", pady=2)
+            node.full_path = modstate.move_mod(self.mods_path, node.path, enabled)
+        except OSError as e:
+            print(f"Error {'enabling' if enabled else 'disabling'} {node.path}: {e}")
+            return False
+        return True
+
+    def _delete_mod(self, node):
+        modstate.delete_mod(self.mods_path, node.path)
@@ -0,0 +1,302 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import settings
+from fsmodel import PAK_EXTS, merge_trees
+from inventory import get_inventory
+from store import remove_tree
+
+# Folder next to Paks holding disabled mods. The game only mounts what is below Paks,
+# so moving a mod folder here disables it with a single directory rename.
+DISABLED_FOLDER = "DisabledMods"
+
+# Write-ahead journal of the bulk enable/disable in progress, if any.
+JOURNAL_FILE = os.path.join(settings.CONFIG_FOLDER, "toggle_journal.jsonl")
+
+def get_staging_root(mods_root):
+    """
+    Return the staging folder for a mod root, e.g.
+    {ITR2_Path}/IntoTheRadius2/Content/Paks/Mods -> {ITR2_Path}/IntoTheRadius2/Content/DisabledMods/Mods
+    """
+    mods_root = os.path.normpath(mods_root)
+    content = os.path.dirname(os.path.dirname(mods_root))
+    return os.path.join(content, DISABLED_FOLDER, os.path.basename(mods_root))
+
+def _full(root, rel):
+    return os.path.join(root, *rel.split("/"))
+
+def live_path(mods_root, rel):
+    """Return where the mod folder rel lives while enabled."""
+    return _full(mods_root, rel)
+
+def staged_path(mods_root, rel):
+    """Return where the mod folder rel lives while disabled."""
+    return _full(get_staging_root(mods_root), rel)
+
+def _prune_empty_parents(root, rel):
+    # Remove the group folders of rel left empty by a move, never root itself.
+    parts = rel.split("/")[:-1]
+    for depth in range(len(parts), 0, -1):
+        try:
+            os.rmdir(_full(root, "/".join(parts[:depth])))
+        except OSError:
+            break
+
+def _move_paths(mods_root, rel, enabled):
+    # (src, dst, src_root, dst_root) of the move putting rel into the requested state.
+    live_root, staging_root = mods_root, get_staging_root(mods_root)
+    if enabled:
+        return staged_path(mods_root, rel), live_path(mods_root, rel), staging_root, live_root
+    return live_path(mods_root, rel), staged_path(mods_root, rel), live_root, staging_root
+
+def _rename(src, dst):
+    if os.path.exists(dst):
+        raise FileExistsError(f"Cannot move {src}: {dst} already exists")
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    os.rename(src, dst)
+
+def move_mod(mods_root, rel, enabled):
+    """
+    Move the mod folder rel between the mod root and its staging area with one rename.
+
+    Args:
+        mods_root (str): The Mods, LogicMods or LuaMods folder.
+        rel (str): The mod folder relative to mods_root, with "/" separators.
+        enabled (bool): True to move it into mods_root, False to move it to staging.
+
+    Returns:
+        str: The new full path of the mod folder.
+
+    Raises:
+        OSError: If the folder does not exist or the target is already taken.
+    """
+    src, dst, src_root, _ = _move_paths(mods_root, rel, enabled)
+    if os.path.exists(dst) and not os.path.exists(src):
+        return dst  # Already in the requested state.
+    _rename(src, dst)
+    _prune_empty_parents(src_root, rel)
+    return dst
+
+class BulkMoveError(Exception):
+    """
+    Raised when a bulk enable/disable failed. The moves already done were rolled back,
+    unless recovery_pending is set: then some could not be undone either, and the
+    journal was kept for recover_journal().
+
+    Attributes:
+        failures (list): (rel, exception) pairs for the moves that failed.
+        recovery_pending (bool): True if the rollback was incomplete.
+    """
+    def __init__(self, failures, recovery_pending=False):
+        self.failures = failures
+        self.recovery_pending = recovery_pending
+        names = ", ".join(rel for rel, _ in failures[:5])
+        if recovery_pending:
+            outcome = "some changes could not be undone, so recovery will be offered on the next start"
+        else:
+            outcome = "all changes were rolled back"
+        super().__init__(f"{len(failures)} mod(s) could not be moved ({names}); {outcome}")
+
+
+def plan_moves(mods_root, changes):
+    """
+    Compute the directory renames needed to bring mods into the requested states.
+
+    Args:
+        mods_root (str): The Mods, LogicMods or LuaMods folder.
+        changes (iterable): (rel, enabled) pairs.
+
+    Returns:
+        list: Move dicts with the keys rel, src, dst, src_root and dst_root; mods already
+        in the requested state are left out.
+    """
+    ops = []
+    for rel, enabled in changes:
+        src, dst, src_root, dst_root = _move_paths(mods_root, rel, enabled)
+        if os.path.exists(dst) and not os.path.exists(src):
+            continue
+        ops.append({"rel": rel, "src": src, "dst": dst, "src_root": src_root, "dst_root": dst_root})
+    return ops
+
+def _append_journal(f, record):
+    f.write(json.dumps(record) + "\n")
+    f.flush()
+    os.fsync(f.fileno())
+
+def _prune_after(ops):
+    # Done once every rename finished, so no worker races a folder being removed.
+    for op in ops:
+        _prune_empty_parents(op["src_root"], op["rel"])
+        _prune_empty_parents(op["dst_root"], op["rel"])
+
+def apply_moves(ops, workers=None, journal_path=JOURNAL_FILE):
+    """
+    Run a list of planned moves as one transaction.
+
+    The full plan is written to a journal before anything is renamed, and every
+    finished rename is appended to it. The renames run in parallel on a thread pool.
+    If any of them fails, the ones already done are moved back and BulkMoveError is
+    raised. If the process dies halfway, recover_journal() can roll the plan back or
+    finish it on the next start.
+
+    Args:
+        ops (list): Moves as returned by plan_moves().
+        workers (int): Number of threads; defaults to one per move, up to 8.
+        journal_path (str): Where to write the journal.
+
+    Raises:
+        BulkMoveError: If some moves failed. Everything was rolled back, or if an undo
+            failed as well, the journal is kept and recovery_pending is set.
+    """
+    if not ops:
+        return
+    workers = workers or min(8, len(ops))
+    lock = threading.Lock()
+    done = []
+    failures = []
+    undo_failures = []
+    with open(journal_path, "w") as journal:
+        _append_journal(journal, {"ops": ops})
+
+        def run(index):
+            op = ops[index]
+            try:
+                _rename(op["src"], op["dst"])
+            except OSError as e:
+                with lock:
+                    failures.append((op["rel"], e))
+                return
+            with lock:
+                done.append(index)
+                _append_journal(journal, {"done": index})
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(run, range(len(ops))))
+
+        if failures:
+            for index in reversed(done):
+                op = ops[index]
+                try:
+                    _rename(op["dst"], op["src"])
+                    _append_journal(journal, {"undone": index})
+                except OSError as e:
+                    print(f"Error rolling back {op['rel']}: {e}")
+                    undo_failures.append((op["rel"], e))
+    if undo_failures:
+        # Mods are half-moved: the journal is the only record of how to recover.
+        raise BulkMoveError(failures + undo_failures, recovery_pending=True)
+    _prune_after(ops)
+    os.remove(journal_path)
+    if failures:
+        raise BulkMoveError(failures)
+
+def pending_journal(journal_path=JOURNAL_FILE):
+    """Return True if a bulk enable/disable was interrupted and needs recover_journal()."""
+    return os.path.exists(journal_path)
+
+def recover_journal(resume=False, journal_path=JOURNAL_FILE):
+    """
+    Finish or undo an interrupted bulk enable/disable.
+
+    The state of each planned move is read from the disk (which side of the move
+    exists), so this is safe whatever point the interrupted run had reached. If a
+    move fails again, the journal is kept so recovery can be retried.
+
+    Args:
+        resume (bool): True to complete the remaining moves, False to roll back
+            the ones that were done.
+
+    Returns:
+        int: The number of folders moved during recovery.
+
+    Raises:
+        BulkMoveError: If some moves failed; recovery_pending is set.
+    """
+    if not os.path.exists(journal_path):
+        return 0
+    with open(journal_path) as f:
+        first = f.readline()
+    try:
+        ops = json.loads(first)["ops"]
+    except (ValueError, KeyError):
+        ops = []
+    moved = 0
+    failures = []
+    for op in ops:
+        applied = os.path.exists(op["dst"]) and not os.path.exists(op["src"])
+        pending = os.path.exists(op["src"]) and not os.path.exists(op["dst"])
+        try:
+            if resume and pending:
+                _rename(op["src"], op["dst"])
+                moved += 1
+            elif not resume and applied:
+                _rename(op["dst"], op["src"])
+                moved += 1
+        except OSError as e:
+            print(f"Error recovering {op['rel']}: {e}")
+            failures.append((op["rel"], e))
+    if failures:
+        raise BulkMoveError(failures, recovery_pending=True)
+    _prune_after(ops)
+    os.remove(journal_path)
+    return moved
+
+def delete_mod(mods_root, rel):
+    """Delete a mod (or group) folder from both the mod root and its staging area."""
+    for path in (live_path(mods_root, rel), staged_path(mods_root, rel)):
+        if os.path.isdir(path):
+            remove_tree(path)
+
+def _legacy_disabled(node):
+    # Leaves the inventory saw as disabled with the old "off" marker / ".off" suffix.
+    if node.children:
+        for child in node.children:
+            yield from _legacy_disabled(child)
+    elif node.path and not node.enabled:
+        yield node.path
+
+def migrate_legacy(mods_root, rel):
+    """
+    Convert a mod disabled the old way (an "off" marker file and pak files renamed to
+    ".off") into a plain folder moved into the staging area.
+    """
+    folder = live_path(mods_root, rel)
+    for item in os.listdir(folder):
+        full_item = os.path.join(folder, item)
+        if item == "off" and os.path.isfile(full_item):
+            os.remove(full_item)
+        elif any(item.endswith(ext + ".off") for ext in PAK_EXTS):
+            os.rename(full_item, os.path.join(folder, item[:-4]))
+    move_mod(mods_root, rel, False)
+
+def load_mod_tree(mods_root, refresh=True):
+    """
+    Return the folder model of a mod root including its disabled mods.
+
+    Mods still disabled the old way are migrated to the staging area first.
+    Disabled folders have enabled=False and full_path pointing into the staging area.
+
+    Args:
+        mods_root (str): The mod root.
+        refresh (bool): Check the disk first (see ModInventory.load_tree).
+
+    Returns:
+        fsmodel.FolderNode: The merged root node.
+    """
+    inventory = get_inventory()
+    live = inventory.load_tree(mods_root, refresh)
+    legacy = list(_legacy_disabled(live))
+    staging_root = get_staging_root(mods_root)
+    if legacy:
+        migrated = 0
+        for rel in legacy:
+            try:
+                migrate_legacy(mods_root, rel)
+                migrated += 1
+            except OSError as e:
+                print(f"Error migrating disabled mod {rel}: {e}")
+        print(f"Moved {migrated} mod(s) disabled the old way (\"off\" marker) to {staging_root}")
+        live = inventory.load_tree(mods_root)
+    staged = inventory.load_tree(staging_root, refresh) if os.path.isdir(staging_root) else None
+    return merge_trees(live, staged)
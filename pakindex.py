@@ -0,0 +1,383 @@
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+import settings
+from fsmodel import PAK_EXTS
+from inventory import get_inventory
+
+# Cache of parsed pak/utoc indexes, keyed by file path and checked by size and mtime.
+PAK_INDEX_FILE = os.path.join(settings.CONFIG_FOLDER, "pak_index.sqlite3")
+
+# Mod roots whose pak files are mounted by the game.
+CONFLICT_ROOTS = ["Mods", "LogicMods"]
+
+PAK_MAGIC = 0x5A6F12E1
+UTOC_MAGIC = b"-==--==--==--==-"
+
+# (footer size, offset of the magic in the footer) for the known .pak footer layouts,
+# newest first: v9+ (frozen index flag), v8 with 5 or 4 compression names, v7, v4-6, v1-3.
+PAK_FOOTERS = [(222, 17), (221, 17), (189, 17), (61, 17), (45, 1), (44, 0)]
+
+# IoStore container flags (EIoContainerFlags).
+UTOC_ENCRYPTED = 0x02
+UTOC_SIGNED = 0x04
+UTOC_INDEXED = 0x08
+
+# Per-container files every IoStore mod ships; they are not asset overrides.
+IGNORED_ASSETS = ("assetregistry.bin",)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pak_files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    assets TEXT NOT NULL
+);
+"""
+
+class PakIndexError(Exception):
+    """Raised when a .pak or .utoc index cannot be read (unknown layout, encrypted index)."""
+
+class _Reader:
+    """Little-endian reader over a memory map; only the bytes read are paged in."""
+    def __init__(self, data, offset=0):
+        self.data = data
+        self.offset = offset
+
+    def unpack(self, fmt):
+        values = struct.unpack_from(fmt, self.data, self.offset)
+        self.offset += struct.calcsize(fmt)
+        return values
+
+    def i32(self):
+        return self.unpack("<i")[0]
+
+    def u32(self):
+        return self.unpack("<I")[0]
+
+    def i64(self):
+        return self.unpack("<q")[0]
+
+    def skip(self, count):
+        self.offset += count
+        if self.offset > len(self.data):
+            raise PakIndexError("index runs past the end of the file")
+
+    def fstring(self):
+        length = self.i32()
+        if length == 0:
+            return ""
+        if length > 0:
+            raw = self.data[self.offset:self.offset + length]
+            self.skip(length)
+            return raw.rstrip(b"\0").decode("utf-8", "replace")
+        raw = self.data[self.offset:self.offset - 2 * length]
+        self.skip(-2 * length)
+        return raw.decode("utf-16-le", "replace").rstrip("\0")
+
+def _join_mount(mount_point, path):
+    mount_point = mount_point.replace("\\", "/")
+    while mount_point.startswith("../"):
+        mount_point = mount_point[3:]
+    return (mount_point.strip("/") + "/" + path.lstrip("/")).lstrip("/")
+
+def _pak_footer(data):
+    size = len(data)
+    for footer_size, magic_offset in PAK_FOOTERS:
+        start = size - footer_size
+        if start < 0:
+            continue
+        reader = _Reader(data, start + magic_offset)
+        magic, version, index_offset, index_size = reader.unpack("<IIqq")
+        if magic == PAK_MAGIC:
+            encrypted = magic_offset > 0 and data[start + magic_offset - 1] != 0
+            return version, index_offset, index_size, encrypted
+    raise PakIndexError("no pak footer found")
+
+def parse_pak_index(data):
+    """
+    List the files of a .pak from its footer and index, without touching the payload.
+
+    Args:
+        data: The file contents (an mmap or bytes).
+
+    Returns:
+        list: Asset paths, mount point included (leading "../" removed).
+    """
+    version, index_offset, index_size, encrypted = _pak_footer(data)
+    if encrypted:
+        raise PakIndexError("encrypted index")
+    if index_offset < 0 or index_offset + index_size > len(data):
+        raise PakIndexError("index outside the file")
+    reader = _Reader(data, index_offset)
+    mount_point = reader.fstring()
+    count = reader.i32()
+    paths = []
+    if version < 10:
+        for _ in range(count):
+            name = reader.fstring()
+            reader.skip(24)  # offset, size, uncompressed size
+            compression = reader.u32()
+            if version == 1:
+                reader.skip(8)  # timestamp
+            reader.skip(20)  # hash
+            if version >= 3:
+                if compression:
+                    reader.skip(16 * reader.u32())  # compression blocks
+                reader.skip(5)  # encrypted flag, compression block size
+            paths.append(_join_mount(mount_point, name))
+        return paths
+    reader.skip(8)  # path hash seed
+    if reader.u32():
+        reader.skip(36)  # path hash index offset, size and hash
+    if not reader.u32():
+        raise PakIndexError("pak has no full directory index")
+    directory_offset, directory_size = reader.unpack("<qq")
+    if directory_offset < 0 or directory_offset + directory_size > len(data):
+        raise PakIndexError("directory index outside the file")
+    reader = _Reader(data, directory_offset)
+    for _ in range(reader.i32()):
+        directory = reader.fstring()
+        directory = "" if directory == "/" else directory
+        for _ in range(reader.i32()):
+            name = reader.fstring()
+            reader.skip(4)  # encoded entry offset
+            paths.append(_join_mount(mount_point, directory + name))
+    return paths
+
+def parse_utoc_index(data):
+    """
+    List the files of an IoStore .utoc from its header and directory index.
+
+    Args:
+        data: The file contents (an mmap or bytes).
+
+    Returns:
+        list: Asset paths, mount point included (leading "../" removed).
+    """
+    if data[:16] != UTOC_MAGIC:
+        raise PakIndexError("not a utoc file")
+    reader = _Reader(data, 16)
+    version = reader.unpack("<B3x")[0]
+    (header_size, entry_count, block_count, block_entry_size, method_count, method_length,
+     _, directory_size, _) = reader.unpack("<9I")
+    reader.skip(24)  # container id, encryption key guid
+    flags = reader.unpack("<B3x")[0]
+    seed_count = reader.u32()
+    reader.skip(8)  # partition size
+    without_perfect_hash = reader.u32()
+    if not flags & UTOC_INDEXED or not directory_size:
+        return []
+    if flags & UTOC_ENCRYPTED:
+        raise PakIndexError("encrypted directory index")
+    reader = _Reader(data, header_size)
+    reader.skip(entry_count * 12)  # chunk ids
+    reader.skip(entry_count * 10)  # offsets and lengths
+    if version >= 4:
+        reader.skip(seed_count * 4)  # perfect hash seeds
+    if version >= 5:
+        reader.skip(without_perfect_hash * 4)
+    reader.skip(block_count * block_entry_size)
+    reader.skip(method_count * method_length)
+    if flags & UTOC_SIGNED:
+        hash_size = reader.i32()
+        reader.skip(2 * hash_size + block_count * 20)
+    end = reader.offset + directory_size
+    if end > len(data):
+        raise PakIndexError("directory index outside the file")
+    mount_point = reader.fstring()
+    directories = [reader.unpack("<4I") for _ in range(reader.i32())]
+    files = [reader.unpack("<3I") for _ in range(reader.i32())]
+    names = [reader.fstring() for _ in range(reader.i32())]
+    none = 0xFFFFFFFF
+    paths = []
+    stack = [(0, "")] if directories else []
+    while stack:
+        index, prefix = stack.pop()
+        name, first_child, next_sibling, first_file = directories[index]
+        if next_sibling != none:
+            stack.append((next_sibling, prefix))
+        path = prefix + names[name] + "/" if name != none else prefix
+        if first_child != none:
+            stack.append((first_child, path))
+        file_index = first_file
+        while file_index != none:
+            file_name, next_file, _ = files[file_index]
+            paths.append(_join_mount(mount_point, path + names[file_name]))
+            file_index = next_file
+    return paths
+
+def read_index(path):
+    """
+    Memory-map a .pak or .utoc and list its files; only the footer, header and
+    index pages are read from disk.
+
+    Returns:
+        list: Asset paths.
+
+    Raises:
+        PakIndexError: If the index cannot be read.
+        OSError: If the file cannot be opened.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            try:
+                if path.lower().endswith(".utoc"):
+                    return parse_utoc_index(data)
+                return parse_pak_index(data)
+            except (struct.error, IndexError, UnicodeError) as e:
+                raise PakIndexError(f"corrupt index: {e}")
+
+class PakIndexCache:
+    """
+    Parsed indexes of .pak/.utoc files, stored on disk and reused while a file's
+    size and mtime are unchanged, so a rescan only parses the files that changed.
+    """
+    def __init__(self, db_path=PAK_INDEX_FILE):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self.stats = {"parsed": 0, "cached": 0}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def assets(self, path, size, mtime_ns):
+        """
+        Return (status, asset paths) for a file; status is "ok" or the reason the
+        index could not be read.
+        """
+        with self._lock:
+            row = self._db.execute("SELECT size, mtime_ns, status, assets FROM pak_files WHERE path = ?",
+                                   (path,)).fetchone()
+        if row and row[0] == size and row[1] == mtime_ns:
+            self.stats["cached"] += 1
+            return row[2], row[3].split("\n") if row[3] else []
+        self.stats["parsed"] += 1
+        try:
+            status, assets = "ok", read_index(path)
+        except (PakIndexError, OSError, ValueError) as e:
+            status, assets = str(e) or type(e).__name__, []
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO pak_files (path, size, mtime_ns, status, assets) "
+                             "VALUES (?, ?, ?, ?, ?)", (path, size, mtime_ns, status, "\n".join(assets)))
+        return status, assets
+
+class ConflictReport:
+    """
+    Assets provided by more than one enabled mod.
+
+    Attributes:
+        conflicts (dict): Asset path -> mod keys providing it, in load order; the last one wins.
+        errors (list): (file path, reason) for pak files whose index could not be read.
+        files (int): Number of pak/utoc files looked at.
+        stats (dict): Files parsed and taken from the cache during the scan.
+    """
+    def __init__(self):
+        self.conflicts = {}
+        self.errors = []
+        self.files = 0
+        self.stats = {}
+
+    def by_winner(self):
+        """
+        Group the conflicts by the pair of mods involved.
+
+        Returns:
+            dict: (winning mod, overridden mod) -> sorted list of asset paths.
+        """
+        pairs = {}
+        for asset, mods in self.conflicts.items():
+            winner = mods[-1]
+            for loser in mods[:-1]:
+                pairs.setdefault((winner, loser), []).append(asset)
+        for assets in pairs.values():
+            assets.sort()
+        return pairs
+
+    def format(self, examples=5):
+        """Describe the report as text, one block per pair of conflicting mods."""
+        lines = [f"{len(self.conflicts)} conflicting assets in {self.files} pak files "
+                 f"({self.stats.get('parsed', 0)} parsed, {self.stats.get('cached', 0)} cached)"]
+        for (winner, loser), assets in sorted(self.by_winner().items(), key=lambda item: -len(item[1])):
+            lines.append(f"{winner} overrides {loser}: {len(assets)} assets")
+            lines.extend(f"    {asset}" for asset in assets[:examples])
+            if len(assets) > examples:
+                lines.append(f"    ... and {len(assets) - examples} more")
+        for path, reason in self.errors:
+            lines.append(f"Could not read {path}: {reason}")
+        return "\n".join(lines)
+
+def _mod_leaves(node):
+    if node.children:
+        for child in node.children:
+            yield from _mod_leaves(child)
+    elif node.path:
+        yield node
+
+def scan_conflicts(itr2_path, cache=None):
+    """
+    Find assets overridden by more than one enabled mod in Mods and LogicMods.
+
+    The mod folders and their files come from the inventory; each .pak/.utoc index
+    is taken from the cache unless the file's size or mtime changed (one stat per file). Mods are put in
+    load order by the names of their pak files (the load-order prefix sorts first),
+    the game mounting later paks over earlier ones.
+
+    Returns:
+        ConflictReport: The conflicts found.
+    """
+    cache = cache or get_pak_index_cache()
+    before = dict(cache.stats)
+    inventory = get_inventory()
+    paks = os.path.join(itr2_path, "IntoTheRadius2", "Content", "Paks")
+    report = ConflictReport()
+    providers = {}
+    for root_name in CONFLICT_ROOTS:
+        mods_root = os.path.join(paks, root_name)
+        if not os.path.isdir(mods_root):
+            continue
+        for node in _mod_leaves(inventory.load_tree(mods_root)):
+            mod_key = f"{root_name}/{node.path}"
+            for name, _, _ in inventory.list_files(mods_root, node.path):
+                lower = name.lower()
+                if not lower.endswith(PAK_EXTS) or lower.endswith(".ucas"):
+                    continue
+                report.files += 1
+                path = os.path.join(node.full_path, name)
+                # Stat the file itself: rewriting a pak in place does not change its folder's mtime.
+                try:
+                    st = os.stat(path)
+                except OSError as e:
+                    report.errors.append((path, str(e)))
+                    continue
+                status, assets = cache.assets(path, st.st_size, st.st_mtime_ns)
+                if status != "ok":
+                    report.errors.append((path, status))
+                order = (os.path.splitext(lower)[0], mod_key.lower())
+                for asset in assets:
+                    key = asset.lower()
+                    if key.rsplit("/", 1)[-1] in IGNORED_ASSETS:
+                        continue
+                    providers.setdefault(key, {}).setdefault(mod_key, (order, asset))
+    for key, mods in providers.items():
+        if len(mods) > 1:
+            ordered = sorted(mods.items(), key=lambda item: item[1][0])
+            report.conflicts[ordered[0][1][1]] = [mod_key for mod_key, _ in ordered]
+    report.stats = {name: cache.stats[name] - before.get(name, 0) for name in cache.stats}
+    return report
+
+_cache = None
+
+def get_pak_index_cache():
+    """Return the shared PakIndexCache, opening the database on first use."""
+    global _cache
+    if _cache is None:
+        _cache = PakIndexCache()
+    return _cache
@@ -0,0 +1,86 @@
+import os
+from fsmodel import PAK_EXTS, PREFIX_RE
+
+def is_pak_file(name):
+    """Return True for .pak/.ucas/.utoc files (the files the load-order prefix applies to)."""
+    return name.endswith(PAK_EXTS)
+
+def strip_prefix(name):
+    """Remove a leading 3-digit load-order prefix and underscore, e.g. "010_Mod.pak" -> "Mod.pak"."""
+    return PREFIX_RE.sub("", name, count=1)
+
+def plan_prefix_renames(folder_path, prefix, file_names=None):
+    """
+    Compute the renames that give every pak file of a folder the load-order prefix.
+
+    Files that already carry the right prefix are left out, so applying an unchanged
+    load order produces no renames at all.
+
+    Args:
+        folder_path (str): The mod folder.
+        prefix (str): The 3-digit prefix (e.g. "010"), or "" to remove any prefix.
+        file_names (iterable): The folder's file names if already known (saves a listing).
+
+    Returns:
+        list: (src, dst) full path pairs.
+    """
+    if file_names is None:
+        try:
+            file_names = [entry.name for entry in os.scandir(folder_path) if entry.is_file()]
+        except OSError:
+            return []
+    renames = []
+    for name in file_names:
+        if not is_pak_file(name):
+            continue
+        base = strip_prefix(name)
+        new_name = f"{prefix}_{base}" if prefix else base
+        if new_name != name:
+            renames.append((os.path.join(folder_path, name), os.path.join(folder_path, new_name)))
+    return renames
+
+def plan_load_order(entries):
+    """
+    Build the rename plan for a whole load order.
+
+    Args:
+        entries (iterable): (folder_path, prefix) pairs; prefix "" removes the prefix.
+
+    Returns:
+        list: (src, dst) full path pairs, only for files whose name actually changes.
+    """
+    renames = []
+    for folder_path, prefix in entries:
+        renames.extend(plan_prefix_renames(folder_path, prefix))
+    return renames
+
+def format_renames(renames, limit=20):
+    """
+    Describe a rename plan for a dry run, one "old -> new" line per file.
+
+    Args:
+        renames (list): (src, dst) pairs.
+        limit (int): Maximum number of lines; the rest is summarised.
+
+    Returns:
+        str: The description.
+    """
+    lines = [f"{os.path.basename(src)} -> {os.path.basename(dst)}" for src, dst in renames[:limit]]
+    if len(renames) > limit:
+        lines.append(f"... and {len(renames) - limit} more")
+    return "\n".join(lines)
+
+def apply_renames(renames):
+    """
+    Run a list of (src, dst) renames.
+
+    Returns:
+        list: (src, exception) pairs for the renames that failed.
+    """
+    failures = []
+    for src, dst in renames:
+        try:
+            os.rename(src, dst)
+        except OSError as e:
+            failures.append((src, e))
+    return failures
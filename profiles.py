@@ -0,0 +1,178 @@
+import json
+import os
+import re
+import time
+import settings
+import modstate
+from installer import get_paks_path
+from prefixes import plan_prefix_renames
+
+# Mod roots covered by a profile.
+PROFILE_ROOTS = ["Mods", "LogicMods", "LuaMods"]
+
+# Profiles are stored as one JSON file each in the config folder.
+PROFILES_FOLDER = os.path.join(settings.CONFIG_FOLDER, "profiles")
+
+def _profile_file(name):
+    safe = re.sub(r'[<>:"/\\|?*]', "_", name).strip() or "profile"
+    return os.path.join(PROFILES_FOLDER, safe + ".json")
+
+def _leaves(node):
+    if node.children:
+        for child in node.children:
+            yield from _leaves(child)
+    elif node.path:
+        yield node
+
+def current_state(itr2_path):
+    """
+    Read the enabled state and load-order prefix of every installed mod. Mods and
+    LogicMods may group mods in sub-folders, so their mods are the leaf folders;
+    a LuaMods mod is a top-level folder with its own sub-folders (e.g. Scripts).
+
+    Returns:
+        dict: Root name -> {mod path: fsmodel.FolderNode}.
+    """
+    paks = get_paks_path(itr2_path)
+    state = {}
+    for root_name in PROFILE_ROOTS:
+        mods_root = os.path.join(paks, root_name)
+        if os.path.isdir(mods_root) or os.path.isdir(modstate.get_staging_root(mods_root)):
+            tree = modstate.load_mod_tree(mods_root)
+            nodes = (tree.children or []) if root_name == "LuaMods" else _leaves(tree)
+            state[root_name] = {node.path: node for node in nodes}
+        else:
+            state[root_name] = {}
+    return state
+
+def capture_profile(itr2_path):
+    """
+    Record the current mod setup as a profile dict:
+    {"roots": {root name: {mod path: {"enabled": bool, "prefix": str}}}}.
+    """
+    return {"roots": {
+        root_name: {rel: {"enabled": node.enabled, "prefix": node.prefix} for rel, node in mods.items()}
+        for root_name, mods in current_state(itr2_path).items()
+    }}
+
+def list_profiles():
+    """Return the names of the saved profiles, sorted case-insensitively."""
+    if not os.path.isdir(PROFILES_FOLDER):
+        return []
+    names = []
+    for file_name in os.listdir(PROFILES_FOLDER):
+        if file_name.endswith(".json"):
+            try:
+                with open(os.path.join(PROFILES_FOLDER, file_name)) as f:
+                    names.append(json.load(f).get("name", file_name[:-5]))
+            except (OSError, ValueError):
+                continue
+    return sorted(names, key=str.lower)
+
+def save_profile(name, profile):
+    os.makedirs(PROFILES_FOLDER, exist_ok=True)
+    profile = dict(profile, name=name)
+    tmp_path = _profile_file(name) + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(profile, f, indent=4)
+    os.replace(tmp_path, _profile_file(name))
+
+def load_profile(name):
+    with open(_profile_file(name)) as f:
+        return json.load(f)
+
+def delete_profile(name):
+    os.remove(_profile_file(name))
+
+class SwitchPlan:
+    """
+    The file system operations needed to go from the current mod setup to a profile.
+
+    Attributes:
+        moves (dict): Root path -> folder moves (see modstate.plan_moves).
+        renames (list): (src, dst) prefix renames of pak files, in the folders where
+            the mods are once the moves are done.
+    """
+    def __init__(self):
+        self.moves = {}
+        self.renames = []
+
+    def __len__(self):
+        return sum(len(ops) for ops in self.moves.values()) + len(self.renames)
+
+def plan_switch(itr2_path, profile):
+    """
+    Compare the installed mods with a profile and plan only the differences:
+    a folder move for each mod whose enabled state differs and pak renames for
+    each mod whose load-order prefix differs. Mods missing on either side, including
+    mod folders removed since the tree was read, are left alone.
+
+    Returns:
+        SwitchPlan: The operations to run.
+    """
+    plan = SwitchPlan()
+    paks = get_paks_path(itr2_path)
+    current = current_state(itr2_path)
+    for root_name, wanted_mods in profile.get("roots", {}).items():
+        mods = current.get(root_name, {})
+        mods_root = os.path.join(paks, root_name)
+        changes = []
+        for rel, wanted in wanted_mods.items():
+            node = mods.get(rel)
+            if node is None:
+                continue
+            if not os.path.isdir(node.full_path):
+                print(f"Skipping {root_name}/{rel}: its folder no longer exists")
+                continue
+            enabled = wanted.get("enabled", True)
+            if enabled != node.enabled:
+                changes.append((rel, enabled))
+            if wanted.get("prefix", "") != node.prefix:
+                folder = modstate.live_path(mods_root, rel) if enabled else modstate.staged_path(mods_root, rel)
+                file_names = [entry.name for entry in os.scandir(node.full_path) if entry.is_file()]
+                plan.renames.extend(plan_prefix_renames(folder, wanted.get("prefix", ""), file_names))
+        ops = modstate.plan_moves(mods_root, changes)
+        if ops:
+            plan.moves[mods_root] = ops
+    return plan
+
+def _reverse(ops):
+    return [{"rel": op["rel"], "src": op["dst"], "dst": op["src"],
+             "src_root": op["dst_root"], "dst_root": op["src_root"]} for op in ops]
+
+def apply_switch(plan):
+    """
+    Run a SwitchPlan with the journal of modstate.apply_moves: first the folder moves
+    of every root as one transaction, then the prefix renames as a second one. If the
+    renames fail, the moves are undone, so a failed switch leaves the mods as they
+    were, or, if an undo failed too, a journal that recover_journal() can finish.
+
+    Returns:
+        float: Seconds taken.
+
+    Raises:
+        modstate.BulkMoveError: If the switch failed.
+    """
+    start = time.perf_counter()
+    moves = [op for ops in plan.moves.values() for op in ops]
+    modstate.apply_moves(moves)
+    # A rename is a move of one file within its folder, so it goes through the same journal.
+    renames = [{"rel": os.path.basename(src), "src": src, "dst": dst,
+                "src_root": os.path.dirname(src), "dst_root": os.path.dirname(src)} for src, dst in plan.renames]
+    try:
+        modstate.apply_moves(renames)
+    except modstate.BulkMoveError as e:
+        if not e.recovery_pending:
+            modstate.apply_moves(_reverse(moves))
+        raise
+    return time.perf_counter() - start
+
+def switch_profile(itr2_path, name):
+    """
+    Switch the installed mods to a saved profile.
+
+    Returns:
+        tuple: (number of file system operations, seconds taken).
+    """
+    plan = plan_switch(itr2_path, load_profile(name))
+    return len(plan), apply_switch(plan)
@@ -1,16 +1,22 @@
+import atexit
 import json
 import os
-from tkinter import filedialog, Tk
-import customtkinter as ctk  # For CTkToplevel popups
+import tempfile
+import threading
 
 # Default configuration dictionary with AdvancedMode setting.
 DEFAULT_CONFIG = {
     "ITR2_Path": "",
-    "AdvancedMode": False
+    "AdvancedMode": False,
+    "ExtractWorkers": 0,
+    "ExtractMode": "thread",
+    "UseStore": True,
+    "StoreFolder": ""
 }
 
 # Get the APPDATA path and define the configuration folder and file.
-APPDATA_FOLDER = os.getenv("APPDATA")
+# Outside Windows (e.g. the command line on a build machine) fall back to ~/.config.
+APPDATA_FOLDER = os.getenv("APPDATA") or os.path.join(os.path.expanduser("~"), ".config")
 CONFIG_FOLDER = os.path.join(APPDATA_FOLDER, "ITR2ModManager")
 
 # Create the config folder if it does not exist.
@@ -20,38 +26,129 @@ if not os.path.exists(CONFIG_FOLDER):
 # Define the path to the configuration file.
 CONFIG_FILE = os.path.join(CONFIG_FOLDER, "config.json")
 
+# Seconds a change waits before config.json is written. Further changes in that time
+# restart the wait, so a burst of set_* calls (e.g. a checkbox clicked repeatedly)
+# costs a single write.
+SAVE_DELAY = 0.5
+
+# Parsed config kept in memory, with the (mtime, size) of config.json it was read from.
+# dirty is set while a change waits for its write.
+_cache = {"config": None, "signature": None, "dirty": False, "timer": None}
+_cache_lock = threading.RLock()
+
+# Counters of actual config.json reads and writes, see get_config_stats().
+_stats = {"disk_reads": 0, "disk_writes": 0, "cache_hits": 0}
+
+def _file_signature():
+    try:
+        st = os.stat(CONFIG_FILE)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
 def load_config():
     """
     Load the configuration from config.json.
     If the file doesn't exist or is unreadable, create it with DEFAULT_CONFIG.
     
+    The parsed configuration is cached in memory; config.json is only read again
+    when its modification time or size changed (e.g. it was edited by hand).
+    
     Returns:
-        dict: The configuration dictionary.
+        dict: The configuration dictionary (a copy, safe to modify).
     """
-    if not os.path.exists(CONFIG_FILE):
-        save_config(DEFAULT_CONFIG)
-        return DEFAULT_CONFIG.copy()
-    with open(CONFIG_FILE, "r") as f:
-        try:
-            config = json.load(f)
-        except json.JSONDecodeError:
+    with _cache_lock:
+        if _cache["dirty"]:
+            # A change waiting for its write is the current state.
+            _stats["cache_hits"] += 1
+            return dict(_cache["config"])
+        signature = _file_signature()
+        if signature is not None and signature == _cache["signature"]:
+            _stats["cache_hits"] += 1
+            return dict(_cache["config"])
+        if signature is None:
             save_config(DEFAULT_CONFIG)
             return DEFAULT_CONFIG.copy()
-    # Ensure all default keys exist.
-    for key, value in DEFAULT_CONFIG.items():
-        if key not in config:
-            config[key] = value
-    return config
+        _stats["disk_reads"] += 1
+        with open(CONFIG_FILE, "r") as f:
+            try:
+                config = json.load(f)
+            except json.JSONDecodeError:
+                save_config(DEFAULT_CONFIG)
+                return DEFAULT_CONFIG.copy()
+        # Ensure all default keys exist.
+        for key, value in DEFAULT_CONFIG.items():
+            if key not in config:
+                config[key] = value
+        _cache["config"] = config
+        _cache["signature"] = signature
+        return dict(config)
 
-def save_config(config):
+def save_config(config, delay=SAVE_DELAY):
     """
     Save the provided configuration dictionary to config.json.
     
+    The write is debounced: it happens delay seconds after the last change (or at
+    exit, see flush()), and load_config() returns the new values in the meantime.
+    The file is written to a temporary file first and then moved over config.json,
+    so a crash never leaves a half-written config.
+    
     Args:
         config (dict): The configuration to save.
+        delay (float): Seconds to wait for further changes; 0 writes right away.
     """
-    with open(CONFIG_FILE, "w") as f:
-        json.dump(config, f, indent=4)
+    with _cache_lock:
+        _cache["config"] = dict(config)
+        _cache["dirty"] = True
+        if _cache["timer"] is not None:
+            _cache["timer"].cancel()
+            _cache["timer"] = None
+        if not delay:
+            flush()
+            return
+        timer = threading.Timer(delay, flush)
+        timer.daemon = True
+        _cache["timer"] = timer
+        timer.start()
+
+def flush():
+    """Write a pending config change to config.json now. Runs at exit as well."""
+    with _cache_lock:
+        if _cache["timer"] is not None:
+            _cache["timer"].cancel()
+            _cache["timer"] = None
+        if _cache["dirty"]:
+            _write_config(_cache["config"])
+
+atexit.register(flush)
+
+def _write_config(config):
+    fd, tmp_path = tempfile.mkstemp(prefix="config.", suffix=".tmp", dir=CONFIG_FOLDER)
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(config, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, CONFIG_FILE)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    _stats["disk_writes"] += 1
+    _cache["dirty"] = False
+    _cache["signature"] = _file_signature()
+
+def get_config_stats():
+    """
+    Return how often config.json was actually read and written, and how many
+    loads were served from memory.
+    
+    Returns:
+        dict: Counters with the keys disk_reads, disk_writes and cache_hits.
+    """
+    return dict(_stats)
 
 def get_ITR2_Path():
     """
@@ -95,6 +192,47 @@ def set_AdvancedMode(state):
     config["AdvancedMode"] = state
     save_config(config)
 
+def get_ExtractWorkers():
+    """
+    Get the number of workers used to extract mod archives.
+    
+    Returns:
+        int: The number of workers, 0 meaning one per CPU core (up to 8).
+    """
+    config = load_config()
+    return config.get("ExtractWorkers", 0)
+
+def get_ExtractMode():
+    """
+    Get the kind of worker pool used to extract mod archives.
+    
+    Returns:
+        str: "thread" or "process".
+    """
+    config = load_config()
+    return config.get("ExtractMode", "thread")
+
+def get_UseStore():
+    """
+    Get whether installs go through the deduplicating content store (see store.py).
+    
+    Returns:
+        bool: True to install hardlinks to stored files, False to extract plain copies.
+    """
+    config = load_config()
+    return config.get("UseStore", True)
+
+def get_StoreFolder():
+    """
+    Get the folder of the content store. Hardlinks only work when it is on the same
+    drive as the game; on another drive installs do not use the store.
+    
+    Returns:
+        str: The folder, or "" for the default ModStore folder in the game's Content folder.
+    """
+    config = load_config()
+    return config.get("StoreFolder", "")
+
 def select_ITR2_folder():
     """
     Open an explorer window to allow the user to select a folder.
@@ -103,6 +241,8 @@ def select_ITR2_folder():
     Returns:
         str: The selected folder path.
     """
+    # Tkinter is only imported here so the core modules and the command line stay GUI-free.
+    from tkinter import filedialog, Tk
     # Create a temporary hidden Tk instance for the file dialog.
     root = Tk()
     root.withdraw()
@@ -122,6 +262,7 @@ def show_popup(parent, message, title="Check Game Path"):
         message (str): The message to display.
         title (str): The title for the popup window.
     """
+    import customtkinter as ctk
     popup = ctk.CTkToplevel(parent)
     popup.title(title)
     width, height = 300, 100
@@ -139,6 +280,15 @@ def show_popup(parent, message, title="Check Game Path"):
     button.pack(pady=(0,10))
     popup.wait_window(popup)
 
+def is_game_folder(path):
+    """
+    Return True if path holds the "Engine" and "IntoTheRadius2" folders and "IntoTheRadius2.exe".
+    """
+    engine_exists = os.path.isdir(os.path.join(path, "Engine"))
+    itr_exists = os.path.isdir(os.path.join(path, "IntoTheRadius2"))
+    exe_exists = os.path.isfile(os.path.join(path, "IntoTheRadius2.exe"))
+    return engine_exists and itr_exists and exe_exists
+
 def check_game_path(parent):
     """
     Check the ITR2 game folder stored in config for the existence of:
@@ -158,11 +308,7 @@ def check_game_path(parent):
         show_popup(parent, "Game Folder incorrect: no path set!")
         return False
 
-    engine_exists = os.path.isdir(os.path.join(path, "Engine"))
-    itr_exists = os.path.isdir(os.path.join(path, "IntoTheRadius2"))
-    exe_exists = os.path.isfile(os.path.join(path, "IntoTheRadius2.exe"))
-    
-    if engine_exists and itr_exists and exe_exists:
+    if is_game_folder(path):
         show_popup(parent, "Correct Game Folder!")
         return True
     else:
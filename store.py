@@ -0,0 +1,318 @@
+import hashlib
+import os
+import shutil
+import sqlite3
+import stat
+import tempfile
+import threading
+import settings
+
+# Default folder of the content-addressed store, in the game's Content folder next to
+# Paks and DisabledMods: hardlinks need the store and the installed files on one volume.
+STORE_FOLDER_NAME = "ModStore"
+
+# Size of the buffer used when streaming a member into the store.
+BUFFER_SIZE = 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS members (
+    crc INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    PRIMARY KEY (crc, size)
+);
+CREATE TABLE IF NOT EXISTS objects (
+    digest TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+"""
+
+def _clear_read_only(func, path, exc_info):
+    # shutil.rmtree error handler: Windows refuses to delete read-only files.
+    os.chmod(path, stat.S_IWRITE | stat.S_IREAD)
+    func(path)
+
+def remove_file(path):
+    """Delete a file, even a read-only one (e.g. installed by an older version)."""
+    try:
+        os.remove(path)
+    except PermissionError:
+        os.chmod(path, stat.S_IWRITE | stat.S_IREAD)
+        os.remove(path)
+
+def remove_tree(path):
+    """Delete a folder tree, even if it holds read-only files."""
+    shutil.rmtree(path, onerror=_clear_read_only)
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(BUFFER_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ContentStore:
+    """
+    Content-addressed file store: every distinct file content is kept once, named by
+    its SHA-256, and installed mod files are hardlinks to it.
+
+    Identical .pak/.utoc files shipped by several mods, Fomod variants or versions
+    therefore take disk space once. Archive members are recognised by the CRC-32 and
+    size their zip entry records, so content already in the store is linked without
+    decompressing it again. When the store and the game are on different volumes
+    (or the file system has no hardlinks) files are copied instead.
+
+    Installed files stay writable. A tool writing into one in place therefore changes
+    the stored object too; the size and mtime of every object are recorded, and an
+    object whose stat changed is re-hashed before it is linked again and evicted if
+    its content no longer matches (see check_object). The manager itself replaces
+    files instead of writing into them (see extraction.extract_member).
+
+    Args:
+        root (str): The store folder.
+    """
+    def __init__(self, root):
+        self.root = root
+        self.objects = os.path.join(root, "objects")
+        self.tmp = os.path.join(root, "tmp")
+        os.makedirs(self.objects, exist_ok=True)
+        os.makedirs(self.tmp, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(root, "index.sqlite3"), check_same_thread=False)
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def same_volume(self, path):
+        """Return True if path is on the store's volume, so files installed there are hardlinks."""
+        try:
+            return os.stat(self.root).st_dev == os.stat(path).st_dev
+        except OSError:
+            return False
+
+    def object_path(self, digest):
+        return os.path.join(self.objects, digest[:2], digest[2:])
+
+    def lookup(self, info):
+        """
+        Return the digest of a zip member's content if the store already has it, else None.
+
+        The object must still have the member's size, and is re-hashed if its size or
+        mtime changed since it was stored; an object whose content no longer matches
+        its name is evicted, so the member is extracted again.
+        """
+        with self._lock:
+            row = self._db.execute("SELECT digest FROM members WHERE crc = ? AND size = ?",
+                                   (info.CRC, info.file_size)).fetchone()
+        if row is None:
+            return None
+        digest = row[0]
+        if self.check_object(digest, info.file_size):
+            return digest
+        return None
+
+    def check_object(self, digest, size=None):
+        """
+        Check that a stored object is intact: it exists, has the expected size and,
+        unless its size and mtime are the ones recorded when it was stored, still
+        hashes to its name. A damaged object is evicted.
+
+        Returns:
+            bool: True if the object can be used.
+        """
+        path = self.object_path(digest)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        if size is not None and st.st_size != size:
+            self._evict(digest)
+            return False
+        with self._lock:
+            row = self._db.execute("SELECT size, mtime_ns FROM objects WHERE digest = ?", (digest,)).fetchone()
+        if row != (st.st_size, st.st_mtime_ns):
+            if _hash_file(path) != digest:
+                self._evict(digest)
+                return False
+            self._record_object(digest, st)
+        return True
+
+    def _record_object(self, digest, st):
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO objects (digest, size, mtime_ns) VALUES (?, ?, ?)",
+                             (digest, st.st_size, st.st_mtime_ns))
+
+    def _evict(self, digest):
+        # Drop a damaged object. Files already linked to it keep their inode (and are
+        # reported by manifests.verify_manifests); new installs extract afresh.
+        print(f"Store object {digest} is damaged, removing it")
+        try:
+            remove_file(self.object_path(digest))
+        except OSError as e:
+            print(f"Error removing store object {digest}: {e}")
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM members WHERE digest = ?", (digest,))
+            self._db.execute("DELETE FROM objects WHERE digest = ?", (digest,))
+
+    def _remember(self, info, digest):
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO members (crc, size, digest) VALUES (?, ?, ?)",
+                             (info.CRC, info.file_size, digest))
+
+    def add_member(self, z, info, buffer_size=BUFFER_SIZE, progress=None, cancel=None):
+        """
+        Write a zip member into the store, hashing it while it is written. Stored
+        members are copied without Python buffers (see extraction.copy_stored_member).
+
+        Args:
+            z (zipfile.ZipFile): The open archive.
+            info (zipfile.ZipInfo): The member.
+            buffer_size (int): Size of the copy buffer in bytes.
+            progress (extraction.ExtractProgress): Optional progress counter, advanced per buffer.
+            cancel (threading.Event): Optional event; when set, extraction.ExtractCancelled is raised.
+
+        Returns:
+            str: The SHA-256 hex digest of the content.
+        """
+        from extraction import copy_stored_member, preallocate, stream_member
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp)
+        try:
+            with os.fdopen(fd, "wb") as target_file:
+                preallocate(target_file, info.file_size)
+                if not copy_stored_member(z, info, target_file, progress, cancel, digest):
+                    stream_member(z, info, target_file, buffer_size, progress, cancel, digest)
+            hexdigest = digest.hexdigest()
+            self._commit(tmp_path, hexdigest)
+        finally:
+            if os.path.exists(tmp_path):
+                remove_file(tmp_path)
+        self._remember(info, hexdigest)
+        return hexdigest
+
+    def _commit(self, tmp_path, digest):
+        target = self.object_path(digest)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        try:
+            # Linking fails if the object exists, so two workers storing the same
+            # content at once keep one object (and one inode) for both.
+            os.link(tmp_path, target)
+        except FileExistsError:
+            if self.check_object(digest):
+                return
+            os.replace(tmp_path, target)
+        except OSError:
+            if not os.path.exists(target):
+                os.replace(tmp_path, target)
+        self._record_object(digest, os.stat(target))
+
+    def link(self, digest, dest):
+        """
+        Put the stored content at dest: a hardlink, or a copy across volumes.
+
+        Returns:
+            str: "same" if dest already was this object, "link" or "copy".
+        """
+        source = self.object_path(digest)
+        try:
+            dest_stat = os.stat(dest)
+        except OSError:
+            dest_stat = None
+        if dest_stat is not None:
+            source_stat = os.stat(source)
+            if (dest_stat.st_ino, dest_stat.st_dev) == (source_stat.st_ino, source_stat.st_dev):
+                return "same"
+            remove_file(dest)
+        try:
+            os.link(source, dest)
+            return "link"
+        except OSError:
+            # Another volume (EXDEV), no hardlink support or too many links: copy instead.
+            pass
+        shutil.copyfile(source, dest)
+        return "copy"
+
+    def install_member(self, z, info, dest, buffer_size=BUFFER_SIZE, progress=None, cancel=None):
+        """
+        Install one zip member at dest through the store; content the store already
+        has is linked without being decompressed.
+
+        Returns:
+            str: The SHA-256 hex digest of the member's content.
+        """
+        digest = self.lookup(info)
+        if digest is None:
+            digest = self.add_member(z, info, buffer_size, progress, cancel)
+        elif progress is not None:
+            progress.advance(info.file_size)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        self.link(digest, dest)
+        if progress is not None:
+            progress.advance(files=1)
+        return digest
+
+    def collect_garbage(self):
+        """
+        Delete stored objects no installed file links to any more (link count 1).
+        Objects that were only copied out are removed as well. The remaining objects
+        are checked with check_object, so damaged ones are evicted.
+
+        Returns:
+            tuple: (objects removed, bytes freed, damaged objects evicted).
+        """
+        removed = 0
+        freed = 0
+        damaged = 0
+        for folder in os.listdir(self.objects):
+            folder_path = os.path.join(self.objects, folder)
+            for name in os.listdir(folder_path):
+                path = os.path.join(folder_path, name)
+                try:
+                    st = os.stat(path)
+                    if st.st_nlink <= 1:
+                        remove_file(path)
+                        removed += 1
+                        freed += st.st_size
+                    elif not self.check_object(folder + name):
+                        damaged += 1
+                except OSError:
+                    continue
+        if removed:
+            with self._lock, self._db:
+                digests = [row[0] for row in self._db.execute("SELECT DISTINCT digest FROM members")]
+                gone = [(d,) for d in digests if not os.path.exists(self.object_path(d))]
+                self._db.executemany("DELETE FROM members WHERE digest = ?", gone)
+                self._db.executemany("DELETE FROM objects WHERE digest = ?", gone)
+        return removed, freed, damaged
+
+_stores = {}
+
+def default_store_folder(itr2_path):
+    """Return the default store folder of a game: {ITR2_Path}/IntoTheRadius2/Content/ModStore."""
+    from installer import get_content_path
+    return os.path.join(get_content_path(itr2_path), STORE_FOLDER_NAME)
+
+def get_store(itr2_path):
+    """Return the shared ContentStore of a game (in the folder set by settings, if any)."""
+    root = os.path.normpath(settings.get_StoreFolder() or default_store_folder(itr2_path))
+    if root not in _stores:
+        _stores[root] = ContentStore(root)
+    return _stores[root]
+
+def configured_store(itr2_path):
+    """
+    Return the ContentStore installs into a game should use, or None for plain copies:
+    when settings UseStore is off, or when the store is on another volume than the
+    game, where every installed file would be a second full copy of its stored object.
+    """
+    if not settings.get_UseStore():
+        return None
+    from installer import get_content_path
+    store = get_store(itr2_path)
+    if not store.same_volume(get_content_path(itr2_path)):
+        print(f"Content store {store.root} is not on the game's drive, installing plain copies")
+        return None
+    return store
@@ -0,0 +1,162 @@
+import io
+import queue
+import threading
+import zipfile
+from collections import OrderedDict
+from PIL import Image
+from archive_index import ArchiveIndex, normalize_archive_path
+
+# Size of the plugin thumbnails shown on Fomod pages.
+THUMBNAIL_SIZE = (64, 64)
+
+class ThumbnailCache:
+    """
+    LRU cache of decoded thumbnails keyed by (archive path, image path).
+
+    The cache is bounded both by entry count and by decoded size in bytes;
+    the least recently used thumbnails are dropped first. Images that could
+    not be found or decoded are cached as None so they are not retried.
+    """
+    def __init__(self, max_entries=512, max_bytes=32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _size_of(image):
+        if image is None:
+            return 0
+        return image.width * image.height * len(image.getbands())
+
+    def get(self, key):
+        """Return (found, image) for the key, marking it as recently used."""
+        with self._lock:
+            if key not in self._items:
+                return False, None
+            self._items.move_to_end(key)
+            return True, self._items[key]
+
+    def put(self, key, image):
+        with self._lock:
+            if key in self._items:
+                self._bytes -= self._size_of(self._items.pop(key))
+            self._items[key] = image
+            self._bytes += self._size_of(image)
+            while self._items and (len(self._items) > self.max_entries or self._bytes > self.max_bytes):
+                _, dropped = self._items.popitem(last=False)
+                self._bytes -= self._size_of(dropped)
+
+    def __len__(self):
+        return len(self._items)
+
+# Shared by every Fomod window, so reopening the same archive is instant too.
+THUMBNAILS = ThumbnailCache()
+
+def decode_thumbnail(data, size=THUMBNAIL_SIZE):
+    """
+    Decode image bytes into a thumbnail no larger than size.
+
+    Image.draft lets JPEG decoders scale down while decoding, and thumbnail()
+    shrinks whatever is left, so large previews are never decoded at full size.
+    """
+    image = Image.open(io.BytesIO(data))
+    image.draft("RGB", size)
+    image.thumbnail(size)
+    image.load()
+    return image
+
+class ThumbnailLoader:
+    """
+    Load Fomod plugin thumbnails on a background thread.
+
+    request() returns a cached thumbnail right away; otherwise it queues the image
+    for the worker thread, which keeps one archive handle and index open for the
+    whole window. Decoded images come back through a queue that is polled from the
+    Tk main loop with after(), where the callback is run.
+    """
+    POLL_INTERVAL = 50
+
+    def __init__(self, widget, zip_file_path, cache=THUMBNAILS):
+        self.widget = widget
+        self.zip_file_path = zip_file_path
+        self.cache = cache
+        self._requests = queue.Queue()
+        self._results = queue.Queue()
+        self._pending = 0
+        self._polling = False
+        self._thread = threading.Thread(target=self._work, daemon=True)
+        self._thread.start()
+
+    def request(self, image_path, callback):
+        """
+        Ask for the thumbnail of image_path; callback(image) is called on the Tk thread
+        with a PIL image, or None if the image is missing or unreadable.
+
+        Returns:
+            bool: True if the callback already ran from the cache.
+        """
+        key = (self.zip_file_path, normalize_archive_path(image_path))
+        found, image = self.cache.get(key)
+        if found:
+            callback(image)
+            return True
+        self._pending += 1
+        self._requests.put((key, image_path, callback))
+        if not self._polling:
+            self._polling = True
+            self.widget.after(self.POLL_INTERVAL, self._poll)
+        return False
+
+    def close(self):
+        """Stop the worker thread once its queue is drained."""
+        self._requests.put(None)
+
+    def _work(self):
+        z = None
+        index = None
+        try:
+            while True:
+                item = self._requests.get()
+                if item is None:
+                    break
+                key, image_path, callback = item
+                # Another request may have filled the cache in the meantime.
+                found, image = self.cache.get(key)
+                if not found:
+                    image = None
+                    try:
+                        if z is None:
+                            z = zipfile.ZipFile(self.zip_file_path, "r")
+                            index = ArchiveIndex.from_zip(z)
+                        image_file = index.find_file(image_path)
+                        if image_file:
+                            image = decode_thumbnail(z.read(image_file))
+                    except Exception as e:
+                        print("Error loading plugin image:", e)
+                    self.cache.put(key, image)
+                self._results.put((callback, image))
+        finally:
+            if z is not None:
+                z.close()
+
+    def _poll(self):
+        try:
+            while True:
+                callback, image = self._results.get_nowait()
+                self._pending -= 1
+                try:
+                    callback(image)
+                except Exception as e:
+                    # The widget may have been destroyed while loading.
+                    print("Error showing plugin image:", e)
+        except queue.Empty:
+            pass
+        try:
+            if self._pending > 0:
+                self.widget.after(self.POLL_INTERVAL, self._poll)
+            else:
+                self._polling = False
+        except Exception:
+            self._polling = False
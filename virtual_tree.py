@@ -0,0 +1,346 @@
+import tkinter
+import customtkinter as ctk
+from store import remove_tree
+
+# Height of one tree row in pixels.
+ROW_HEIGHT = 32
+
+# Background of selected row labels.
+SELECTED_COLOR = "#1f538d"
+
+class TreeRow:
+    """A visible line of the tree: a folder node and its depth."""
+    __slots__ = ("node", "depth", "parent")
+
+    def __init__(self, node, depth, parent):
+        self.node = node
+        self.depth = depth
+        self.parent = parent
+
+class RowWidget(ctk.CTkFrame):
+    """
+    A recycled row: toggle button, folder label, checkbox (or value entry) and delete button.
+    show() rebinds it to another TreeRow and only reconfigures what changed.
+    """
+    def __init__(self, tree):
+        super().__init__(tree.body, height=ROW_HEIGHT, fg_color=tree.body.cget("fg_color"))
+        self.tree = tree
+        self.row = None
+        self._state = None
+        self.grid_columnconfigure(1, weight=1)
+
+        self.toggle_button = ctk.CTkButton(self, text="+", width=20, command=self._toggle, corner_radius=5)
+        self.spacer = ctk.CTkLabel(self, text=" ", width=20)
+        self.label = ctk.CTkLabel(self, text="", anchor="w", corner_radius=5)
+        self.label.grid(row=0, column=1, sticky="we")
+        # Clicking a folder name selects it for bulk actions.
+        self.label.bind("<Button-1>", lambda event: self._select())
+        self.check_var = ctk.BooleanVar(value=True)
+        self.check_mod = ctk.CTkCheckBox(self, text="", width=24, variable=self.check_var, command=self._check)
+        self.delete_button = ctk.CTkButton(self, text="X", width=20, fg_color="#ff5555",
+                                           hover_color="#ff0000", command=self._delete, corner_radius=5)
+        if tree.deletable:
+            self.delete_button.grid(row=0, column=3, padx=5)
+        if tree.entry_values is not None:
+            # Leaf folders show a 3-digit entry bound to tree.entry_values instead of a checkbox.
+            self._showing = False
+            self.entry_var = ctk.StringVar(value="")
+            self.entry_var.trace_add("write", self._entry_changed)
+            self.value_entry = ctk.CTkEntry(self, textvariable=self.entry_var, width=50, justify="center")
+
+    def show(self, row):
+        self.row = row
+        node = row.node
+        values = self.tree.entry_values
+        state = (row.depth, node.has_children, node.path in self.tree.expanded,
+                 node.name, node.enabled, self.tree.checkable, node.path in self.tree.selected,
+                 values.get(node.path, "") if values is not None else None)
+        if state == self._state:
+            return
+        self._state = state
+        left_pad = 10 + row.depth * 10
+        if node.has_children:
+            self.spacer.grid_remove()
+            self.toggle_button.configure(text="-" if state[2] else "+")
+            self.toggle_button.grid(row=0, column=0, padx=(left_pad, 5))
+        else:
+            self.toggle_button.grid_remove()
+            self.spacer.grid(row=0, column=0, padx=(left_pad, 5))
+        self.label.configure(text=node.name, fg_color=SELECTED_COLOR if state[6] else "transparent")
+        # For leaf folders, show a checkbox on the right.
+        if self.tree.checkable and not node.has_children:
+            self.check_var.set(node.enabled)
+            self.check_mod.grid(row=0, column=2, padx=5)
+        else:
+            self.check_mod.grid_remove()
+        if values is not None:
+            if node.has_children:
+                self.value_entry.grid_remove()
+            else:
+                self._showing = True
+                self.entry_var.set(state[7])
+                self._showing = False
+                self.value_entry.grid(row=0, column=2, padx=5)
+
+    def _entry_changed(self, *args):
+        value = self.entry_var.get()
+        new_value = ''.join(filter(str.isdigit, value))[:3]
+        if new_value != value:
+            self.entry_var.set(new_value)
+            return
+        if self._showing or self.row is None:
+            return
+        self.tree.entry_values[self.row.node.path] = new_value
+        self._state = None
+        if self.tree.on_entry is not None:
+            self.tree.on_entry(self.row.node, new_value)
+
+    def _toggle(self):
+        if self.row is not None:
+            self.tree.toggle(self.row)
+
+    def _check(self):
+        if self.row is not None:
+            self.tree.set_enabled(self.row, self.check_var.get())
+
+    def _select(self):
+        if self.row is not None:
+            self.tree.toggle_selection(self.row)
+
+    def _delete(self):
+        if self.row is not None:
+            self.tree.confirm_delete(self.row)
+
+class VirtualTreeView(ctk.CTkFrame):
+    """
+    Scrollable folder tree that only creates widgets for the rows on screen.
+
+    The tree is an fsmodel.FolderNode model; expanding a folder just inserts its
+    children into the flat list of visible TreeRows. A fixed pool of RowWidgets,
+    sized to the view height, is rebound to whichever rows are scrolled into view,
+    so building and scrolling cost the same with ten mods or several thousand.
+
+    Args:
+        parent: The parent widget.
+        root_node (fsmodel.FolderNode): The root folder; its children are the top-level rows.
+        on_toggle_mod (callable): Called as on_toggle_mod(node, enabled) when a checkbox
+            changes; returns True if the new state was applied.
+        on_delete (callable): Called as on_delete(node) to delete a folder; defaults to
+            removing node.full_path.
+        on_select (callable): Called with no arguments when the selection changes.
+        checkable (bool): Show enable/disable checkboxes on leaf folders.
+        empty_text (str): Text shown when the root has no folders.
+        deletable (bool): Show delete buttons.
+        entry_values (dict): If given, leaf folders show a 3-digit entry editing
+            entry_values[node.path] (e.g. load-order prefixes).
+        on_entry (callable): Called as on_entry(node, value) when an entry is edited.
+    """
+    def __init__(self, parent, root_node, on_toggle_mod=None, on_delete=None, on_select=None, checkable=True,
+                 empty_text="No folders found", deletable=True, entry_values=None, on_entry=None, *args, **kwargs):
+        super().__init__(parent, *args, **kwargs)
+        self.root_node = root_node
+        self.on_toggle_mod = on_toggle_mod
+        self.on_delete = on_delete
+        self.on_select = on_select
+        self.selected = set()
+        self.checkable = checkable
+        self.empty_text = empty_text
+        self.deletable = deletable
+        self.entry_values = entry_values
+        self.on_entry = on_entry
+        self.expanded = set()
+        self.rows = []
+        self.top = 0
+        self.pool = []
+
+        self.body = ctk.CTkFrame(self, fg_color=self.cget("fg_color"))
+        self.body.pack(side="left", fill="both", expand=True)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.empty_label = ctk.CTkLabel(self.body, text=empty_text)
+
+        self.body.bind("<Configure>", lambda event: self._resize_pool(event.height))
+        # Scroll with the mouse wheel when the pointer is over this tree. The handlers
+        # live on the tree's own widgets, so they go away with the tree.
+        self._bind_wheel(self.body)
+        self.set_root(root_node)
+
+    def _bind_wheel(self, widget):
+        # Bind on every Tk widget below widget. tkinter.Misc.bind is used directly so a
+        # CTk widget does not also bind its inner canvas, which is visited anyway.
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            tkinter.Misc.bind(widget, sequence, self._on_wheel, "+")
+        for child in widget.winfo_children():
+            self._bind_wheel(child)
+
+    def set_root(self, root_node):
+        """Show another folder model, keeping expanded folders that still exist."""
+        self.root_node = root_node
+        self._flatten()
+
+    def _flatten(self):
+        rows = []
+
+        def add(nodes, depth, parent):
+            for node in nodes:
+                row = TreeRow(node, depth, parent)
+                rows.append(row)
+                if node.path in self.expanded and node.children:
+                    add(node.children, depth + 1, node)
+
+        add(self.root_node.children or [], 0, self.root_node)
+        self.rows = rows
+        self._render()
+
+    def _resize_pool(self, height):
+        needed = max(1, height // ROW_HEIGHT + 1)
+        while len(self.pool) < needed:
+            widget = RowWidget(self)
+            self._bind_wheel(widget)
+            self.pool.append(widget)
+        self._render()
+
+    def _render(self):
+        if not self.rows:
+            for widget in self.pool:
+                widget.place_forget()
+            self.empty_label.place(relx=0.5, y=20, anchor="n")
+            self.scrollbar.set(0, 1)
+            return
+        self.empty_label.place_forget()
+        visible = max(1, self.body.winfo_height() // ROW_HEIGHT)
+        self.top = max(0, min(self.top, len(self.rows) - visible))
+        for i, widget in enumerate(self.pool):
+            index = self.top + i
+            if index < len(self.rows):
+                widget.show(self.rows[index])
+                widget.place(x=0, y=i * ROW_HEIGHT, relwidth=1, height=ROW_HEIGHT)
+            else:
+                widget.place_forget()
+        total = len(self.rows)
+        self.scrollbar.set(self.top / total, min(1.0, (self.top + visible) / total))
+
+    def scroll_to(self, top):
+        self.top = int(top)
+        self._render()
+
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self.scroll_to(float(args[1]) * len(self.rows))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if len(args) > 2 and args[2] == "pages":
+                step *= max(1, self.body.winfo_height() // ROW_HEIGHT)
+            self.scroll_to(self.top + step)
+
+    def _on_wheel(self, event):
+        if getattr(event, "num", None) == 4:
+            step = -3
+        elif getattr(event, "num", None) == 5:
+            step = 3
+        else:
+            step = -3 if event.delta > 0 else 3
+        self.scroll_to(self.top + step)
+
+    def toggle(self, row):
+        """Expand or collapse a folder row."""
+        if row.node.path in self.expanded:
+            self.expanded.discard(row.node.path)
+        else:
+            self.expanded.add(row.node.path)
+        self._flatten()
+
+    def toggle_selection(self, row):
+        """Add a folder to the selection, or remove it if it was selected."""
+        if row.node.path in self.selected:
+            self.selected.discard(row.node.path)
+        else:
+            self.selected.add(row.node.path)
+        self._render()
+        if self.on_select is not None:
+            self.on_select()
+
+    def clear_selection(self):
+        self.selected.clear()
+        self._render()
+        if self.on_select is not None:
+            self.on_select()
+
+    def selected_leaves(self):
+        """
+        Return the leaf folders (mods) covered by the selection; a selected group
+        covers every mod below it. With nothing selected, return every mod.
+        """
+        leaves = []
+
+        def collect(nodes, chosen):
+            for node in nodes:
+                take = chosen or node.path in self.selected
+                if node.children:
+                    collect(node.children, take)
+                elif take:
+                    leaves.append(node)
+
+        collect(self.root_node.children or [], not self.selected)
+        return leaves
+
+    def set_enabled(self, row, enabled):
+        node = row.node
+        if self.on_toggle_mod is not None and self.on_toggle_mod(node, enabled):
+            node.enabled = enabled
+        self.refresh_rows()
+
+    def refresh_rows(self):
+        """Re-show the visible rows, e.g. after node states changed outside the view."""
+        for widget in self.pool:
+            widget._state = None
+        self._render()
+
+    def confirm_delete(self, row):
+        """
+        Ask for confirmation to delete the folder with a popup. If confirmed,
+        delete the folder and remove its row from the tree.
+        """
+        popup = ctk.CTkToplevel(self)
+        popup.title("Delete Folder")
+        # Center the popup on the screen.
+        width, height = 300, 120
+        screen_width = self.winfo_screenwidth()
+        screen_height = self.winfo_screenheight()
+        x = (screen_width - width) // 2
+        y = (screen_height - height) // 2
+        popup.geometry(f"{width}x{height}+{x}+{y}")
+        popup.transient(self)
+        popup.grab_set()
+        msg = f"Are you sure to delete {row.node.name}?"
+        label = ctk.CTkLabel(popup, text=msg)
+        label.pack(pady=10, padx=10)
+        btn_frame = ctk.CTkFrame(popup)
+        btn_frame.pack(pady=10)
+        yes_btn = ctk.CTkButton(btn_frame, text="Yes", width=60, command=lambda: self._delete_folder(row, popup))
+        yes_btn.pack(side="left", padx=5)
+        no_btn = ctk.CTkButton(btn_frame, text="No", width=60, command=popup.destroy)
+        no_btn.pack(side="left", padx=5)
+        popup.wait_window(popup)
+
+    def _delete_folder(self, row, popup):
+        try:
+            if self.on_delete is not None:
+                self.on_delete(row.node)
+            else:
+                remove_tree(row.node.full_path)
+        except Exception as e:
+            print(f"Error deleting folder {row.node.full_path}: {e}")
+            popup.destroy()
+            return
+        popup.destroy()
+        self.remove_node(row.parent, row.node)
+
+    def remove_node(self, parent, node):
+        """Drop a folder (and its subtree) from the model and the view."""
+        if parent.children and node in parent.children:
+            parent.children.remove(node)
+            parent.has_children = bool(parent.children)
+        prefix = node.path + "/"
+        self.expanded = {p for p in self.expanded if p != node.path and not p.startswith(prefix)}
+        self._flatten()
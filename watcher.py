@@ -0,0 +1,282 @@
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+# Quiet time after the last event before a burst of changes is reported.
+DEBOUNCE_SECONDS = 0.3
+
+# Longest a continuous burst is held back before it is reported anyway.
+MAX_DELAY_SECONDS = 2.0
+
+# How often the polling backend compares folder mtimes.
+POLL_INTERVAL = 2.0
+
+# inotify event flags (see inotify(7)).
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+              | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+EVENT_HEADER = struct.Struct("iIII")
+
+def _walk_dirs(root):
+    """Yield root and every folder below it (symlinks are not followed)."""
+    stack = [root]
+    while stack:
+        path = stack.pop()
+        yield path
+        try:
+            with os.scandir(path) as entries:
+                stack.extend(entry.path for entry in entries if entry.is_dir(follow_symlinks=False))
+        except OSError:
+            continue
+
+class PollingBackend:
+    """
+    Portable fallback: stats every folder below the roots each poll interval and
+    reports folders whose mtime changed, appeared or disappeared.
+    """
+    name = "polling"
+
+    def __init__(self, poll_interval=POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        self.roots = []
+        self._mtimes = {}
+        self._next_scan = time.monotonic() + poll_interval
+
+    def add_root(self, root):
+        self.roots.append(root)
+        self._mtimes.update(self._scan(root))
+
+    def _scan(self, root):
+        mtimes = {}
+        for path in _walk_dirs(root):
+            try:
+                mtimes[path] = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+        return mtimes
+
+    def wait(self, timeout, stop):
+        if stop.wait(max(0.0, min(timeout, self._next_scan - time.monotonic()))):
+            return []
+        if time.monotonic() < self._next_scan:
+            return []
+        self._next_scan = time.monotonic() + self.poll_interval
+        current = {}
+        for root in self.roots:
+            current.update(self._scan(root))
+        changed = [path for path, mtime in current.items() if self._mtimes.get(path) != mtime]
+        changed.extend(path for path in self._mtimes if path not in current)
+        self._mtimes = current
+        return changed
+
+    def close(self):
+        pass
+
+class InotifyBackend:
+    """
+    Linux backend: one inotify watch per folder, set up through libc with ctypes.
+    Folders created later are watched as soon as their creation is seen.
+
+    Raises:
+        OSError: If inotify is not available (the watcher then falls back to polling).
+    """
+    name = "inotify"
+
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._ctypes = ctypes
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self._paths = {}
+
+    def _watch(self, path):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            errno = self._ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), path)
+        self._paths[wd] = path
+
+    def add_root(self, root):
+        for path in _walk_dirs(root):
+            try:
+                self._watch(path)
+            except FileNotFoundError:
+                continue
+
+    def wait(self, timeout, stop):
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        changed = []
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                # Events were lost: report every watched folder so views recheck them.
+                changed.extend(self._paths.values())
+                continue
+            folder = self._paths.get(wd)
+            if folder is None:
+                continue
+            if mask & IN_IGNORED:
+                del self._paths[wd]
+                continue
+            changed.append(folder)
+            if name and mask & IN_ISDIR:
+                path = os.path.join(folder, os.fsdecode(name))
+                changed.append(path)
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    try:
+                        self.add_root(path)
+                    except OSError as e:
+                        print(f"Cannot watch {path}: {e}")
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+class FolderWatcher:
+    """
+    Watch folder trees and report which folders changed, a burst at a time.
+
+    Events are collected on a background thread; once no new event arrived for
+    debounce seconds (or a burst has lasted MAX_DELAY_SECONDS), on_change is called
+    on that thread with the set of changed folder paths. A folder is reported when
+    entries were added, removed or renamed in it, or when it appeared or disappeared.
+
+    Roots that do not exist yet are picked up once they are created.
+
+    Args:
+        roots (list): Folders to watch, with everything below them.
+        on_change (callable): Called as on_change(paths) with a set of folder paths.
+        debounce (float): Quiet time in seconds that ends a burst.
+        use_inotify (bool): Use inotify where available (Linux); otherwise poll mtimes.
+    """
+    def __init__(self, roots, on_change, debounce=DEBOUNCE_SECONDS, use_inotify=True):
+        self.roots = [os.path.abspath(root) for root in roots]
+        self.on_change = on_change
+        self.debounce = debounce
+        self.backend = None
+        if use_inotify and sys.platform.startswith("linux"):
+            try:
+                self.backend = InotifyBackend()
+            except (OSError, AttributeError) as e:
+                print(f"inotify not available, polling for changes instead: {e}")
+        if self.backend is None:
+            self.backend = PollingBackend()
+        self._missing = []
+        for root in self.roots:
+            self._add_root(root)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _add_root(self, root):
+        if not os.path.isdir(root):
+            self._missing.append(root)
+            return False
+        try:
+            self.backend.add_root(root)
+        except OSError as e:
+            # E.g. the inotify watch limit was reached: poll instead.
+            print(f"Cannot watch {root} with {self.backend.name}, polling instead: {e}")
+            self.backend.close()
+            self.backend = PollingBackend()
+            for watched in self.roots:
+                if os.path.isdir(watched):
+                    self.backend.add_root(watched)
+        return True
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=5)
+        self.backend.close()
+
+    def _run(self):
+        pending = set()
+        first_event = last_event = None
+        next_missing_check = time.monotonic() + POLL_INTERVAL
+        while not self._stop.is_set():
+            now = time.monotonic()
+            if pending:
+                timeout = max(0.0, min(last_event + self.debounce, first_event + MAX_DELAY_SECONDS) - now)
+            else:
+                timeout = POLL_INTERVAL
+            try:
+                changed = self.backend.wait(timeout, self._stop)
+            except OSError as e:
+                print(f"Folder watcher error: {e}")
+                changed = []
+                self._stop.wait(POLL_INTERVAL)
+            now = time.monotonic()
+            if changed:
+                pending.update(changed)
+                if first_event is None:
+                    first_event = now
+                last_event = now
+            if now >= next_missing_check and self._missing:
+                next_missing_check = now + POLL_INTERVAL
+                missing, self._missing = self._missing, []
+                for root in missing:
+                    if self._add_root(root):
+                        pending.add(root)
+                        first_event = first_event or now
+                        last_event = last_event or now
+            if pending and (now >= last_event + self.debounce or now >= first_event + MAX_DELAY_SECONDS):
+                batch, pending = pending, set()
+                first_event = last_event = None
+                try:
+                    self.on_change(batch)
+                except Exception as e:
+                    print(f"Error handling folder changes: {e}")
+
+def split_changes(roots, paths):
+    """
+    Group changed folder paths by the root they are in.
+
+    Args:
+        roots (list): The watched roots.
+        paths (iterable): Changed folder paths from FolderWatcher.
+
+    Returns:
+        dict: Root -> set of folders relative to it, with "/" separators ("" for the root).
+    """
+    by_root = {}
+    normalized = [(os.path.normcase(os.path.abspath(root)), root) for root in roots]
+    for path in paths:
+        norm = os.path.normcase(os.path.abspath(path))
+        for norm_root, root in normalized:
+            if norm == norm_root:
+                by_root.setdefault(root, set()).add("")
+            elif norm.startswith(norm_root + os.sep):
+                rel = os.path.relpath(path, root).replace(os.sep, "/")
+                by_root.setdefault(root, set()).add(rel)
+    return by_root